@@ -0,0 +1,12 @@
+"""
+Offline benchmarks for the financial planner bot.
+
+Run a benchmark as a module from the repository root, for example
+``python -m benchmarks.bench_logging``. Placeholder credentials are set so
+the configuration loads without a config.env file.
+"""
+
+import os
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("DB_PASSWORD", "benchmark")
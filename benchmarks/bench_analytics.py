@@ -0,0 +1,236 @@
+"""
+Benchmark of the vectorized ledger analytics against per-row Python loops.
+
+Builds synthetic ledgers of N transactions in memory, once for a single
+user and once spread over many users, and times every analytics function
+next to a naive implementation that walks the rows one by one. Results of
+both implementations are compared so a speedup never hides a wrong answer.
+
+Usage:
+    python -m benchmarks.bench_analytics [--rows N [N ...]] [--users U]
+        [--years Y] [--repeat R] [--json]
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from core import analytics
+from core.analytics import LedgerArrays
+from core.logging_config import shutdown_logging
+
+CATEGORIES = ["Food", "Transport", "Housing", "Utilities", "Health", "Entertainment", "Salary"]
+
+# Window of the rolling average, in months
+WINDOW = 3
+
+PERCENTILES = (50, 90, 99)
+
+
+def _make_rows(count: int, users: int, years: int, rng: random.Random) -> List[tuple]:
+    start = datetime(2020, 1, 1)
+    step = timedelta(days=365 * years) / count
+    return [
+        (
+            1 + index % users,
+            start + step * index,
+            rng.randint(100, 500000) * (1 if rng.random() < 0.2 else -1),
+            rng.choice(CATEGORIES),
+        )
+        for index in range(count)
+    ]
+
+
+def _month_index(moment: datetime) -> int:
+    return (moment.year - 1970) * 12 + moment.month - 1
+
+
+def naive_breakdown(rows: List[tuple]) -> Dict[str, Dict[str, int]]:
+    result: Dict[str, Dict[str, int]] = {}
+    for _, _, amount, category in rows:
+        totals = result.setdefault(category, {"income_minor": 0, "expense_minor": 0, "count": 0})
+        if amount > 0:
+            totals["income_minor"] += amount
+        else:
+            totals["expense_minor"] -= amount
+        totals["count"] += 1
+    return result
+
+
+def naive_trend(rows: List[tuple]) -> Tuple[List[int], List[float], List[float]]:
+    expenses: Dict[int, int] = defaultdict(int)
+    for _, occurred_at, amount, _ in rows:
+        # Income-only months still belong to the series
+        expenses[_month_index(occurred_at)] -= min(amount, 0)
+    first, last = min(expenses), max(expenses)
+    series = [expenses.get(month, 0) for month in range(first, last + 1)]
+    averages = []
+    for index in range(len(series)):
+        window = series[max(0, index - WINDOW + 1):index + 1]
+        averages.append(sum(window) / len(window))
+    changes = [
+        (series[index] - series[index - 1]) * 100 / series[index - 1] if series[index - 1] else math.nan
+        for index in range(1, len(series))
+    ]
+    return series, averages, changes
+
+
+def naive_percentiles(rows: List[tuple]) -> Dict[float, float]:
+    sizes = sorted(-amount for _, _, amount, _ in rows if amount < 0)
+    result = {}
+    for percentile in PERCENTILES:
+        position = (len(sizes) - 1) * percentile / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, len(sizes) - 1)
+        result[percentile] = sizes[lower] + (sizes[upper] - sizes[lower]) * (position - lower)
+    return result
+
+
+def naive_digests(rows: List[tuple], month: date) -> Dict[int, Dict[str, object]]:
+    current = (month.year - 1970) * 12 + month.month - 1
+    totals: Dict[int, List[int]] = {}
+    categories: Dict[int, Dict[str, int]] = {}
+    for user_id, occurred_at, amount, category in rows:
+        user_totals = totals.setdefault(user_id, [0, 0, 0])
+        offset = _month_index(occurred_at)
+        if offset == current:
+            if amount > 0:
+                user_totals[0] += amount
+            else:
+                user_totals[1] -= amount
+                user_categories = categories.setdefault(user_id, {})
+                user_categories[category] = user_categories.get(category, 0) - amount
+        elif offset == current - 1 and amount < 0:
+            user_totals[2] -= amount
+    return {
+        user_id: {
+            "income_minor": income,
+            "expense_minor": expense,
+            "previous_expense_minor": previous,
+            "expense_change_percent": (expense - previous) * 100 / previous if previous else None,
+            "top_category": (
+                max(sorted(categories[user_id].items()), key=lambda item: item[1])[0]
+                if expense else None
+            ),
+        }
+        for user_id, (income, expense, previous) in totals.items()
+    }
+
+
+def vector_trend(ledger: LedgerArrays) -> Tuple[List[int], List[float], List[float]]:
+    _, _, expense = analytics.monthly_totals(ledger)
+    _, percent = analytics.month_over_month(expense)
+    return expense.tolist(), analytics.rolling_average(expense, WINDOW).tolist(), percent.tolist()
+
+
+def _same(left, right) -> bool:
+    """Compare results, treating NaN as equal and allowing float rounding."""
+    if isinstance(left, dict):
+        return left.keys() == right.keys() and all(_same(left[key], right[key]) for key in left)
+    if isinstance(left, (list, tuple)):
+        return len(left) == len(right) and all(_same(a, b) for a, b in zip(left, right))
+    if isinstance(left, float) or isinstance(right, float):
+        if left is None or right is None:
+            return left is right
+        return (math.isnan(left) and math.isnan(right)) or math.isclose(left, right, rel_tol=1e-9)
+    return left == right
+
+
+def _best_of(repeat: int, function: Callable[[], object]) -> Tuple[float, object]:
+    best, result = math.inf, None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started_at)
+    return best, result
+
+
+def run_size(rows: int, args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    """Time every analytics function and its naive counterpart at one ledger size."""
+    rng = random.Random(rows)
+    single = _make_rows(rows, 1, args.years, rng)
+    many = _make_rows(rows, args.users, args.years, rng)
+    digest_month = date(2020 + args.years // 2, 6, 1)
+
+    load_seconds, single_ledger = _best_of(args.repeat, lambda: LedgerArrays.from_rows(single))
+    many_ledger = LedgerArrays.from_rows(many)
+
+    cases = {
+        "category_breakdown": (
+            lambda: naive_breakdown(single),
+            lambda: analytics.category_breakdown(single_ledger),
+        ),
+        "monthly_trend": (
+            lambda: naive_trend(single),
+            lambda: vector_trend(single_ledger),
+        ),
+        "percentiles": (
+            lambda: naive_percentiles(single),
+            lambda: analytics.amount_percentiles(single_ledger, PERCENTILES),
+        ),
+        "digests_all_users": (
+            lambda: naive_digests(many, digest_month),
+            lambda: analytics.spending_digests(many_ledger, digest_month),
+        ),
+    }
+
+    results: Dict[str, Dict[str, object]] = {
+        "load_arrays": {"vectorized_ms": round(load_seconds * 1000, 3)}
+    }
+    for name, (naive, vectorized) in cases.items():
+        naive_seconds, expected = _best_of(args.repeat, naive)
+        vector_seconds, actual = _best_of(args.repeat, vectorized)
+        results[name] = {
+            "naive_ms": round(naive_seconds * 1000, 3),
+            "vectorized_ms": round(vector_seconds * 1000, 3),
+            "speedup": round(naive_seconds / vector_seconds, 1),
+            "matches": _same(expected, actual),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="ledger sizes")
+    parser.add_argument("--users", type=int, default=1000, help="users sharing the rows in the digest case")
+    parser.add_argument("--years", type=int, default=5, help="years the ledger spans")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best is reported")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = {str(rows): run_size(rows, args) for rows in args.rows}
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({
+            "benchmark": "analytics",
+            "numpy": np.__version__,
+            "parameters": vars(args),
+            "results": results,
+        }))
+        return
+
+    for size, cases in results.items():
+        print(f"{size} rows")
+        for name, metrics in cases.items():
+            if "naive_ms" not in metrics:
+                print(f"  {name:<20} {'':>22} vectorized {metrics['vectorized_ms']:>10} ms")
+                continue
+            print(
+                f"  {name:<20} naive {metrics['naive_ms']:>10} ms  vectorized "
+                f"{metrics['vectorized_ms']:>10} ms  x{metrics['speedup']:<7}"
+                f"{'' if metrics['matches'] else '  MISMATCH'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Benchmark of the AI assistant's answer cache.
+
+Users arrive in waves, open an AI chat session and ask a question drawn
+from a pool of generic financial questions, typed with varying case,
+punctuation and the odd typo, plus questions about their own money that
+must never be answered from the cache. Each mode reports p50/p99 time
+until the reply is complete, cache hits, model calls and the processing
+time stored for cache hits, with the cache off, with exact matching only
+and with approximate matching.
+
+A second pass feeds a longer stream of questions straight into the cache
+and reports the hit rate, answers served for a different question than
+the one asked and the lookup time of each matching mode.
+
+Usage:
+    python -m benchmarks.bench_answer_cache [--users N] [--wave W]
+        [--questions Q] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from aiogram import Dispatcher
+from sqlalchemy import select
+
+from benchmarks.harness import SQLiteDatabase, callback_update, make_bot, percentile, text_update
+from commands.handlers import register_handlers
+from core.ai_client import ai_model
+from core.answer_cache import AnswerCache, answer_cache, normalize_question
+from core.config import config
+from core.logging_config import shutdown_logging
+from database.database import db_manager
+from database.models import Message
+
+# Telegram user IDs of synthetic users start here
+FIRST_USER_ID = 100000
+
+# Generic questions; neighbours such as save/spend or invest/not invest must not share answers
+GENERIC_QUESTIONS = [
+    "How much should I save monthly?",
+    "How much should I spend monthly?",
+    "How much should I save weekly?",
+    "What is an emergency fund?",
+    "What is an index fund?",
+    "How big should my emergency fund be?",
+    "Should I pay off debt or invest?",
+    "How do I start a budget?",
+    "What is the 50/30/20 rule?",
+    "What is the 70/20/10 rule?",
+    "How can I cut my grocery bill?",
+    "Is it better to rent or buy a home?",
+    "How do credit scores work?",
+    "What is compound interest?",
+    "Should I invest in index funds?",
+    "Should I not invest in index funds?",
+    "Should I divest in index funds?",
+    "Is it better to pay off debt or save?",
+    "Is it better to pay off debt or not save?",
+]
+
+# Questions answered with the user's ledger
+PERSONAL_QUESTIONS = [
+    "How much did I spend on food this month?",
+    "Am I saving enough of my income?",
+    "Where does my money go?",
+]
+
+# Share of questions about the user's own money
+PERSONAL_SHARE = 0.15
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    """Swap two adjacent letters of a long word."""
+    words = text.split()
+    candidates = [index for index, word in enumerate(words) if len(word) > 5]
+    if not candidates:
+        return text
+    index = rng.choice(candidates)
+    word = words[index]
+    position = rng.randrange(1, len(word) - 3)
+    words[index] = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return " ".join(words)
+
+
+def _variant(question: str, rng: random.Random) -> str:
+    """Retype a question the way different users would."""
+    roll = rng.random()
+    if roll < 0.3:
+        return question
+    if roll < 0.5:
+        return question.lower().rstrip("?")
+    if roll < 0.65:
+        return "  " + question.upper() + " "
+    if roll < 0.8:
+        return question.replace("?", " ??")
+    return _typo(question, rng)
+
+
+def _questions(count: int, seed: int) -> List[Tuple[int, str]]:
+    """Draw (base question index, text) pairs; personal questions get index -1."""
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(count):
+        if rng.random() < PERSONAL_SHARE:
+            questions.append((-1, rng.choice(PERSONAL_QUESTIONS)))
+        else:
+            # A few questions are far more common than the rest
+            index = min(int(rng.expovariate(0.35)), len(GENERIC_QUESTIONS) - 1)
+            questions.append((index, _variant(GENERIC_QUESTIONS[index], rng)))
+    return questions
+
+
+async def _run_mode(args: argparse.Namespace, size: int, similarity: float) -> Dict[str, float]:
+    answer_cache.max_size = size
+    answer_cache.similarity = similarity
+    before = answer_cache.stats()
+
+    async with SQLiteDatabase():
+        bot = make_bot(args.api_latency_ms / 1000)
+        dp = Dispatcher()
+        register_handlers(dp)
+
+        questions = _questions(args.users, args.seed)
+        user_ids = list(range(FIRST_USER_ID, FIRST_USER_ID + args.users))
+        await asyncio.gather(*(dp.feed_update(bot, callback_update(user_id, "ai_chat")) for user_id in user_ids))
+
+        session = bot.session
+        first_call = len(session.calls)
+        sent_at: Dict[int, float] = {}
+
+        async def ask(user_id: int, text: str) -> None:
+            sent_at[user_id] = time.perf_counter()
+            await dp.feed_update(bot, text_update(user_id, text))
+
+        for offset in range(0, len(user_ids), args.wave):
+            await asyncio.gather(*(
+                ask(user_id, questions[index][1])
+                for index, user_id in enumerate(user_ids[offset:offset + args.wave], start=offset)
+            ))
+
+        last_call: Dict[int, float] = {}
+        for method, called_at in zip(session.calls[first_call:], session.call_times[first_call:]):
+            last_call[method.chat_id] = called_at
+        total = [last_call[user_id] - sent_at[user_id] for user_id in user_ids]
+
+        async with db_manager.session_factory() as db_session:
+            stored = (await db_session.scalars(
+                select(Message.processing_time_ms).where(Message.is_processed == True)
+            )).all()
+
+    # A model reply cannot be complete before its first token
+    hits = [value for value in stored if value < args.first_token_ms]
+    stats = answer_cache.stats()
+    exact_hits = stats["exact_hits"] - before["exact_hits"]
+    similar_hits = stats["similar_hits"] - before["similar_hits"]
+    return {
+        "replies": len(stored),
+        "total_p50_ms": round(percentile(total, 0.50) * 1000, 1),
+        "total_p99_ms": round(percentile(total, 0.99) * 1000, 1),
+        "exact_hits": exact_hits,
+        "similar_hits": similar_hits,
+        "model_calls": len(user_ids) - exact_hits - similar_hits,
+        "hit_processing_p50_ms": percentile(hits, 0.50) if hits else None,
+        "hit_processing_max_ms": max(hits) if hits else None,
+        "stored_hits": len(hits),
+    }
+
+
+def _run_matching(args: argparse.Namespace, similarity: float) -> Dict[str, float]:
+    cache = AnswerCache(max_size=args.cache_size, ttl=3600, similarity=similarity)
+    base_of: Dict[str, int] = {}
+    hits = wrong = 0
+    lookups: List[float] = []
+    for base, text in _questions(args.questions, args.seed + 1):
+        if base < 0:
+            continue
+        started_at = time.perf_counter()
+        entry, _ = cache.get(text)
+        lookups.append(time.perf_counter() - started_at)
+        if entry is None:
+            cache.set(text, f"answer {base}")
+            base_of[normalize_question(text)] = base
+            continue
+        hits += 1
+        if base_of[entry.question] != base:
+            wrong += 1
+
+    top_entry_hits = [entry.hits for entry in cache.top(3)]
+
+    # Fill the cache with unrelated questions to time lookups at its full size
+    for index in range(args.cache_size):
+        cache.set(f"unrelated question number {index} about budgeting", "answer")
+    full_lookups = []
+    for _, text in _questions(1000, args.seed + 2):
+        started_at = time.perf_counter()
+        cache.get(text)
+        full_lookups.append(time.perf_counter() - started_at)
+
+    return {
+        "lookups": len(lookups),
+        "hit_rate": round(hits / len(lookups), 3),
+        "wrong_answers": wrong,
+        "top_entry_hits": top_entry_hits,
+        "lookup_p50_us": round(percentile(lookups, 0.50) * 1e6, 1),
+        "full_cache_lookup_p50_us": round(percentile(full_lookups, 0.50) * 1e6, 1),
+        "full_cache_lookup_p99_us": round(percentile(full_lookups, 0.99) * 1e6, 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run every mode through the dispatcher, then the matching pass.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    ai_model.first_token_delay = args.first_token_ms / 1000
+    ai_model.token_delay = args.token_ms / 1000
+    ai_model.reply_tokens = args.tokens
+    config.AI_STREAM_EDIT_INTERVAL = args.edit_interval
+
+    results = {
+        "off": await _run_mode(args, size=0, similarity=0),
+        "exact": await _run_mode(args, size=args.cache_size, similarity=0),
+        "similar": await _run_mode(args, size=args.cache_size, similarity=args.similarity),
+    }
+    results["matching_exact"] = _run_matching(args, similarity=0)
+    results["matching_similar"] = _run_matching(args, similarity=args.similarity)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="users asking one question each")
+    parser.add_argument("--wave", type=int, default=20, help="users asking at once")
+    parser.add_argument("--questions", type=int, default=1000, help="questions of the matching pass")
+    parser.add_argument("--cache-size", type=int, default=1000, help="answers held by the cache")
+    parser.add_argument("--similarity", type=float, default=0.75, help="approximate match threshold")
+    parser.add_argument("--first-token-ms", type=float, default=500, help="stub model delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=30, help="stub model delay between tokens")
+    parser.add_argument("--tokens", type=int, default=50, help="tokens per reply")
+    parser.add_argument("--edit-interval", type=float, default=1.0, help="seconds between edits")
+    parser.add_argument("--api-latency-ms", type=float, default=50, help="simulated Telegram round trip")
+    parser.add_argument("--seed", type=int, default=7, help="seed of the question draw")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "answer_cache", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("off", "exact", "similar"):
+        metrics = results[mode]
+        print(
+            f"{mode:<8} total p50 {metrics['total_p50_ms']:>7} ms  p99 {metrics['total_p99_ms']:>7} ms  "
+            f"{metrics['exact_hits']:>4} exact + {metrics['similar_hits']:>3} similar hits  "
+            f"{metrics['model_calls']:>4} model calls  "
+            f"stored hit time p50 {metrics['hit_processing_p50_ms']} ms"
+        )
+    for mode in ("matching_exact", "matching_similar"):
+        metrics = results[mode]
+        print(
+            f"{mode:<16} hit rate {metrics['hit_rate']:.1%}  {metrics['wrong_answers']} wrong answers  "
+            f"lookup p50 {metrics['lookup_p50_us']} us  at {args.cache_size} entries "
+            f"p50 {metrics['full_cache_lookup_p50_us']} us  p99 {metrics['full_cache_lookup_p99_us']} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Benchmark of message archival and chunked purging.
+
+Seeds a messages table, with the secondary indexes of create_tables.sql,
+holding the history of many long-ended sessions next to a few active
+ones. Live traffic then reads the history of active sessions and stores
+new message pairs while the archiver moves the old sessions to archive
+files, once deleting everything in a single transaction and once in
+throttled chunks. Each mode reports the p50/p99/max latency of live
+operations during archival, the run time and archive size against the
+rows' size in the table. Afterwards the latency of live operations on the
+trimmed table is compared with the full one, and one session is restored
+and checked against its original rows.
+
+Usage:
+    python -m benchmarks.bench_archive [--sessions S] [--messages M]
+        [--delete-chunk C] [--pause-ms MS] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, text
+
+from benchmarks.harness import SQLiteDatabase, percentile
+from core.archiver import MessageArchiver
+from core.logging_config import shutdown_logging
+from core.message_archive import MessageArchive
+from database.database import db_manager
+from database.models import Message, Session
+from database.services.archive_service import ArchiveService
+from database.services.message_service import MessageService
+from database.services.user_service import UserService
+
+# Secondary indexes of the messages table in create_tables.sql
+MESSAGE_INDEXES = (
+    "CREATE INDEX idx_session_id ON messages (session_id)",
+    "CREATE INDEX idx_user_telegram_message_id ON messages (user_telegram_message_id)",
+    "CREATE INDEX idx_bot_telegram_message_id ON messages (bot_telegram_message_id)",
+    "CREATE INDEX idx_is_processed ON messages (is_processed)",
+    "CREATE INDEX idx_user_sent_at ON messages (user_sent_at)",
+)
+
+# Active sessions receiving live traffic
+ACTIVE_SESSIONS = 20
+
+# Days since the old sessions ended
+ENDED_DAYS_AGO = 200
+
+
+async def _seed(args: argparse.Namespace) -> Tuple[List[int], int]:
+    """Create ended and active sessions with messages; returns active IDs and archived JSON bytes."""
+    user, _ = await UserService.get_or_create_user(telegram_id=1, first_name="Bench")
+    ended_at = datetime.now() - timedelta(days=ENDED_DAYS_AGO)
+    reply = "A good first step is to look at where your money goes each month. " * 4
+
+    async with db_manager.session_factory() as session:
+        for statement in MESSAGE_INDEXES:
+            await session.execute(text(statement))
+
+        await session.execute(insert(Session), [
+            {
+                "user_id": user.id,
+                "is_active": False,
+                "started_at": ended_at - timedelta(minutes=30),
+                "ended_at": ended_at,
+                "last_activity": ended_at,
+            }
+            for _ in range(args.sessions)
+        ] + [
+            {"user_id": user.id, "is_active": True, "started_at": datetime.now(), "last_activity": datetime.now()}
+            for _ in range(ACTIVE_SESSIONS)
+        ])
+        rows = []
+        row_bytes = 0
+        for session_id in range(1, args.sessions + ACTIVE_SESSIONS + 1):
+            for index in range(args.messages):
+                sent_at = ended_at - timedelta(minutes=30) + timedelta(seconds=index)
+                row = {
+                    "session_id": session_id,
+                    "user_telegram_message_id": session_id * 1000 + index,
+                    "user_content": f"How much should I put aside for question {index}?",
+                    "user_sent_at": sent_at,
+                    "bot_telegram_message_id": session_id * 1000 + index + 1,
+                    "bot_content": reply,
+                    "bot_sent_at": sent_at,
+                    "is_processed": True,
+                    "processing_time_ms": 1200,
+                }
+                rows.append(row)
+                if session_id <= args.sessions:
+                    row_bytes += len(json.dumps(row, default=str))
+        for offset in range(0, len(rows), 5000):
+            await session.execute(insert(Message), rows[offset:offset + 5000])
+        await session.commit()
+
+    active_ids = list(range(args.sessions + 1, args.sessions + ACTIVE_SESSIONS + 1))
+    return active_ids, row_bytes
+
+
+class _LiveTraffic:
+    """Reads histories and stores message pairs of active sessions until stopped."""
+
+    def __init__(self, session_ids: List[int], interval: float):
+        self.session_ids = session_ids
+        self.interval = interval
+        self.latencies: List[float] = []
+        self._running = False
+
+    async def _operation(self, index: int) -> None:
+        session_id = self.session_ids[index % len(self.session_ids)]
+        if index % 2:
+            await MessageService.get_session_messages(session_id, limit=20)
+        else:
+            await MessageService.create_message_pair(
+                session_id=session_id, user_content="live question", bot_content="live answer"
+            )
+
+    async def run(self, operations: int = None) -> None:
+        self._running = True
+        index = 0
+        while self._running and (operations is None or index < operations):
+            started_at = time.perf_counter()
+            await self._operation(index)
+            self.latencies.append(time.perf_counter() - started_at)
+            index += 1
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "live_ops": len(self.latencies),
+            "live_p50_ms": round(percentile(self.latencies, 0.50) * 1000, 2),
+            "live_p99_ms": round(percentile(self.latencies, 0.99) * 1000, 2),
+            "live_max_ms": round(max(self.latencies) * 1000, 2),
+        }
+
+
+async def _run_mode(args: argparse.Namespace, chunked: bool) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="bot-archive-") as directory:
+        async with SQLiteDatabase():
+            active_ids, row_bytes = await _seed(args)
+
+            baseline = _LiveTraffic(active_ids, args.live_interval_ms / 1000)
+            await baseline.run(operations=args.live_ops)
+            results.update({f"full_table_{key}": value for key, value in baseline.summary().items() if key != "live_ops"})
+
+            archive = MessageArchive(directory, instance_id="bench")
+            if chunked:
+                archiver = MessageArchiver(
+                    archive,
+                    after_days=90,
+                    session_batch=args.session_batch,
+                    delete_chunk=args.delete_chunk,
+                    chunk_pause=args.pause_ms / 1000,
+                    max_rows=10 ** 9,
+                )
+            else:
+                archiver = MessageArchiver(
+                    archive,
+                    after_days=90,
+                    session_batch=args.sessions,
+                    delete_chunk=10 ** 9,
+                    chunk_pause=0,
+                    max_rows=10 ** 9,
+                )
+
+            live = _LiveTraffic(active_ids, args.live_interval_ms / 1000)
+            live_task = asyncio.create_task(live.run())
+            started_at = time.perf_counter()
+            totals = await archiver.archive_old_messages()
+            elapsed = time.perf_counter() - started_at
+            live.stop()
+            await live_task
+            results.update(live.summary())
+
+            after = _LiveTraffic(active_ids, args.live_interval_ms / 1000)
+            await after.run(operations=args.live_ops)
+            results.update({f"trimmed_table_{key}": value for key, value in after.summary().items() if key != "live_ops"})
+
+            # Restore one session and compare it with what was archived
+            session_id = args.sessions // 2
+            location = archive.locate(session_id)
+            archived_rows = archive.read(location)
+            restore_started_at = time.perf_counter()
+            restored = await archiver.restore_session(session_id)
+            restore_ms = (time.perf_counter() - restore_started_at) * 1000
+            stored_rows = await ArchiveService.get_message_rows([session_id])
+
+            results.update({
+                "archived_rows": totals["rows"],
+                "deleted_rows": totals["deleted"],
+                "archive_seconds": round(elapsed, 2),
+                "rows_per_sec": round(totals["rows"] / elapsed),
+                "archive_bytes": archive.stats()["bytes"],
+                "compression_ratio": round(row_bytes / archive.stats()["bytes"], 1),
+                "restore_ms": round(restore_ms, 1),
+                "restored_rows": restored,
+                "restore_consistent": stored_rows == archived_rows,
+            })
+    return results
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run archival with a single delete and with throttled chunks.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    return {
+        "single_delete": await _run_mode(args, chunked=False),
+        "chunked": await _run_mode(args, chunked=True),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000, help="ended sessions to archive")
+    parser.add_argument("--messages", type=int, default=50, help="message pairs per session")
+    parser.add_argument("--session-batch", type=int, default=100, help="sessions archived together")
+    parser.add_argument("--delete-chunk", type=int, default=500, help="rows deleted per transaction")
+    parser.add_argument("--pause-ms", type=float, default=20, help="pause between delete transactions")
+    parser.add_argument("--live-interval-ms", type=float, default=5, help="pause between live operations")
+    parser.add_argument("--live-ops", type=int, default=400, help="live operations timed before and after")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "archive", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("single_delete", "chunked"):
+        metrics = results[mode]
+        print(
+            f"{mode:<14} {metrics['archived_rows']} rows in {metrics['archive_seconds']}s  "
+            f"live p50 {metrics['live_p50_ms']:>7} ms  p99 {metrics['live_p99_ms']:>7} ms  "
+            f"max {metrics['live_max_ms']:>8} ms  "
+            f"{metrics['archive_bytes']} archive bytes ({metrics['compression_ratio']}x)"
+        )
+    metrics = results["chunked"]
+    print(
+        f"live ops on the full table p50 {metrics['full_table_live_p50_ms']} ms  "
+        f"p99 {metrics['full_table_live_p99_ms']} ms, on the trimmed table "
+        f"p50 {metrics['trimmed_table_live_p50_ms']} ms  p99 {metrics['trimmed_table_live_p99_ms']} ms"
+    )
+    print(
+        f"restored {metrics['restored_rows']} rows of one session in {metrics['restore_ms']} ms, "
+        f"consistent: {metrics['restore_consistent']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark of report chart delivery.
+
+Sends the income vs expenses chart of many users concurrently, first
+rendered inline on the event loop as a baseline, then through the
+ChartService on a cold cache, from the disk cache and by Telegram file_id.
+A probe task measures how long the event loop is blocked in each mode.
+
+Usage:
+    python -m benchmarks.bench_charts [--charts N] [--months M]
+        [--workers W] [--api-latency-ms MS] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+from aiogram.methods import SendPhoto
+from aiogram.types import BufferedInputFile, Chat, Message
+
+from benchmarks.harness import make_bot, percentile
+from core.chart_render import render_income_expense_chart
+from core.charts import ChartService, chart_key, data_version
+from core.logging_config import shutdown_logging
+
+CHART_TYPE = "income_expense"
+
+
+class LoopLagProbe:
+    """Measures the worst delay of a short periodic sleep on the event loop."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, time.perf_counter() - started_at - self.interval)
+
+    def __enter__(self) -> "LoopLagProbe":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+
+def _make_charts(count: int, months: int, rng: random.Random) -> List[dict]:
+    labels = [f"M{index + 1}" for index in range(months)]
+    charts = []
+    for user_id in range(1, count + 1):
+        income = [rng.randint(0, 800000) for _ in range(months)]
+        expense = [rng.randint(0, 600000) for _ in range(months)]
+        charts.append({
+            "user_id": user_id,
+            "key": chart_key(user_id, "bench", CHART_TYPE, data_version("USD", income, expense)),
+            "args": (labels, income, expense, "USD"),
+        })
+    return charts
+
+
+async def _run_mode(send: Callable[[dict], Awaitable[None]], charts: List[dict]) -> Dict[str, float]:
+    latencies = []
+
+    async def one(chart: dict) -> None:
+        started_at = time.perf_counter()
+        await send(chart)
+        latencies.append(time.perf_counter() - started_at)
+
+    with LoopLagProbe() as probe:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(one(chart) for chart in charts))
+        elapsed = time.perf_counter() - started_at
+        await asyncio.sleep(0)
+
+    return {
+        "charts_per_sec": round(len(charts) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_loop_lag_ms": round(probe.max_lag * 1000, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run every delivery mode over the same charts.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    bot = make_bot(args.api_latency_ms / 1000)
+    charts = _make_charts(args.charts, args.months, random.Random(0))
+    cache_dir = tempfile.mkdtemp(prefix="bench-charts-")
+    service = ChartService(cache_dir=cache_dir, max_bytes=1 << 30, workers=args.workers)
+
+    def message_for(chart: dict) -> Message:
+        return Message(
+            message_id=1, date=datetime.now(), chat=Chat(id=chart["user_id"], type="private")
+        ).as_(bot)
+
+    async def send_inline(chart: dict) -> None:
+        image = render_income_expense_chart(*chart["args"])
+        await message_for(chart).answer_photo(BufferedInputFile(image, filename="chart.png"))
+
+    async def send_service(chart: dict) -> None:
+        await service.send_chart(
+            message_for(chart), chart["key"], CHART_TYPE, render_income_expense_chart, *chart["args"]
+        )
+
+    results = {}
+    try:
+        # Start the workers first so process spawn time is not counted as rendering
+        await service.render("warmup", CHART_TYPE, render_income_expense_chart, *charts[0]["args"])
+        results["inline_render"] = await _run_mode(send_inline, charts)
+        results["cold_cache"] = await _run_mode(send_service, charts)
+        for chart in charts:
+            service.cache.invalidate(f"{chart['key']}:file_id:{bot.id}")
+        results["disk_cache"] = await _run_mode(send_service, charts)
+        results["file_id"] = await _run_mode(send_service, charts)
+
+        uploads = sum(
+            1 for call in bot.session.calls
+            if isinstance(call, SendPhoto) and not isinstance(call.photo, str)
+        )
+        results["uploads"] = {"count": uploads}
+        results["cache"] = service.cache.stats()
+    finally:
+        service.shutdown()
+        await bot.session.close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--charts", type=int, default=50, help="distinct charts, one per user")
+    parser.add_argument("--months", type=int, default=12, help="months per chart")
+    parser.add_argument("--workers", type=int, default=2, help="render processes")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="simulated Telegram round trip")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "charts", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("inline_render", "cold_cache", "disk_cache", "file_id"):
+        metrics = results[mode]
+        print(
+            f"{mode:<14} {metrics['charts_per_sec']:>9} charts/s  p50 {metrics['p50_ms']:>9} ms  "
+            f"p99 {metrics['p99_ms']:>9} ms  max loop lag {metrics['max_loop_lag_ms']:>9} ms"
+        )
+    print(f"{'uploads':<14} {results['uploads']['count']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark of conversation context reads for AI prompts.
+
+Seeds many active sessions with a long message history, then runs rounds
+of conversation turns: each turn reads the session's latest turns and
+stores a new message pair. The history is read with a query on every turn
+as a baseline, then from the in-memory conversation context, which reads
+it once per session after a cold start. Reports turns/sec, p50/p99 latency
+of the history read and statements per turn, and checks that both give
+the same turns.
+
+Usage:
+    python -m benchmarks.bench_context [--sessions S] [--history H]
+        [--rounds R] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import insert
+
+from benchmarks.harness import SQLiteDatabase, percentile
+from core.conversation import conversation_context
+from core.logging_config import shutdown_logging
+from database.database import db_manager
+from database.models import Message
+from database.services.message_service import MessageService
+from database.services.session_service import SessionService
+from database.services.user_service import UserService
+
+
+async def _seed(sessions: int, history: int) -> List[int]:
+    session_ids = []
+    rows = []
+    started_at = datetime.now() - timedelta(hours=1)
+    for telegram_id in range(1, sessions + 1):
+        user, _ = await UserService.get_or_create_user(telegram_id=telegram_id, first_name="Bench")
+        session_obj = await SessionService.create_session(user_id=user.id)
+        session_ids.append(session_obj.id)
+        for index in range(history):
+            sent_at = started_at + timedelta(seconds=index)
+            rows.append({
+                "session_id": session_obj.id,
+                "user_content": f"question {index}",
+                "user_sent_at": sent_at,
+                "bot_content": f"answer {index}",
+                "bot_sent_at": sent_at,
+                "is_processed": True,
+            })
+
+    async with db_manager.session_factory() as session:
+        for offset in range(0, len(rows), 5000):
+            await session.execute(insert(Message), rows[offset:offset + 5000])
+        await session.commit()
+    return session_ids
+
+
+async def _read_by_query(session_id: int) -> List[str]:
+    messages = await MessageService.get_session_messages(session_id, limit=conversation_context.max_turns)
+    return [message.user_content for message in reversed(messages)]
+
+
+async def _read_from_context(session_id: int) -> List[str]:
+    turns = await MessageService.get_conversation_context(session_id)
+    return [turn.user_content for turn in turns]
+
+
+async def _run_mode(
+    db: SQLiteDatabase,
+    read: Callable[[int], Awaitable[List[str]]],
+    session_ids: List[int],
+    rounds: int,
+    mode: str,
+) -> Dict[str, float]:
+    latencies = []
+    statements = 0
+    started_at = time.perf_counter()
+    for round_index in range(rounds):
+        for session_id in session_ids:
+            db.statements.reset()
+            read_started_at = time.perf_counter()
+            await read(session_id)
+            latencies.append(time.perf_counter() - read_started_at)
+            statements += db.statements.count
+
+            await MessageService.create_message_pair(
+                session_id=session_id,
+                user_content=f"{mode} {round_index}",
+                bot_content=f"{mode} reply {round_index}",
+            )
+    elapsed = time.perf_counter() - started_at
+    turns = rounds * len(session_ids)
+    return {
+        "turns": turns,
+        "turns_per_sec": round(turns / elapsed, 1),
+        "read_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "read_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "read_statements_per_turn": round(statements / turns, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Seed the sessions and run both modes.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    results = {}
+    async with SQLiteDatabase() as db:
+        session_ids = await _seed(args.sessions, args.history)
+
+        results["query"] = await _run_mode(db, _read_by_query, session_ids, args.rounds, "query")
+        # Cold start: buffers are filled from the database on first access
+        conversation_context.clear()
+        results["context"] = await _run_mode(db, _read_from_context, session_ids, args.rounds, "context")
+
+        consistent = True
+        for session_id in session_ids:
+            if await _read_from_context(session_id) != await _read_by_query(session_id):
+                consistent = False
+                break
+        results["context"]["consistent"] = consistent
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="active sessions")
+    parser.add_argument("--history", type=int, default=200, help="stored message pairs per session")
+    parser.add_argument("--rounds", type=int, default=10, help="turns per session")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "context", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("query", "context"):
+        metrics = results[mode]
+        print(
+            f"{mode:<8} {metrics['turns_per_sec']:>9} turns/s  "
+            f"read p50 {metrics['read_p50_ms']:>7} ms  p99 {metrics['read_p99_ms']:>7} ms  "
+            f"{metrics['read_statements_per_turn']:>6} statements/turn"
+        )
+    print(f"context matches query: {results['context']['consistent']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+End-to-end throughput benchmark of the update dispatcher.
+
+Builds the Dispatcher through register_handlers and feeds it synthetic
+updates with feed_update. Telegram calls go to a recording fake session
+and the database is a temporary SQLite file, so nothing leaves the
+machine.
+
+Scenarios:
+    start_storm  every user sends /start, once per round
+    ai_chat      every user presses the AI chat button, once per round
+    sweeper      one database sweep over expired sessions
+
+Usage:
+    python -m benchmarks.bench_dispatcher [--users N] [--rounds N]
+        [--concurrency N] [--sessions M] [--api-latency-ms MS]
+        [--scenario NAME ...] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import SendMessage
+from aiogram.types import Update
+from sqlalchemy import insert
+
+from benchmarks.harness import (
+    SQLiteDatabase,
+    callback_update,
+    command_update,
+    make_bot,
+    percentile,
+)
+from commands.handlers import register_handlers
+from core.config import config
+from core.logging_config import shutdown_logging
+from core.session_timeout import SessionTimeoutHandler
+from database.database import db_manager
+from database.models import Session, User
+
+# Telegram user IDs of synthetic users start here
+FIRST_USER_ID = 100000
+
+
+async def _feed(
+    dp: Dispatcher, bot: Bot, updates: List[Update], concurrency: int, latencies: List[float]
+) -> int:
+    """Feed updates with bounded concurrency, returning the number that raised."""
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def feed_one(update: Update) -> None:
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await dp.feed_update(bot, update)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    await asyncio.gather(*(feed_one(update) for update in updates))
+    return errors
+
+
+async def _run_updates(
+    build_update: Callable[[int], Update], args: argparse.Namespace
+) -> Dict[str, float]:
+    """Feed one update per user per round and summarize the run."""
+    async with SQLiteDatabase() as database:
+        bot = make_bot(args.api_latency_ms / 1000)
+        dp = Dispatcher()
+        register_handlers(dp)
+
+        user_ids = range(FIRST_USER_ID, FIRST_USER_ID + args.users)
+        latencies: List[float] = []
+        errors = 0
+        database.statements.reset()
+        started_at = time.perf_counter()
+        for _ in range(args.rounds):
+            updates = [build_update(user_id) for user_id in user_ids]
+            errors += await _feed(dp, bot, updates, args.concurrency, latencies)
+        elapsed = time.perf_counter() - started_at
+
+        total = len(latencies)
+        return {
+            "updates": total,
+            "errors": errors,
+            "seconds": round(elapsed, 3),
+            "updates_per_sec": round(total / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "db_statements_per_update": round(database.statements.count / total, 2),
+            "api_calls_per_update": round(len(bot.session.calls) / total, 2),
+        }
+
+
+async def run_start_storm(args: argparse.Namespace) -> Dict[str, float]:
+    """Every user sends /start; rounds after the first are returning users."""
+    return await _run_updates(lambda user_id: command_update(user_id, "start"), args)
+
+
+async def run_ai_chat(args: argparse.Namespace) -> Dict[str, float]:
+    """Every user presses AI chat; the first round creates sessions, later ones resume them."""
+    return await _run_updates(lambda user_id: callback_update(user_id, "ai_chat"), args)
+
+
+async def run_sweeper(args: argparse.Namespace) -> Dict[str, float]:
+    """Sweep a table holding the given number of expired sessions."""
+    async with SQLiteDatabase() as database:
+        expired_at = datetime.now() - timedelta(minutes=config.get_session_timeout() + 1)
+        async with db_manager.session_factory() as session:
+            await session.execute(
+                insert(User).values(
+                    [
+                        {"id": offset + 1, "telegram_id": FIRST_USER_ID + offset, "first_name": "User"}
+                        for offset in range(args.sessions)
+                    ]
+                )
+            )
+            await session.execute(
+                insert(Session).values(
+                    [
+                        {
+                            "user_id": offset + 1,
+                            "is_active": True,
+                            "started_at": expired_at,
+                            "last_activity": expired_at,
+                        }
+                        for offset in range(args.sessions)
+                    ]
+                )
+            )
+            await session.commit()
+
+        bot = make_bot(args.api_latency_ms / 1000)
+        handler = SessionTimeoutHandler(bot)
+        database.statements.reset()
+        started_at = time.perf_counter()
+        await handler.check_and_handle_expired_sessions()
+        elapsed = time.perf_counter() - started_at
+
+        return {
+            "sessions": args.sessions,
+            "notified": bot.session.count(SendMessage),
+            "seconds": round(elapsed, 3),
+            "sessions_per_sec": round(args.sessions / elapsed, 1),
+            "db_statements": database.statements.count,
+            "db_statements_per_session": round(database.statements.count / args.sessions, 3),
+        }
+
+
+SCENARIOS = {
+    "start_storm": run_start_storm,
+    "ai_chat": run_ai_chat,
+    "sweeper": run_sweeper,
+}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run the selected scenarios one after another.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by scenario name
+    """
+    results = {}
+    for name in args.scenario:
+        results[name] = await SCENARIOS[name](args)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=500, help="synthetic users per scenario")
+    parser.add_argument("--rounds", type=int, default=2, help="updates per user")
+    parser.add_argument("--concurrency", type=int, default=50, help="updates in flight")
+    parser.add_argument("--sessions", type=int, default=2000, help="expired sessions to sweep")
+    parser.add_argument(
+        "--api-latency-ms", type=float, default=0.0, help="simulated Telegram round trip"
+    )
+    parser.add_argument(
+        "--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+        help="scenarios to run",
+    )
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "dispatcher", "parameters": vars(args), "results": results}))
+        return
+
+    for name, metrics in results.items():
+        print(name)
+        for key, value in metrics.items():
+            print(f"  {key:<28} {value:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark of the LLM gateway against a local stand-in model server.
+
+Scenarios:
+    fairness      one user sends a burst of messages just before many users
+                  send one each; requests go straight to the model server
+                  versus through the gateway's per-user round robin
+    batching      many users ask at once through the gateway with one
+                  request per model call versus micro-batches
+    cancellation  half of the queued requests belong to sessions that end
+                  while they wait; reports how many still reach the model
+
+Usage:
+    python -m benchmarks.bench_gateway [--users N] [--burst B] [--slots S]
+        [--max-batch M] [--tokens T] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.harness import percentile
+from benchmarks.model_server import StandInModelServer
+from core.ai_client import HTTPModel
+from core.llm_gateway import GatewayCancelled, LLMGateway
+from core.logging_config import shutdown_logging
+
+# User of the burst in the fairness scenario
+CHATTY_USER = 0
+
+
+def _prompt(user_id: int, index: int) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": f"question {index} from user {user_id}"}]
+
+
+class _Timing:
+    """First token and completion times of one request."""
+
+    __slots__ = ("user_id", "first_token", "total")
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.first_token: Optional[float] = None
+        self.total: Optional[float] = None
+
+
+async def _consume(tokens, timing: _Timing, started_at: float) -> None:
+    async for _ in tokens:
+        if timing.first_token is None:
+            timing.first_token = time.perf_counter() - started_at
+    timing.total = time.perf_counter() - started_at
+
+
+def _summary(timings: List[_Timing]) -> Dict[str, float]:
+    return {
+        "first_token_p50_ms": round(percentile([t.first_token for t in timings], 0.50) * 1000, 1),
+        "first_token_p99_ms": round(percentile([t.first_token for t in timings], 0.99) * 1000, 1),
+        "total_p50_ms": round(percentile([t.total for t in timings], 0.50) * 1000, 1),
+        "total_p99_ms": round(percentile([t.total for t in timings], 0.99) * 1000, 1),
+    }
+
+
+async def _server(args: argparse.Namespace) -> StandInModelServer:
+    server = StandInModelServer(
+        port=0,
+        slots=args.slots,
+        first_token_delay=args.first_token_ms / 1000,
+        token_delay=args.token_ms / 1000,
+        tokens=args.tokens,
+    )
+    await server.start()
+    return server
+
+
+async def _fairness(args: argparse.Namespace, through_gateway: bool) -> Dict[str, float]:
+    server = await _server(args)
+    model = HTTPModel(server.url)
+    gateway = LLMGateway(
+        model, max_concurrency=args.slots, max_batch=1, user_queue_size=args.burst, timeout=600
+    )
+    if through_gateway:
+        await gateway.start()
+
+    submissions = [(CHATTY_USER, index) for index in range(args.burst)]
+    submissions += [(user_id, 0) for user_id in range(1, args.users + 1)]
+    timings = []
+    tasks = []
+    started_at = time.perf_counter()
+    for user_id, index in submissions:
+        timing = _Timing(user_id)
+        timings.append(timing)
+        if through_gateway:
+            tokens = gateway.submit(user_id, user_id, _prompt(user_id, index)).tokens()
+        else:
+            tokens = model.stream(_prompt(user_id, index))
+        tasks.append(asyncio.create_task(_consume(tokens, timing, started_at)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+
+    await gateway.stop()
+    await model.close()
+    await server.stop()
+
+    results = {"seconds": round(elapsed, 3)}
+    results.update({f"others_{key}": value for key, value in _summary(
+        [timing for timing in timings if timing.user_id != CHATTY_USER]
+    ).items()})
+    results["chatty_total_p99_ms"] = _summary(
+        [timing for timing in timings if timing.user_id == CHATTY_USER]
+    )["total_p99_ms"]
+    return results
+
+
+async def _batching(args: argparse.Namespace, max_batch: int) -> Dict[str, float]:
+    server = await _server(args)
+    model = HTTPModel(server.url)
+    gateway = LLMGateway(model, max_concurrency=args.slots, max_batch=max_batch, timeout=600)
+    await gateway.start()
+
+    timings = [_Timing(user_id) for user_id in range(args.users)]
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        _consume(gateway.submit(timing.user_id, timing.user_id, _prompt(timing.user_id, 0)).tokens(), timing, started_at)
+        for timing in timings
+    ))
+    elapsed = time.perf_counter() - started_at
+
+    await gateway.stop()
+    await model.close()
+    await server.stop()
+
+    results = {
+        "requests_per_sec": round(len(timings) / elapsed, 1),
+        "model_calls": server.calls,
+        "max_active_calls": server.max_active,
+    }
+    results.update(_summary(timings))
+    return results
+
+
+async def _cancellation(args: argparse.Namespace) -> Dict[str, float]:
+    server = await _server(args)
+    model = HTTPModel(server.url)
+    gateway = LLMGateway(model, max_concurrency=args.slots, max_batch=1, timeout=600)
+    await gateway.start()
+
+    requests = [gateway.submit(user_id, user_id, _prompt(user_id, 0)) for user_id in range(args.users)]
+    outcomes = {"completed": 0, "cancelled": 0}
+
+    async def consume(request) -> None:
+        try:
+            async for _ in request.tokens():
+                pass
+            outcomes["completed"] += 1
+        except GatewayCancelled:
+            outcomes["cancelled"] += 1
+
+    started_at = time.perf_counter()
+    tasks = [asyncio.create_task(consume(request)) for request in requests]
+    await asyncio.sleep(0.05)
+    # Sessions of every other user end while their requests are queued
+    for user_id in range(1, args.users, 2):
+        gateway.cancel_session(user_id)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+
+    await gateway.stop()
+    await model.close()
+    await server.stop()
+    return {
+        "submitted": len(requests),
+        "completed": outcomes["completed"],
+        "cancelled": outcomes["cancelled"],
+        "prompts_sent_to_model": server.prompts,
+        "calls_aborted": server.aborted,
+        "seconds": round(elapsed, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run every scenario.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by scenario and mode
+    """
+    return {
+        "fairness_direct": await _fairness(args, through_gateway=False),
+        "fairness_gateway": await _fairness(args, through_gateway=True),
+        "batching_single": await _batching(args, max_batch=1),
+        "batching_micro": await _batching(args, max_batch=args.max_batch),
+        "cancellation": await _cancellation(args),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=32, help="users asking at once")
+    parser.add_argument("--burst", type=int, default=16, help="messages of the chatty user")
+    parser.add_argument("--slots", type=int, default=4, help="model calls run at once")
+    parser.add_argument("--max-batch", type=int, default=8, help="requests per batched model call")
+    parser.add_argument("--first-token-ms", type=float, default=200, help="model prompt processing per call")
+    parser.add_argument("--token-ms", type=float, default=20, help="model time per generation step")
+    parser.add_argument("--tokens", type=int, default=50, help="tokens per reply")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "gateway", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("fairness_direct", "fairness_gateway"):
+        metrics = results[mode]
+        print(
+            f"{mode:<17} others first token p50 {metrics['others_first_token_p50_ms']:>8} ms  "
+            f"p99 {metrics['others_first_token_p99_ms']:>8} ms  "
+            f"done p99 {metrics['others_total_p99_ms']:>8} ms  "
+            f"chatty user done {metrics['chatty_total_p99_ms']:>8} ms"
+        )
+    for mode in ("batching_single", "batching_micro"):
+        metrics = results[mode]
+        print(
+            f"{mode:<17} {metrics['requests_per_sec']:>6} requests/s  "
+            f"first token p50 {metrics['first_token_p50_ms']:>8} ms  done p99 {metrics['total_p99_ms']:>8} ms  "
+            f"{metrics['model_calls']} model calls"
+        )
+    metrics = results["cancellation"]
+    print(
+        f"{'cancellation':<17} {metrics['completed']} completed, {metrics['cancelled']} cancelled, "
+        f"{metrics['prompts_sent_to_model']} of {metrics['submitted']} prompts reached the model, "
+        f"{metrics['calls_aborted']} calls aborted"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark of the transaction ledger at large per-user sizes.
+
+Seeds one user's ledger with N transactions spread over several years,
+next to smaller ledgers of other users, through the batch insert API and
+then times the range-scan queries the bot issues.
+
+Usage:
+    python -m benchmarks.bench_ledger [--rows N [N ...]] [--years Y]
+        [--queries Q] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import insert
+
+from benchmarks.harness import SQLiteDatabase, percentile
+from core.logging_config import shutdown_logging
+from database.database import db_manager
+from database.models import User
+from database.services.rollup_service import RollupService, month_start, shift_month
+from database.services.transaction_service import TransactionService
+
+# Database ID of the user with the large ledger
+USER_ID = 1
+
+CATEGORIES = ["Food", "Transport", "Housing", "Utilities", "Health", "Salary"]
+
+
+def _make_rows(user_id: int, count: int, start: datetime, span: timedelta, rng: random.Random) -> List[dict]:
+    step = span / count
+    return [
+        {
+            "user_id": user_id,
+            "amount_minor": rng.randint(100, 500000) * (1 if rng.random() < 0.2 else -1),
+            "category": rng.choice(CATEGORIES),
+            "occurred_at": start + step * index,
+        }
+        for index in range(count)
+    ]
+
+
+async def _time_queries(
+    count: int, query: Callable[[], Awaitable[object]]
+) -> Dict[str, float]:
+    latencies = []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        await query()
+        latencies.append(time.perf_counter() - started_at)
+    return {
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def run_size(rows: int, args: argparse.Namespace) -> Dict[str, object]:
+    """Seed a ledger of the given size and time every query type against it."""
+    rng = random.Random(rows)
+    span = timedelta(days=365 * args.years)
+    start = datetime(2020, 1, 1)
+
+    async with SQLiteDatabase():
+        async with db_manager.session_factory() as session:
+            await session.execute(
+                insert(User).values(
+                    [
+                        {"id": user_id, "telegram_id": 100000 + user_id}
+                        for user_id in range(1, args.other_users + 2)
+                    ]
+                )
+            )
+            await session.commit()
+
+        ledger = _make_rows(USER_ID, rows, start, span, rng)
+        started_at = time.perf_counter()
+        await TransactionService.add_transactions(ledger)
+        insert_seconds = time.perf_counter() - started_at
+
+        for user_id in range(2, args.other_users + 2):
+            await TransactionService.add_transactions(
+                _make_rows(user_id, args.other_rows, start, span, rng)
+            )
+
+        def random_month() -> datetime:
+            return start + timedelta(days=rng.randrange(0, 365 * args.years - 31))
+
+        def random_cursor():
+            row = ledger[rng.randrange(len(ledger))]
+            return row["occurred_at"], rng.randrange(1, rows)
+
+        async def month_page():
+            month = random_month()
+            await TransactionService.get_transactions(USER_ID, month, month + timedelta(days=31), limit=100)
+
+        async def deep_keyset_page():
+            await TransactionService.get_transactions(USER_ID, limit=100, after=random_cursor())
+
+        async def month_totals():
+            month = random_month()
+            await TransactionService.get_totals(USER_ID, month, month + timedelta(days=31))
+
+        async def year_totals():
+            year = start + timedelta(days=rng.randrange(0, 365 * (args.years - 1)))
+            await TransactionService.get_totals(USER_ID, year, year + timedelta(days=365))
+
+        async def recent():
+            await TransactionService.get_recent_transactions(USER_ID, limit=10)
+
+        def random_report_start():
+            return shift_month(month_start(start), rng.randrange(0, 12 * (args.years - 1)))
+
+        async def report_rollups():
+            first_month = random_report_start()
+            await RollupService.get_monthly_rollups(USER_ID, first_month, shift_month(first_month, 12))
+
+        async def report_ledger():
+            first_month = random_report_start()
+            for offset in range(12):
+                month = datetime.combine(shift_month(first_month, offset), datetime.min.time())
+                next_month = datetime.combine(shift_month(first_month, offset + 1), datetime.min.time())
+                await TransactionService.get_totals(USER_ID, month, next_month)
+
+        queries = {
+            "month_page": await _time_queries(args.queries, month_page),
+            "deep_keyset_page": await _time_queries(args.queries, deep_keyset_page),
+            "recent_10": await _time_queries(args.queries, recent),
+            "month_totals": await _time_queries(args.queries, month_totals),
+            "year_totals": await _time_queries(max(1, args.queries // 10), year_totals),
+            "report_12m_rollups": await _time_queries(args.queries, report_rollups),
+            "report_12m_ledger": await _time_queries(max(1, args.queries // 10), report_ledger),
+        }
+
+        started_at = time.perf_counter()
+        scanned = 0
+        async for _ in TransactionService.iter_transactions(USER_ID, page_size=1000):
+            scanned += 1
+        scan_seconds = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        await RollupService.rebuild(USER_ID)
+        rebuild_seconds = time.perf_counter() - started_at
+
+        return {
+            "rows": rows,
+            "insert_rows_per_sec": round(rows / insert_seconds, 1),
+            "full_scan_rows_per_sec": round(scanned / scan_seconds, 1),
+            "rollup_rebuild_rows_per_sec": round(rows / rebuild_seconds, 1),
+            "queries": queries,
+        }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    """
+    Run the benchmark for every ledger size.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, object]]: Results keyed by ledger size
+    """
+    return {str(rows): await run_size(rows, args) for rows in args.rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 300000], help="ledger sizes")
+    parser.add_argument("--years", type=int, default=5, help="years the ledger spans")
+    parser.add_argument("--other-users", type=int, default=20, help="other users sharing the table")
+    parser.add_argument("--other-rows", type=int, default=2000, help="transactions per other user")
+    parser.add_argument("--queries", type=int, default=200, help="timed queries per query type")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "ledger", "parameters": vars(args), "results": results}))
+        return
+
+    for size, result in results.items():
+        print(f"{size} rows")
+        print(f"  {'insert_rows_per_sec':<28} {result['insert_rows_per_sec']:>12}")
+        print(f"  {'full_scan_rows_per_sec':<28} {result['full_scan_rows_per_sec']:>12}")
+        print(f"  {'rollup_rebuild_rows_per_sec':<28} {result['rollup_rebuild_rows_per_sec']:>12}")
+        for name, metrics in result["queries"].items():
+            print(f"  {name:<28} p50 {metrics['p50_ms']:>9} ms  p99 {metrics['p99_ms']:>9} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark of per-call logging overhead on hot paths.
+
+Compares eager f-string logging with the LazyLogger facade for disabled
+DEBUG records, and measures the sampled and rate-limited variants for
+enabled ones. Records go to a NullHandler so only the logging machinery
+is timed.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls N] [--json]
+"""
+
+import argparse
+import json
+import logging
+import timeit
+
+from core.logging_config import LazyLogger
+
+
+class _QueryResult:
+    """Stand-in for an object with a costly repr, like a SQLAlchemy result."""
+
+    def __repr__(self) -> str:
+        return "<Result " + ", ".join(str(i) for i in range(50)) + ">"
+
+
+def _make_logger() -> logging.Logger:
+    bench_logger = logging.getLogger("benchmark.logging")
+    bench_logger.handlers = [logging.NullHandler()]
+    bench_logger.setLevel(logging.INFO)
+    bench_logger.propagate = False
+    return bench_logger
+
+
+def run(calls: int) -> dict:
+    """
+    Time each logging style.
+
+    Args:
+        calls (int): Calls per case
+
+    Returns:
+        dict: Nanoseconds per call keyed by case name
+    """
+    std_logger = _make_logger()
+    lazy_logger = LazyLogger(std_logger)
+    result = _QueryResult()
+    user_id = 42
+
+    cases = {
+        "disabled_debug_fstring": lambda: std_logger.debug(
+            f"Query result for active session for user {user_id}: {result}"
+        ),
+        "disabled_debug_stdlib_args": lambda: std_logger.debug(
+            "Query result for active session for user %s: %s", user_id, result
+        ),
+        "disabled_debug_lazy": lambda: lazy_logger.debug(
+            "Query result for active session for user %s: %s", user_id, result
+        ),
+        "enabled_info_fstring": lambda: std_logger.info(
+            f"Session {user_id} ended and user {user_id} notified"
+        ),
+        "enabled_info_lazy": lambda: lazy_logger.info(
+            "Session %s ended and user %s notified", user_id, user_id
+        ),
+        "enabled_info_sampled_1_in_100": lambda: lazy_logger.sampled(
+            logging.INFO, "bench", 100, "Session %s ended and user %s notified", user_id, user_id
+        ),
+        "enabled_info_rate_limited_1s": lambda: lazy_logger.rate_limited(
+            logging.INFO, "bench", 1.0, "Session %s ended and user %s notified", user_id, user_id
+        ),
+    }
+
+    return {
+        name: round(min(timeit.repeat(func, number=calls, repeat=3)) / calls * 1e9, 1)
+        for name, func in cases.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100000, help="calls per case")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.calls)
+    if args.json:
+        print(json.dumps({"benchmark": "logging", "unit": "ns/call", "results": results}))
+        return
+
+    for name, ns_per_call in results.items():
+        print(f"{name:<32} {ns_per_call:>10.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
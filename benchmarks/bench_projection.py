@@ -0,0 +1,162 @@
+"""
+Benchmark of savings goal projections.
+
+Times the Monte Carlo simulation alone at several path counts, then
+projects the goals of many users concurrently: inline on the event loop as
+a baseline, through the GoalProjector's worker processes on a cold memo,
+and again from the memo. A probe task measures how long the event loop is
+blocked in each mode.
+
+Usage:
+    python -m benchmarks.bench_projection [--paths N [N ...]] [--goals G]
+        [--months M] [--workers W] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.bench_charts import LoopLagProbe
+from benchmarks.harness import SQLiteDatabase, percentile
+from core.config import config
+from core.goals import GoalProjector
+from core.logging_config import shutdown_logging
+from core.projection import project
+from database.models import SavingsGoal
+from database.services.goal_service import GoalService
+from database.services.rollup_service import shift_month
+from database.services.transaction_service import TransactionService
+from database.services.user_service import UserService
+
+
+def _time_simulations(paths: List[int], months: int) -> Dict[str, float]:
+    results = {}
+    for count in paths:
+        started_at = time.perf_counter()
+        project(5_000_000, 100_000, months, 40_000, 25_000, 0.05, 0.10, count, 0)
+        results[str(count)] = round((time.perf_counter() - started_at) * 1000, 3)
+    return results
+
+
+async def _seed(goals: int, months: int, rng: random.Random) -> List[SavingsGoal]:
+    today = date.today()
+    stored = []
+    for telegram_id in range(1, goals + 1):
+        user, _ = await UserService.get_or_create_user(telegram_id=telegram_id, first_name="Bench")
+        ledger = []
+        for offset in range(1, 13):
+            month = shift_month(today.replace(day=1), -offset)
+            occurred_at = datetime.combine(month, datetime.min.time()) + timedelta(days=rng.randint(0, 27))
+            ledger.append({
+                "user_id": user.id,
+                "amount_minor": rng.randint(300_000, 500_000),
+                "category": "Salary",
+                "occurred_at": occurred_at,
+            })
+            ledger.append({
+                "user_id": user.id,
+                "amount_minor": -rng.randint(200_000, 450_000),
+                "category": "Food",
+                "occurred_at": occurred_at,
+            })
+        await TransactionService.add_transactions(ledger)
+        stored.append(await GoalService.set_goal(
+            user_id=user.id,
+            target_minor=rng.randint(1_000_000, 10_000_000),
+            target_date=shift_month(today, months),
+            saved_minor=rng.randint(0, 500_000),
+        ))
+    return stored
+
+
+async def _run_mode(project_goal: Callable[[SavingsGoal], Awaitable[object]], goals: List[SavingsGoal]) -> Dict[str, float]:
+    latencies = []
+
+    async def one(goal: SavingsGoal) -> None:
+        started_at = time.perf_counter()
+        await project_goal(goal)
+        latencies.append(time.perf_counter() - started_at)
+
+    with LoopLagProbe() as probe:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(one(goal) for goal in goals))
+        elapsed = time.perf_counter() - started_at
+        await asyncio.sleep(0)
+
+    return {
+        "projections_per_sec": round(len(goals) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_loop_lag_ms": round(probe.max_lag * 1000, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run the simulation timings and every projection mode.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    results = {"simulation_ms": _time_simulations(args.paths, args.months)}
+    paths = max(args.paths)
+    projector = GoalProjector(workers=args.workers, paths=paths)
+
+    async def project_inline(goal: SavingsGoal) -> None:
+        current = await projector.get_progress(goal)
+        mean, spread = await projector.get_contribution_stats(goal, date.today())
+        project(
+            goal.target_minor, current, args.months, mean, spread,
+            config.PROJECTION_ANNUAL_RETURN, config.PROJECTION_VOLATILITY, paths, 0,
+        )
+
+    async with SQLiteDatabase():
+        goals = await _seed(args.goals, args.months, random.Random(0))
+        try:
+            # Start the workers first so process spawn time is not counted
+            await projector.pool.run(project, 1, 0, 1, 0, 0, 0, 0, 1, 0)
+            results["inline"] = await _run_mode(project_inline, goals)
+            results["workers_cold"] = await _run_mode(projector.project, goals)
+            results["memo_hit"] = await _run_mode(projector.project, goals)
+        finally:
+            projector.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, nargs="+", default=[10000, 100000], help="simulated paths")
+    parser.add_argument("--goals", type=int, default=20, help="distinct goals, one per user")
+    parser.add_argument("--months", type=int, default=60, help="months until the target date")
+    parser.add_argument("--workers", type=int, default=1, help="simulation processes")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "projection", "parameters": vars(args), "results": results}))
+        return
+
+    for count, elapsed in results["simulation_ms"].items():
+        print(f"{'simulate':<14} {count:>9} paths  {elapsed:>9} ms")
+    for mode in ("inline", "workers_cold", "memo_hit"):
+        metrics = results[mode]
+        print(
+            f"{mode:<14} {metrics['projections_per_sec']:>9} proj/s  p50 {metrics['p50_ms']:>9} ms  "
+            f"p99 {metrics['p99_ms']:>9} ms  max loop lag {metrics['max_loop_lag_ms']:>9} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark of the job scheduler with a large scheduled_jobs table.
+
+Seeds N recurring jobs spread over a month, loads the scheduler's window
+and reports how many runs it holds in memory, then fires a spike of jobs
+all due in the same second with batched and one-per-transaction firing,
+and a backlog of overdue monthly jobs caught up after a simulated restart.
+
+Usage:
+    python -m benchmarks.bench_scheduler [--jobs N] [--spike S]
+        [--batch-size B] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from benchmarks.harness import SQLiteDatabase
+from core.job_queue import job_queue
+from core.logging_config import shutdown_logging
+from core.recurrence import CRON, INTERVAL, ONCE
+from core.scheduler import JobRun, JobScheduler
+from database.database import db_manager
+from database.models import ScheduledJob
+
+# Users the seeded jobs belong to
+USERS = 10000
+
+
+async def _insert_jobs(rows: List[dict]) -> None:
+    async with db_manager.session_factory() as session:
+        for offset in range(0, len(rows), 5000):
+            await session.execute(insert(ScheduledJob), rows[offset:offset + 5000])
+        await session.commit()
+
+
+def _job(user_id: int, kind: str, schedule_type: str, schedule, next_run_at: datetime, catch_up: bool = False) -> dict:
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "schedule_type": schedule_type,
+        "schedule": schedule,
+        "payload": None,
+        "catch_up": catch_up,
+        "next_run_at": next_run_at,
+        "run_count": 0,
+    }
+
+
+async def _fire(db: SQLiteDatabase, scheduler: JobScheduler, count: int) -> Dict[str, float]:
+    db.statements.reset()
+    started_at = time.perf_counter()
+    await scheduler.load_window()
+    fired = await scheduler.fire_due_jobs()
+    elapsed = time.perf_counter() - started_at
+    return {
+        "jobs": fired,
+        "jobs_per_sec": round(fired / elapsed, 1),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "statements_per_job": round(db.statements.count / max(count, 1), 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Seed the table and run every scenario.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by scenario
+    """
+    rng = random.Random(0)
+    results = {}
+    runs_fired: List[int] = []
+
+    async def handler(runs: List[JobRun]) -> None:
+        runs_fired.append(sum(len(run.fire_times) for run in runs))
+
+    async with SQLiteDatabase() as db:
+        now = datetime.now().replace(microsecond=0)
+        started_at = time.perf_counter()
+        await _insert_jobs([
+            _job(
+                rng.randrange(USERS),
+                "bench",
+                INTERVAL,
+                "2592000",
+                now + timedelta(seconds=rng.randrange(60, 30 * 86400)),
+            )
+            for _ in range(args.jobs)
+        ])
+        results["seed"] = {
+            "jobs": args.jobs,
+            "rows_per_sec": round(args.jobs / (time.perf_counter() - started_at), 1),
+        }
+
+        scheduler = JobScheduler(batch_size=args.batch_size)
+        scheduler.register("bench", handler)
+        started_at = time.perf_counter()
+        await scheduler.load_window()
+        results["window_load"] = {
+            "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            "queued_runs": len(job_queue),
+            "table_rows": args.jobs,
+        }
+
+        for mode, batch_size in (("spike_batched", args.batch_size), ("spike_one_per_txn", 1)):
+            await _insert_jobs([
+                _job(rng.randrange(USERS), "bench", ONCE, None, now - timedelta(seconds=1))
+                for _ in range(args.spike)
+            ])
+            scheduler.batch_size = batch_size
+            job_queue.reset()
+            results[mode] = await _fire(db, scheduler, args.spike)
+
+        # A monthly job down for a year fires twelve runs on restart
+        await _insert_jobs([
+            _job(rng.randrange(USERS), "bench", CRON, "0 9 1 * *", datetime(now.year - 1, now.month, 1, 9), True)
+            for _ in range(args.spike // 10)
+        ])
+        scheduler.batch_size = args.batch_size
+        job_queue.reset()
+        runs_fired.clear()
+        results["catch_up"] = await _fire(db, scheduler, args.spike // 10)
+        results["catch_up"]["runs"] = sum(runs_fired)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200000, help="recurring jobs spread over a month")
+    parser.add_argument("--spike", type=int, default=5000, help="jobs due in the same second")
+    parser.add_argument("--batch-size", type=int, default=500, help="jobs fired per transaction")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "scheduler", "parameters": vars(args), "results": results}))
+        return
+
+    load = results["window_load"]
+    print(
+        f"{'window_load':<18} {load['elapsed_ms']:>9} ms  "
+        f"{load['queued_runs']} of {load['table_rows']} jobs held in memory"
+    )
+    for mode in ("spike_batched", "spike_one_per_txn", "catch_up"):
+        metrics = results[mode]
+        print(
+            f"{mode:<18} {metrics['jobs_per_sec']:>9} jobs/s  {metrics['elapsed_ms']:>10} ms  "
+            f"{metrics['statements_per_job']:>6} statements/job"
+        )
+    print(f"{'catch_up runs':<18} {results['catch_up']['runs']:>9}")
+
+
+if __name__ == "__main__":
+    main()
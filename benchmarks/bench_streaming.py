@@ -0,0 +1,164 @@
+"""
+Benchmark of AI assistant replies sent whole versus streamed with edits.
+
+Opens an AI chat session for many users through the dispatcher, then every
+user sends a question answered by the stub model. Each mode reports, as
+seen from the recorded Telegram calls, the time until the first message
+appears, until the first reply text appears and until the reply is
+complete, plus API calls per reply and the shortest time between two
+edits of the same reply.
+
+Usage:
+    python -m benchmarks.bench_streaming [--users N] [--first-token-ms MS]
+        [--token-ms MS] [--tokens T] [--edit-interval S]
+        [--api-latency-ms MS] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from aiogram import Dispatcher
+from aiogram.methods import EditMessageText, SendMessage
+from sqlalchemy import func, select
+
+from benchmarks.harness import SQLiteDatabase, callback_update, make_bot, percentile, text_update
+from commands.handlers import register_handlers
+from core.ai_client import ai_model
+from core.config import config
+from core.logging_config import shutdown_logging
+from database.database import db_manager
+from database.models import Message
+
+# Telegram user IDs of synthetic users start here
+FIRST_USER_ID = 100000
+
+
+def _min_gap(times: List[float]) -> Optional[float]:
+    """Get the shortest time between consecutive calls, or None for fewer than two."""
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    return min(gaps) if gaps else None
+
+
+async def _run_mode(args: argparse.Namespace, streaming: bool) -> Dict[str, float]:
+    config.AI_STREAMING = streaming
+    config.AI_STREAM_EDIT_INTERVAL = args.edit_interval
+    ai_model.first_token_delay = args.first_token_ms / 1000
+    ai_model.token_delay = args.token_ms / 1000
+    ai_model.reply_tokens = args.tokens
+
+    async with SQLiteDatabase() as db:
+        bot = make_bot(args.api_latency_ms / 1000)
+        dp = Dispatcher()
+        register_handlers(dp)
+
+        user_ids = range(FIRST_USER_ID, FIRST_USER_ID + args.users)
+        await asyncio.gather(*(dp.feed_update(bot, callback_update(user_id, "ai_chat")) for user_id in user_ids))
+
+        session = bot.session
+        first_call = len(session.calls)
+        sent_at: Dict[int, float] = {}
+
+        async def ask(user_id: int) -> None:
+            sent_at[user_id] = time.perf_counter()
+            await dp.feed_update(bot, text_update(user_id, "How much should I save every month?"))
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(ask(user_id) for user_id in user_ids))
+        elapsed = time.perf_counter() - started_at
+
+        calls_by_chat = defaultdict(list)
+        for method, called_at in zip(session.calls[first_call:], session.call_times[first_call:]):
+            calls_by_chat[method.chat_id].append((called_at, method))
+
+        first_message, first_text, total, edit_gaps = [], [], [], []
+        for user_id in user_ids:
+            calls = calls_by_chat[user_id]
+            start = sent_at[user_id]
+            first_message.append(calls[0][0] - start)
+            texts = [
+                called_at
+                for called_at, method in calls
+                if isinstance(method, EditMessageText) or (not streaming and isinstance(method, SendMessage))
+            ]
+            first_text.append(texts[0] - start)
+            total.append(calls[-1][0] - start)
+            gap = _min_gap([called_at for called_at, method in calls if isinstance(method, EditMessageText)])
+            if gap is not None:
+                edit_gaps.append(gap)
+
+        async with db_manager.session_factory() as db_session:
+            stored = await db_session.scalar(
+                select(func.count()).select_from(Message).where(
+                    Message.is_processed == True, Message.processing_time_ms.is_not(None)
+                )
+            )
+
+        replies = len(user_ids)
+        return {
+            "replies": replies,
+            "replies_per_sec": round(replies / elapsed, 1),
+            "first_message_p50_ms": round(percentile(first_message, 0.50) * 1000, 1),
+            "first_text_p50_ms": round(percentile(first_text, 0.50) * 1000, 1),
+            "first_text_p99_ms": round(percentile(first_text, 0.99) * 1000, 1),
+            "total_p50_ms": round(percentile(total, 0.50) * 1000, 1),
+            "total_p99_ms": round(percentile(total, 0.99) * 1000, 1),
+            "api_calls_per_reply": round((len(session.calls) - first_call) / replies, 2),
+            "min_edit_gap_ms": round(min(edit_gaps) * 1000, 1) if edit_gaps else None,
+            "stored_replies": stored,
+        }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run the whole and streamed modes.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    return {
+        "whole": await _run_mode(args, streaming=False),
+        "streamed": await _run_mode(args, streaming=True),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100, help="users asking at once")
+    parser.add_argument("--first-token-ms", type=float, default=500, help="stub model delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=30, help="stub model delay between tokens")
+    parser.add_argument("--tokens", type=int, default=150, help="tokens per reply")
+    parser.add_argument("--edit-interval", type=float, default=1.0, help="seconds between edits")
+    parser.add_argument("--api-latency-ms", type=float, default=50, help="simulated Telegram round trip")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "streaming", "parameters": vars(args), "results": results}))
+        return
+
+    for mode in ("whole", "streamed"):
+        metrics = results[mode]
+        print(
+            f"{mode:<9} first message {metrics['first_message_p50_ms']:>7} ms  "
+            f"first text p50 {metrics['first_text_p50_ms']:>7} ms  p99 {metrics['first_text_p99_ms']:>7} ms  "
+            f"total p50 {metrics['total_p50_ms']:>7} ms  p99 {metrics['total_p99_ms']:>7} ms  "
+            f"{metrics['api_calls_per_reply']:>5} calls/reply  "
+            f"min edit gap {metrics['min_edit_gap_ms']} ms  "
+            f"{metrics['stored_replies']} stored"
+        )
+
+
+if __name__ == "__main__":
+    main()
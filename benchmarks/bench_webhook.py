@@ -0,0 +1,244 @@
+"""
+Delivery latency benchmark of webhook mode against polling mode.
+
+Synthetic /start updates are produced at a fixed rate and delivered to
+the bot either through getUpdates long polling or as webhook POSTs to a
+local WebhookServer. A one-way network latency is simulated for every
+delivery leg, and an update counts as done when the bot's reply reaches
+the fake Telegram session.
+
+Usage:
+    python -m benchmarks.bench_webhook [--updates N] [--rate R]
+        [--users N] [--concurrency N] [--network-latency-ms MS] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.methods import GetUpdates, SendMessage, TelegramMethod
+from aiogram.types import Update
+
+from benchmarks.harness import BOT_ID, RecordingSession, SQLiteDatabase, command_update, percentile
+from commands.handlers import register_handlers
+from core.logging_config import shutdown_logging
+from core.webhook import SECRET_TOKEN_HEADER, WebhookServer
+
+# Telegram user IDs of synthetic users start here
+FIRST_USER_ID = 100000
+
+SECRET_TOKEN = "benchmark-secret"
+
+
+class FakeTelegram(RecordingSession):
+    """Session that plays Telegram: serves getUpdates and times replies."""
+
+    def __init__(self, network_latency: float):
+        super().__init__()
+        self.network_latency = network_latency
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.produced_at: Dict[int, Deque[float]] = defaultdict(deque)
+        self.latencies: List[float] = []
+        self.all_done = asyncio.Event()
+        self.expected = 0
+
+    def produce(self, update: Update) -> None:
+        """Record the moment an update exists on Telegram's side."""
+        self.produced_at[update.message.chat.id].append(time.perf_counter())
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None
+    ):
+        if isinstance(method, GetUpdates):
+            self.calls.append(method)
+            return await self._get_updates(method)
+
+        result = await super().make_request(bot, method, timeout)
+        if isinstance(method, SendMessage):
+            started = self.produced_at[method.chat_id]
+            if started:
+                self.latencies.append(time.perf_counter() - started.popleft())
+            if len(self.latencies) >= self.expected:
+                self.all_done.set()
+        return result
+
+    async def _get_updates(self, method: GetUpdates) -> List[Update]:
+        """Long poll: request leg, wait for updates, response leg."""
+        await asyncio.sleep(self.network_latency)
+        try:
+            updates = [await asyncio.wait_for(self.inbox.get(), method.timeout or 1)]
+        except asyncio.TimeoutError:
+            updates = []
+        while len(updates) < (method.limit or 100) and not self.inbox.empty():
+            updates.append(self.inbox.get_nowait())
+        await asyncio.sleep(self.network_latency)
+        return updates
+
+
+def _make_updates(args: argparse.Namespace) -> List[Update]:
+    return [
+        command_update(FIRST_USER_ID + index % args.users, "start")
+        for index in range(args.updates)
+    ]
+
+
+async def _produce(args: argparse.Namespace, deliver) -> None:
+    """Produce updates at the configured rate and hand each to deliver()."""
+    interval = 1 / args.rate if args.rate else 0
+    started_at = time.perf_counter()
+    for index, update in enumerate(_make_updates(args)):
+        delay = started_at + index * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        deliver(update)
+
+
+def _summarize(telegram: FakeTelegram, elapsed: float, extra: Dict[str, float]) -> Dict[str, float]:
+    done = len(telegram.latencies)
+    return {
+        "updates": done,
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(done / elapsed, 1),
+        "p50_ms": round(percentile(telegram.latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(telegram.latencies, 0.99) * 1000, 2),
+        **extra,
+    }
+
+
+async def run_polling(args: argparse.Namespace) -> Dict[str, float]:
+    """Deliver updates through getUpdates long polling."""
+    async with SQLiteDatabase():
+        telegram = FakeTelegram(args.network_latency_ms / 1000)
+        telegram.expected = args.updates
+        bot = Bot(token=f"{BOT_ID}:BENCHMARK", session=telegram)
+        dp = Dispatcher()
+        register_handlers(dp)
+
+        def deliver(update: Update) -> None:
+            telegram.produce(update)
+            telegram.inbox.put_nowait(update)
+
+        polling = asyncio.create_task(
+            dp.start_polling(
+                bot,
+                handle_signals=False,
+                close_bot_session=False,
+                tasks_concurrency_limit=args.concurrency,
+            )
+        )
+        started_at = time.perf_counter()
+        await _produce(args, deliver)
+        await asyncio.wait_for(telegram.all_done.wait(), args.timeout)
+        elapsed = time.perf_counter() - started_at
+
+        await dp.stop_polling()
+        await asyncio.gather(polling, return_exceptions=True)
+        return _summarize(telegram, elapsed, {"get_updates_calls": telegram.count(GetUpdates)})
+
+
+async def run_webhook(args: argparse.Namespace) -> Dict[str, float]:
+    """Deliver updates as webhook POSTs to a local WebhookServer."""
+    async with SQLiteDatabase():
+        telegram = FakeTelegram(args.network_latency_ms / 1000)
+        telegram.expected = args.updates
+        bot = Bot(token=f"{BOT_ID}:BENCHMARK", session=telegram)
+        dp = Dispatcher()
+        register_handlers(dp)
+
+        server = WebhookServer(
+            bot, dp, host="127.0.0.1", port=0, path="/webhook",
+            secret_token=SECRET_TOKEN, max_concurrency=args.concurrency,
+        )
+        await server.start(set_webhook=False)
+        url = f"http://127.0.0.1:{server.port}/webhook"
+        response_times: List[float] = []
+        deliveries = set()
+
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=args.connections)
+        ) as client:
+
+            async def post(update: Update) -> None:
+                await asyncio.sleep(telegram.network_latency)
+                sent_at = time.perf_counter()
+                async with client.post(
+                    url,
+                    data=update.model_dump_json(exclude_none=True),
+                    headers={SECRET_TOKEN_HEADER: SECRET_TOKEN, "Content-Type": "application/json"},
+                ) as response:
+                    response.raise_for_status()
+                response_times.append(time.perf_counter() - sent_at)
+
+            def deliver(update: Update) -> None:
+                telegram.produce(update)
+                task = asyncio.create_task(post(update))
+                deliveries.add(task)
+                task.add_done_callback(deliveries.discard)
+
+            started_at = time.perf_counter()
+            await _produce(args, deliver)
+            await asyncio.wait_for(telegram.all_done.wait(), args.timeout)
+            elapsed = time.perf_counter() - started_at
+            await asyncio.gather(*deliveries)
+
+        await server.stop()
+        return _summarize(
+            telegram,
+            elapsed,
+            {
+                "http_response_p50_ms": round(percentile(response_times, 0.50) * 1000, 2),
+                "http_response_p99_ms": round(percentile(response_times, 0.99) * 1000, 2),
+                "rejected": server.rejected_count,
+            },
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Run both delivery modes with the same load.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results keyed by mode
+    """
+    return {"polling": await run_polling(args), "webhook": await run_webhook(args)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=2000, help="updates to deliver")
+    parser.add_argument("--rate", type=float, default=100, help="updates produced per second, 0 for a burst")
+    parser.add_argument("--users", type=int, default=500, help="distinct senders")
+    parser.add_argument("--concurrency", type=int, default=64, help="updates handled at once")
+    parser.add_argument("--connections", type=int, default=40, help="webhook connections, as Telegram's max_connections")
+    parser.add_argument(
+        "--network-latency-ms", type=float, default=50.0, help="one-way Telegram network latency"
+    )
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds to wait per mode")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    if args.json:
+        print(json.dumps({"benchmark": "webhook", "parameters": vars(args), "results": results}))
+        return
+
+    for name, metrics in results.items():
+        print(name)
+        for key, value in metrics.items():
+            print(f"  {key:<28} {value:>12}")
+
+
+if __name__ == "__main__":
+    main()
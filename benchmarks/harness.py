@@ -0,0 +1,229 @@
+"""
+Shared fixtures for offline benchmarks.
+
+Provides a fake Telegram session that records outgoing calls instead of
+sending them, an embedded SQLite stand-in for the MySQL database, a
+statement counter and synthetic update builders.
+"""
+
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, SendMessage, SendPhoto, TelegramMethod
+from aiogram.types import CallbackQuery, Chat, Message, MessageEntity, PhotoSize, Update, User
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.answer_cache import answer_cache
+from core.conversation import conversation_context
+from core.metrics import instrument_engine
+from core.session_registry import session_registry
+from database.database import Base, db_manager
+from database.services import session_service
+from database.services.user_service import user_cache
+
+BOT_ID = 1000000
+
+
+class RecordingSession(BaseSession):
+    """Telegram session that records calls and answers them locally."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize the session.
+
+        Args:
+            latency (float): Simulated API round trip in seconds
+        """
+        super().__init__()
+        self.latency = latency
+        self.calls: List[TelegramMethod] = []
+        # time.perf_counter() of each recorded call
+        self.call_times: List[float] = []
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        pass
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None
+    ) -> Any:
+        self.calls.append(method)
+        self.call_times.append(time.perf_counter())
+        # Real sessions mount returned objects on the bot so their methods work
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if isinstance(method, GetMe):
+            return User(id=BOT_ID, is_bot=True, first_name="Benchmark", username="benchmark_bot")
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            ).as_(bot)
+        if isinstance(method, SendPhoto):
+            message_id = next(self._message_ids)
+            # A resent file keeps its ID, an upload gets a new one
+            file_id = method.photo if isinstance(method.photo, str) else f"photo-{message_id}"
+            return Message(
+                message_id=message_id,
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"),
+                photo=[PhotoSize(file_id=file_id, file_unique_id=file_id, width=800, height=450)],
+            ).as_(bot)
+        return True
+
+    async def stream_content(
+        self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+        chunk_size: int = 65536, raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    def count(self, method_type: type) -> int:
+        """Count the recorded calls of a method type."""
+        return sum(1 for call in self.calls if isinstance(call, method_type))
+
+
+def make_bot(latency: float = 0.0) -> Bot:
+    """Create a bot whose API calls go to a RecordingSession."""
+    return Bot(token=f"{BOT_ID}:BENCHMARK", session=RecordingSession(latency))
+
+
+class StatementCounter:
+    """Counts statements executed by an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+    def reset(self) -> None:
+        self.count = 0
+
+
+class SQLiteDatabase:
+    """
+    Temporary SQLite database installed as the bot's database.
+
+    SQLite allows a single writer, so one pooled connection is used and
+    every database call is serialized. Results are meant for comparing
+    commits with each other, not with a MySQL deployment.
+    """
+
+    def __init__(self):
+        self._directory = None
+        self.statements: Optional[StatementCounter] = None
+
+    async def __aenter__(self) -> "SQLiteDatabase":
+        self._directory = tempfile.TemporaryDirectory(prefix="bot-bench-")
+        path = os.path.join(self._directory.name, "bench.sqlite")
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        instrument_engine(engine)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        db_manager.engine = engine
+        db_manager.session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        db_manager._initialized = True
+        self.statements = StatementCounter(engine)
+
+        # Start from cold in-process state
+        user_cache.clear()
+        session_registry.load([])
+        conversation_context.clear()
+        answer_cache.clear()
+        session_service._pending_activity.clear()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Services return from inside "async for session in get_db_session()",
+        # which leaves closing the session to the loop's async generator
+        # finalizer; let those run so no connection is left checked out
+        await asyncio.sleep(0.1)
+        await db_manager.close()
+        self._directory.cleanup()
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Get a percentile of a list of values using the nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+_update_ids = itertools.count(1)
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name=f"User{user_id}", username=f"user{user_id}")
+
+
+def command_update(user_id: int, command: str) -> Update:
+    """Build an update with a private chat command message from a user."""
+    text = f"/{command}"
+    return Update(
+        update_id=next(_update_ids),
+        message=Message(
+            message_id=next(_update_ids),
+            date=datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=_user(user_id),
+            text=text,
+            entities=[MessageEntity(type="bot_command", offset=0, length=len(text))],
+        ),
+    )
+
+
+def text_update(user_id: int, text: str) -> Update:
+    """Build an update with a private chat text message from a user."""
+    return Update(
+        update_id=next(_update_ids),
+        message=Message(
+            message_id=next(_update_ids),
+            date=datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=_user(user_id),
+            text=text,
+        ),
+    )
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    """Build an update with an inline button press from a user."""
+    return Update(
+        update_id=next(_update_ids),
+        callback_query=CallbackQuery(
+            id=str(next(_update_ids)),
+            from_user=_user(user_id),
+            chat_instance=str(user_id),
+            data=data,
+            message=Message(
+                message_id=next(_update_ids),
+                date=datetime.now(),
+                chat=Chat(id=user_id, type="private"),
+                from_user=User(id=BOT_ID, is_bot=True, first_name="Benchmark"),
+                text="menu",
+            ),
+        ),
+    )
@@ -0,0 +1,163 @@
+"""
+Local stand-in for a streaming model server.
+
+Speaks the protocol of core.ai_client.HTTPModel: a POST of
+{"prompts": [prompt, ...]} is answered with one {"index": i, "token": "..."}
+line per generated token. Like a GPU server it runs a limited number of
+generation calls at once, queueing the rest, and a call generating several
+prompts costs little more per step than one generating a single prompt.
+
+Usage:
+    python -m benchmarks.model_server [--port P] [--slots N]
+        [--first-token-ms MS] [--token-ms MS] [--tokens T]
+        [--batch-step-cost F]
+
+Point the bot at it with AI_MODEL_URL=http://127.0.0.1:8090/generate.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+from core.ai_client import STUB_WORDS
+
+
+class StandInModelServer:
+    """aiohttp server generating canned replies with GPU-like timing."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8090,
+        slots: int = 4,
+        first_token_delay: float = 0.2,
+        token_delay: float = 0.02,
+        tokens: int = 50,
+        batch_step_cost: float = 0.1,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 picks a free one
+            slots (int): Generation calls run at once; more wait in line
+            first_token_delay (float): Seconds of prompt processing per call
+            token_delay (float): Seconds per generation step of one prompt
+            tokens (int): Tokens generated per prompt
+            batch_step_cost (float): Extra step time per additional prompt
+                in a call, as a fraction of token_delay
+        """
+        self.host = host
+        self.port = port
+        self.slots = slots
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.batch_step_cost = batch_step_cost
+        self.calls = 0
+        self.prompts = 0
+        self.max_active = 0
+        self.aborted = 0
+        self._active = 0
+        self._semaphore = asyncio.Semaphore(slots)
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        """Generation endpoint."""
+        return f"http://{self.host}:{self.port}/generate"
+
+    async def start(self) -> None:
+        """Start listening."""
+        app = web.Application()
+        app.router.add_post("/generate", self.generate)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        """Stream the replies to a call's prompts, one line per token."""
+        prompts = (await request.json())["prompts"]
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async with self._semaphore:
+            self.calls += 1
+            self.prompts += len(prompts)
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+            try:
+                await asyncio.sleep(self.first_token_delay)
+                step = self.token_delay * (1 + self.batch_step_cost * (len(prompts) - 1))
+                offsets = [len(prompt[-1]["content"]) % len(STUB_WORDS) for prompt in prompts]
+                for position in range(self.tokens):
+                    if position:
+                        await asyncio.sleep(step)
+                    lines = []
+                    for index, offset in enumerate(offsets):
+                        word = STUB_WORDS[(offset + position) % len(STUB_WORDS)]
+                        token = word if position == 0 else " " + word
+                        lines.append(json.dumps({"index": index, "token": token}) + "\n")
+                    await response.write("".join(lines).encode())
+                await response.write_eof()
+            except ConnectionResetError:
+                # The client went away; stop generating for it
+                self.aborted += 1
+            finally:
+                self._active -= 1
+
+        return response
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = StandInModelServer(
+        host=args.host,
+        port=args.port,
+        slots=args.slots,
+        first_token_delay=args.first_token_ms / 1000,
+        token_delay=args.token_ms / 1000,
+        tokens=args.tokens,
+        batch_step_cost=args.batch_step_cost,
+    )
+    await server.start()
+    print(f"Stand-in model server listening on {server.url}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8090, help="port to listen on")
+    parser.add_argument("--slots", type=int, default=4, help="generation calls run at once")
+    parser.add_argument("--first-token-ms", type=float, default=200, help="prompt processing per call")
+    parser.add_argument("--token-ms", type=float, default=20, help="time per generation step")
+    parser.add_argument("--tokens", type=int, default=50, help="tokens per reply")
+    parser.add_argument("--batch-step-cost", type=float, default=0.1, help="extra step time per batched prompt")
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print(f"Stopped after {time.perf_counter() - started_at:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
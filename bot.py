@@ -3,35 +3,78 @@ from aiogram import Bot, Dispatcher
 
 # Import configuration from core module
 from core.config import config
-from core.logging_config import setup_logging, get_logger
+from core.logging_config import setup_logging, shutdown_logging, get_logger
 
 # Import database functions
 from database import init_database, close_database, test_database_connection
+from database.services.session_service import SessionService
+from database.services.message_ingestion import message_ingestion
 
 # Import command handlers
 from commands import register_handlers
 from core.session_timeout import SessionTimeoutHandler
+from core.leader import LeaderElection, PartitionLeases
+from core.outbound import OutboundDispatcher
+from core.activity_flusher import SessionActivityFlusher
+from core.metrics import MetricsServer
+from core.webhook import WebhookServer
+from core.charts import chart_service
+from core.goals import goal_projector
+from core.scheduler import JobScheduler
+from core.jobs import JobHandlers
+from core.ai_client import ai_model
+from core.llm_gateway import llm_gateway
+from core.archiver import MessageArchiver
 
-# Initialize logging
-setup_logging()
-logger = get_logger("bot")
+# Main function to run the bot
+async def main():
+    # Initialize logging
+    setup_logging()
+    logger = get_logger("bot")
 
-# Initialize bot and dispatcher
-bot = Bot(token=config.BOT_TOKEN)
-dp = Dispatcher()
+    # Initialize bot and dispatcher
+    bot = Bot(token=config.BOT_TOKEN)
+    dp = Dispatcher()
 
-# Initialize session timeout handler
-session_timeout_handler = SessionTimeoutHandler(bot)
+    # Initialize outbound message dispatcher
+    outbound = OutboundDispatcher(bot)
 
-# Register all command handlers
-register_handlers(dp)
+    # Initialize election of the instance that archives old messages
+    archiver_election = LeaderElection("message_archiver")
 
-# Main function to run the bot
-async def main():
+    # Initialize leases of the user partitions this instance works on
+    partition_leases = PartitionLeases()
+
+    # Initialize session timeout handler
+    session_timeout_handler = SessionTimeoutHandler(bot, outbound, partition_leases)
+
+    # Initialize scheduler of reminders and recurring transactions
+    job_scheduler = JobScheduler(partitions=partition_leases)
+    JobHandlers(outbound).register(job_scheduler)
+
+    # Initialize archiver of old messages, run by the elected leader
+    message_archiver = MessageArchiver(leader=archiver_election)
+
+    # Initialize session activity flusher
+    activity_flusher = SessionActivityFlusher()
+
+    # Initialize metrics listener
+    metrics_server = MetricsServer()
+
+    # Initialize webhook server
+    webhook_server = WebhookServer(bot, dp)
+
+    # Register all command handlers
+    register_handlers(dp)
+    
     try:
         # Log configuration information
         logger.info(f"🚀 Starting {config.BOT_NAME}...")
         
+        # Start metrics listener
+        if config.METRICS_ENABLED:
+            await metrics_server.start()
+        
         # Initialize database connection
         logger.info("🔄 Initializing database connection...")
         await init_database()
@@ -43,27 +86,103 @@ async def main():
             logger.error("❌ Database connection failed")
             return
         
+        # Rebuild the active session registry
+        active_sessions = await SessionService.load_active_sessions()
+        logger.info(f"✅ Loaded {active_sessions} active sessions")
+        
+        # Start message ingestion queue
+        await message_ingestion.start()
+        
+        # Start outbound message dispatcher
+        await outbound.start()
+        
+        # Start model call scheduling of the AI assistant
+        await llm_gateway.start()
+        
+        # Start archiver leader election
+        election_task = asyncio.create_task(archiver_election.start_election())
+        
+        # Start user partition leases
+        partitions_task = asyncio.create_task(partition_leases.start())
+        
         # Start session timeout checker
         logger.info("🔄 Starting session timeout checker...")
         timeout_task = asyncio.create_task(session_timeout_handler.start_timeout_checker())
         
-        # Start polling
-        logger.info("🔄 Starting bot polling...")
-        await dp.start_polling(bot)
+        # Start job scheduler
+        logger.info("🔄 Starting job scheduler...")
+        scheduler_task = asyncio.create_task(job_scheduler.start_scheduler())
+        
+        # Start message archiver
+        if config.ARCHIVE_AFTER_DAYS > 0:
+            archiver_task = asyncio.create_task(message_archiver.start_archiver())
+        
+        # Start session activity flusher
+        flusher_task = asyncio.create_task(activity_flusher.start_flusher())
+        
+        if config.BOT_MODE == "webhook":
+            # Serve webhook updates
+            logger.info("🔄 Starting webhook server...")
+            await webhook_server.start()
+            await webhook_server.serve_forever()
+        else:
+            # Start polling, removing any webhook left by webhook mode
+            logger.info("🔄 Starting bot polling...")
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
         
     except ValueError as e:
         logger.error(f"❌ Configuration Error: {e}")
     except Exception as e:
         logger.error(f"❌ Error starting bot: {e}")
     finally:
+        # Finish updates accepted by the webhook
+        await webhook_server.stop()
+        
         # Stop session timeout checker
         logger.info("🔄 Stopping session timeout checker...")
         await session_timeout_handler.stop_timeout_checker()
         
+        # Stop job scheduler
+        await job_scheduler.stop_scheduler()
+        
+        # Stop message archiver
+        await message_archiver.stop_archiver()
+        
+        # Cancel AI replies still in progress
+        await llm_gateway.stop()
+        await ai_model.close()
+        
+        # Hand the archiver role and user partitions to other instances
+        await archiver_election.stop_election()
+        await partition_leases.stop()
+        
+        # Flush buffered session activity
+        logger.info("🔄 Flushing session activity...")
+        await activity_flusher.stop_flusher()
+        
+        # Drain queued outbound messages
+        logger.info("🔄 Stopping outbound dispatcher...")
+        await outbound.stop()
+        
+        # Write queued messages
+        logger.info("🔄 Stopping message ingestion queue...")
+        await message_ingestion.stop()
+        
+        # Stop chart render and projection workers
+        chart_service.shutdown()
+        goal_projector.shutdown()
+        
         # Close database connection
         logger.info("🔄 Closing database connection...")
         await close_database()
         await bot.session.close()
+        
+        # Stop metrics listener
+        await metrics_server.stop()
+        
+        # Write queued log records
+        shutdown_logging()
 
 if __name__ == "__main__":
     asyncio.run(main())
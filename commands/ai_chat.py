@@ -0,0 +1,155 @@
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from aiogram import F, types
+from aiogram.filters import StateFilter
+from sqlalchemy.ext.asyncio import AsyncSession
+from .base import BaseCommand
+from core.ai_client import build_prompt, mentions_own_finances, summarize_ledger
+from core.answer_cache import answer_cache
+from core.llm_gateway import GatewayBusy, GatewayCancelled, GatewayTimeout, llm_gateway
+from core.logging_config import get_lazy_logger
+from core.metrics import AI_ANSWER_CACHE
+from core.streaming import EMPTY_REPLY, ReplyStream
+from database.database import commit_unit_of_work
+from database.services.message_service import MessageService
+from database.services.rollup_service import RollupService, month_start
+from database.services.session_service import SessionService
+from database.services.user_service import UserService
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+
+async def active_session_filter(message: types.Message) -> Union[bool, Dict[str, Any]]:
+    """Match messages of users with an unexpired AI chat session and pass the session on."""
+    user, _ = await UserService.get_or_create_user(
+        telegram_id=message.from_user.id,
+        username=message.from_user.username,
+        first_name=message.from_user.first_name,
+        last_name=message.from_user.last_name,
+    )
+    active_session = await SessionService.get_active_session_info(user.id)
+    if active_session is None or active_session.is_expired():
+        return False
+    return {"active_session": active_session}
+
+
+async def _ledger_summary(user_id: int) -> str:
+    """Summarize the current month of a user's ledger for the prompt."""
+    rollups = await RollupService.get_monthly_rollups(user_id, month_start(datetime.now()))
+    return summarize_ledger(rollups)
+
+
+async def _cached_tokens(answer: str) -> AsyncIterator[str]:
+    yield answer
+
+
+class AIChatHandler(BaseCommand):
+    """AI assistant handler for text messages sent during a chat session."""
+
+    def register(self) -> None:
+        """Register the chat handler ahead of the echo handler."""
+        self.dp.message.register(
+            self.chat_message,
+            StateFilter(None),
+            F.text,
+            ~F.text.startswith("/"),
+            active_session_filter,
+        )
+
+    async def chat_message(
+        self, message: types.Message, active_session, db_session: AsyncSession
+    ) -> None:
+        """Answer a chat message, streaming the reply, and store the message pair."""
+        started_at = time.perf_counter()
+        await SessionService.update_session_activity(active_session.id)
+
+        turns = await MessageService.get_conversation_context(active_session.id)
+        ledger: Optional[str] = None
+        if mentions_own_finances(message.text):
+            ledger = await _ledger_summary(active_session.user_id)
+
+        # Only stand-alone questions without the user's own data share answers
+        cacheable = not turns and ledger is None
+        if cacheable:
+            cached, result = answer_cache.get(message.text)
+            AI_ANSWER_CACHE.labels(result).inc()
+            if cached is not None:
+                await self._answer_from_cache(message, active_session, db_session, cached.answer, started_at)
+                return
+        else:
+            AI_ANSWER_CACHE.labels("skipped").inc()
+
+        try:
+            request = llm_gateway.submit(
+                user_id=active_session.user_id,
+                session_id=active_session.id,
+                prompt=build_prompt(turns, message.text, ledger),
+            )
+        except GatewayBusy:
+            await message.answer(
+                "⏳ I'm still answering your earlier messages. "
+                "Please wait for those replies before sending more."
+            )
+            return
+
+        record = await MessageService.create_user_message(
+            session_id=active_session.id,
+            user_content=message.text,
+            user_telegram_message_id=message.message_id,
+        )
+
+        # Do not hold a pooled connection for the seconds the reply takes
+        await commit_unit_of_work(db_session)
+
+        stream = ReplyStream(message, started_at=started_at)
+        try:
+            reply = await stream.run(request.tokens())
+        except GatewayCancelled:
+            await stream.fail("⏹ This chat session has ended, so the reply was stopped.")
+            return
+        except GatewayTimeout:
+            await stream.fail("⌛ The assistant is too busy to answer right now. Please try again later.")
+            return
+        except Exception as e:
+            logger.error("❌ AI reply in session %s failed: %s", active_session.id, e)
+            await stream.fail()
+            return
+
+        if cacheable and reply.text != EMPTY_REPLY:
+            answer_cache.set(message.text, reply.text)
+
+        # The reply and its timing are written once, after the last edit
+        await MessageService.add_bot_reply(
+            message_id=record.id,
+            bot_content=reply.text,
+            bot_telegram_message_id=reply.message.message_id,
+            processing_time_ms=int(reply.total * 1000),
+        )
+
+    async def _answer_from_cache(
+        self,
+        message: types.Message,
+        active_session,
+        db_session: AsyncSession,
+        answer: str,
+        started_at: float,
+    ) -> None:
+        """Send a cached answer whole and store the message pair with its processing time."""
+        record = await MessageService.create_user_message(
+            session_id=active_session.id,
+            user_content=message.text,
+            user_telegram_message_id=message.message_id,
+        )
+        await commit_unit_of_work(db_session)
+        reply = await ReplyStream(message, streaming=False, started_at=started_at).run(
+            _cached_tokens(answer)
+        )
+        await MessageService.add_bot_reply(
+            message_id=record.id,
+            bot_content=reply.text,
+            bot_telegram_message_id=reply.message.message_id,
+            processing_time_ms=int(reply.total * 1000),
+        )
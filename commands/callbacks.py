@@ -1,7 +1,16 @@
+from datetime import datetime
 from aiogram import types
+from aiogram.fsm.context import FSMContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from .base import BaseCommand
+from .transactions import TransactionForm, get_kind_keyboard
+from .goals import show_goal, start_goal_flow
+from database.database import commit_unit_of_work
 from database.services.user_service import UserService
 from database.services.session_service import SessionService
+from database.services.goal_service import GoalService
+from database.services.rollup_service import RollupService, month_start, shift_month
+from core.reports import render_monthly_report, send_income_expense_chart
 from core.config import config
 
 
@@ -24,52 +33,60 @@ class CallbackHandlers(BaseCommand):
         )
 
     async def add_transaction_callback(
-        self, callback_query: types.CallbackQuery
+        self, callback_query: types.CallbackQuery, state: FSMContext
     ) -> None:
-        """Handle add income/expense button callback."""
+        """Handle add income/expense button callback - starts the entry flow."""
         await callback_query.answer()
+        await state.set_state(TransactionForm.kind)
         await callback_query.message.edit_text(
             "💰 Add Income/Expense\n\n"
-            "This feature will help you:\n"
-            "• Track your income sources\n"
-            "• Log daily expenses\n"
-            "• Categorize transactions\n"
-            "• Monitor cash flow\n\n"
-            "Feature coming soon! 🚀",
-            reply_markup=self._get_main_menu(),
+            "Is this income or an expense?",
+            reply_markup=get_kind_keyboard(),
         )
 
     async def set_savings_goal_callback(
-        self, callback_query: types.CallbackQuery
+        self, callback_query: types.CallbackQuery, state: FSMContext, db_session: AsyncSession
     ) -> None:
-        """Handle set savings goal button callback."""
+        """Handle set savings goal button callback - shows the goal or starts the flow."""
         await callback_query.answer()
-        await callback_query.message.edit_text(
-            "🎯 Set Savings Goal\n\n"
-            "This feature will help you:\n"
-            "• Define financial targets\n"
-            "• Track progress towards goals\n"
-            "• Set milestone reminders\n"
-            "• Calculate required savings\n\n"
-            "Feature coming soon! 🚀",
-            reply_markup=self._get_main_menu(),
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=callback_query.from_user.id,
+            username=callback_query.from_user.username,
+            first_name=callback_query.from_user.first_name,
+            last_name=callback_query.from_user.last_name,
         )
+        goal = await GoalService.get_goal(user.id)
+        if goal is None:
+            await start_goal_flow(callback_query.message, state)
+        else:
+            await show_goal(callback_query.message, goal, db_session)
 
     async def financial_reports_callback(
-        self, callback_query: types.CallbackQuery
+        self, callback_query: types.CallbackQuery, db_session: AsyncSession
     ) -> None:
-        """Handle financial reports button callback."""
+        """Handle financial reports button callback - renders from monthly rollups."""
         await callback_query.answer()
+
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=callback_query.from_user.id,
+            username=callback_query.from_user.username,
+            first_name=callback_query.from_user.first_name,
+            last_name=callback_query.from_user.last_name,
+        )
+        months = config.REPORT_MONTHS
+        first_month = shift_month(month_start(datetime.now()), -(months - 1))
+        rollups = await RollupService.get_monthly_rollups(user.id, first_month)
+
+        # Do not hold a pooled connection while the chart renders and uploads
+        await commit_unit_of_work(db_session)
+
         await callback_query.message.edit_text(
-            "📊 Financial Reports\n\n"
-            "This feature will help you:\n"
-            "• Monthly financial summaries\n"
-            "• Spending trends analysis\n"
-            "• Income vs expense charts\n"
-            "• Goal progress tracking\n\n"
-            "Feature coming soon! 🚀",
+            render_monthly_report(rollups, first_month, months),
             reply_markup=self._get_main_menu(),
         )
+        await send_income_expense_chart(
+            callback_query.message, user.id, rollups, first_month, months
+        )
 
     async def ai_chat_callback(self, callback_query: types.CallbackQuery) -> None:
         """Handle AI chat button callback - creates new session."""
@@ -85,13 +102,11 @@ class CallbackHandlers(BaseCommand):
             )
 
             # Check if user has an active session
-            active_session = await SessionService.get_active_session(user.id)
+            active_session = await SessionService.get_active_session_info(user.id)
             
             if active_session:
                 # Check if the existing session is expired
-                is_expired = await SessionService.is_session_expired(active_session.id)
-                
-                if is_expired:
+                if active_session.is_expired():
                     # End expired session and create new one
                     await SessionService.end_session(active_session.id)
                     session = await SessionService.create_session(
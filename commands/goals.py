@@ -0,0 +1,222 @@
+from datetime import date
+from typing import Optional
+from aiogram import F, types
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from sqlalchemy.ext.asyncio import AsyncSession
+from .base import BaseCommand
+from core.config import config
+from core.goals import goal_projector, render_goal_report
+from core.jobs import GOAL_REMINDER, schedule_goal_reminder
+from core.money import parse_amount
+from database.database import commit_unit_of_work
+from database.models import SavingsGoal
+from database.services.goal_service import GoalService
+from database.services.job_service import JobService
+from database.services.rollup_service import shift_month
+from database.services.user_service import UserService
+
+# Longest goal horizon accepted, in months
+MAX_GOAL_MONTHS = 600
+
+
+class GoalForm(StatesGroup):
+    """Steps of the set savings goal flow."""
+
+    target = State()
+    target_date = State()
+    saved = State()
+
+
+def get_goal_keyboard() -> types.InlineKeyboardMarkup:
+    """Get the keyboard shown under an existing goal."""
+    builder = InlineKeyboardBuilder()
+    builder.add(types.InlineKeyboardButton(text="✏️ New Goal", callback_data="goal_new"))
+    builder.add(types.InlineKeyboardButton(text="🗑️ Remove Goal", callback_data="goal_delete"))
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def parse_target_date(text: str, today: date) -> date:
+    """
+    Parse a goal date given as YYYY-MM-DD or as a number of months from today.
+
+    Raises:
+        ValueError: If the text is neither, or the date is not in the future
+    """
+    text = text.strip()
+    if text.isdigit():
+        months = int(text)
+        if not 0 < months <= MAX_GOAL_MONTHS:
+            raise ValueError(f"'{text}' is not a valid number of months")
+        month = shift_month(today, months)
+        # Clamp to the 28th so every month has the day
+        return month.replace(day=min(today.day, 28))
+
+    target_date = date.fromisoformat(text)
+    if target_date <= today or target_date > shift_month(today, MAX_GOAL_MONTHS):
+        raise ValueError(f"'{text}' is not a future date within {MAX_GOAL_MONTHS // 12} years")
+    return target_date
+
+
+async def show_goal(
+    message: types.Message, goal: SavingsGoal, db_session: Optional[AsyncSession] = None
+) -> None:
+    """
+    Edit a message into the goal's progress and projection.
+
+    The handler's unit of work, if given, is committed before any slow
+    call so its pooled connection is not held meanwhile.
+    """
+    if db_session is not None:
+        await commit_unit_of_work(db_session)
+    await message.edit_text("⏳ Calculating your savings projection...")
+    projection = await goal_projector.project(goal, db_session=db_session)
+    if db_session is not None:
+        await commit_unit_of_work(db_session)
+    await message.edit_text(
+        render_goal_report(goal, projection) + "\n\nType /menu to return to the main menu.",
+        reply_markup=get_goal_keyboard(),
+    )
+
+
+async def start_goal_flow(message: types.Message, state: FSMContext) -> None:
+    """Edit a message into the first step of the set savings goal flow."""
+    await state.set_state(GoalForm.target)
+    builder = InlineKeyboardBuilder()
+    builder.add(types.InlineKeyboardButton(text="✖️ Cancel", callback_data="goal_cancel"))
+    await message.edit_text(
+        "🎯 Set Savings Goal\n\n"
+        f"How much do you want to save, in {config.DEFAULT_CURRENCY}? For example 5000\n\n"
+        "Send /cancel to stop.",
+        reply_markup=builder.as_markup(),
+    )
+
+
+class GoalEntry(BaseCommand):
+    """Multi-step set savings goal flow and goal actions."""
+
+    def register(self) -> None:
+        """Register the handlers of every step of the flow."""
+        self.dp.callback_query.register(
+            self.cancel_callback, StateFilter(GoalForm), F.data == "goal_cancel"
+        )
+        self.dp.message.register(self.cancel_command, StateFilter(GoalForm), Command("cancel"))
+        self.dp.callback_query.register(self.new_goal_callback, F.data == "goal_new")
+        self.dp.callback_query.register(self.delete_goal_callback, F.data == "goal_delete")
+        self.dp.message.register(self.target_entered, GoalForm.target, F.text)
+        self.dp.message.register(self.date_entered, GoalForm.target_date, F.text)
+        self.dp.message.register(self.saved_entered, GoalForm.saved, F.text)
+
+    async def new_goal_callback(self, callback_query: types.CallbackQuery, state: FSMContext) -> None:
+        """Start the flow to replace the current goal."""
+        await callback_query.answer()
+        await start_goal_flow(callback_query.message, state)
+
+    async def delete_goal_callback(self, callback_query: types.CallbackQuery) -> None:
+        """Remove the current goal."""
+        await callback_query.answer()
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=callback_query.from_user.id,
+            username=callback_query.from_user.username,
+            first_name=callback_query.from_user.first_name,
+            last_name=callback_query.from_user.last_name,
+        )
+        await GoalService.delete_goal(user.id)
+        await JobService.cancel_jobs(user.id, kind=GOAL_REMINDER)
+        await callback_query.message.edit_text(
+            "🗑️ Savings goal removed.\n\n📋 Main Menu:", reply_markup=self._get_main_menu()
+        )
+
+    async def target_entered(self, message: types.Message, state: FSMContext) -> None:
+        """Validate the target amount and ask for the date."""
+        try:
+            target_minor = parse_amount(message.text)
+        except ValueError:
+            await message.answer(
+                "❌ Please enter a positive amount with at most two decimals, for example 5000"
+            )
+            return
+
+        await state.update_data(target_minor=target_minor)
+        await state.set_state(GoalForm.target_date)
+        await message.answer(
+            "📅 By when? Send a date as YYYY-MM-DD or a number of months, for example 12"
+        )
+
+    async def date_entered(self, message: types.Message, state: FSMContext) -> None:
+        """Validate the target date and ask for current savings."""
+        try:
+            target_date = parse_target_date(message.text, date.today())
+        except ValueError:
+            await message.answer(
+                "❌ Please send a future date as YYYY-MM-DD or a number of months, for example 12"
+            )
+            return
+
+        await state.update_data(target_date=target_date.isoformat())
+        await state.set_state(GoalForm.saved)
+        await message.answer(
+            "💼 How much have you already saved towards it? Send an amount, or /skip if nothing yet."
+        )
+
+    async def saved_entered(
+        self, message: types.Message, state: FSMContext, db_session: AsyncSession
+    ) -> None:
+        """Save the goal and show its projection."""
+        if message.text.strip() == "/skip":
+            saved_minor = 0
+        else:
+            try:
+                saved_minor = parse_amount(message.text)
+            except ValueError:
+                await message.answer(
+                    "❌ Please enter a positive amount with at most two decimals, or /skip"
+                )
+                return
+
+        data = await state.get_data()
+        await state.clear()
+
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=message.from_user.id,
+            username=message.from_user.username,
+            first_name=message.from_user.first_name,
+            last_name=message.from_user.last_name,
+        )
+        goal = await GoalService.set_goal(
+            user_id=user.id,
+            target_minor=data["target_minor"],
+            target_date=date.fromisoformat(data["target_date"]),
+            saved_minor=saved_minor,
+        )
+        await schedule_goal_reminder(user.id, message.chat.id)
+
+        # Do not hold a pooled connection while the projection runs
+        await commit_unit_of_work(db_session)
+
+        reply = await message.answer("✅ Goal saved. You will get a progress check-in every month.")
+        await show_goal(reply, goal, db_session)
+
+    async def cancel_callback(self, callback_query: types.CallbackQuery, state: FSMContext) -> None:
+        """Abandon the flow from its Cancel button."""
+        await callback_query.answer()
+        await state.clear()
+        await callback_query.message.edit_text("📋 Main Menu:", reply_markup=self._get_main_menu())
+
+    async def cancel_command(self, message: types.Message, state: FSMContext) -> None:
+        """Abandon the flow with /cancel."""
+        await state.clear()
+        await message.answer("✖️ Cancelled.\n\n📋 Main Menu:", reply_markup=self._get_main_menu())
+
+    def _get_main_menu(self):
+        """Get the main menu keyboard."""
+        builder = InlineKeyboardBuilder()
+        builder.add(types.InlineKeyboardButton(text="💰 Add Income/Expense", callback_data="add_transaction"))
+        builder.add(types.InlineKeyboardButton(text="🎯 Set Savings Goal", callback_data="set_savings_goal"))
+        builder.add(types.InlineKeyboardButton(text="📊 Financial Reports", callback_data="financial_reports"))
+        builder.add(types.InlineKeyboardButton(text="🤖 Chat with AI Assistant", callback_data="ai_chat"))
+        builder.adjust(2)  # Arrange buttons in 2 columns
+        return builder.as_markup()
@@ -8,11 +8,16 @@ from .start import StartCommand
 from .menu import MenuCommand
 from .help import HelpCommand
 from .callbacks import CallbackHandlers
+from .transactions import TransactionEntry
+from .goals import GoalEntry
+from .recurring import RecurringCommand
+from .ai_chat import AIChatHandler
 from .echo import EchoHandler
-from core.logging_config import get_logger
+from .middleware import DatabaseSessionMiddleware, HandlerMetricsMiddleware
+from core.logging_config import get_lazy_logger
 
 # Get app logger
-logger = get_logger("app")
+logger = get_lazy_logger("app")
 
 def register_handlers(dp: Dispatcher) -> None:
     """
@@ -21,12 +26,24 @@ def register_handlers(dp: Dispatcher) -> None:
     Args:
         dp (Dispatcher): Aiogram dispatcher instance
     """
+    # Share one database unit of work across all service calls of an update
+    dp.update.outer_middleware(DatabaseSessionMiddleware())
+    
+    # Record handler latency
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+
     # Initialize all command handlers
     # They will automatically register themselves with the dispatcher
     StartCommand(dp)
     MenuCommand(dp)
     HelpCommand(dp)
     CallbackHandlers(dp)
+    TransactionEntry(dp)
+    GoalEntry(dp)
+    RecurringCommand(dp)
+    AIChatHandler(dp)
     EchoHandler(dp)
     
     logger.info("✅ All command handlers registered successfully!")
@@ -19,6 +19,8 @@ Available commands:
 /start - Start the bot and show main menu
 /menu - Show the main menu
 /help - Show this help message
+/cancel - Stop adding an entry or setting a goal
+/recurring - See or stop repeating entries
 
 Main Features:
 💰 Budget Planning
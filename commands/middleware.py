@@ -0,0 +1,81 @@
+"""
+Dispatcher middlewares for the financial planner bot.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from core.metrics import HANDLER_LATENCY
+from database.database import unit_of_work
+
+
+class DatabaseSessionMiddleware(BaseMiddleware):
+    """Run every incoming update inside a single database unit of work."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Open one shared session for the update and commit it after the handler.
+
+        Args:
+            handler: Next handler in the middleware chain
+            event (TelegramObject): Incoming update
+            data (Dict[str, Any]): Handler context data
+
+        Returns:
+            Any: Result of the handler
+        """
+        async with unit_of_work() as session:
+            data["db_session"] = session
+            return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Record the latency of every matched handler."""
+
+    def __init__(self):
+        self._labels: Dict[Any, str] = {}
+
+    def _label(self, callback: Any) -> str:
+        """Get the "Class.method" label of a handler callback."""
+        label = self._labels.get(callback)
+        if label is None:
+            owner = getattr(callback, "__self__", None)
+            name = getattr(callback, "__name__", repr(callback))
+            label = f"{type(owner).__name__}.{name}" if owner is not None else name
+            self._labels[callback] = label
+        return label
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Time the handler and observe it under its owning class and method.
+
+        Args:
+            handler: Next handler in the middleware chain
+            event (TelegramObject): Incoming event
+            data (Dict[str, Any]): Handler context data
+
+        Returns:
+            Any: Result of the handler
+        """
+        handler_object = data.get("handler")
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            if handler_object is not None:
+                HANDLER_LATENCY.labels(self._label(handler_object.callback)).observe(
+                    time.perf_counter() - started_at
+                )
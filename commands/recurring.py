@@ -0,0 +1,66 @@
+from aiogram import F, types
+from aiogram.filters import Command
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from .base import BaseCommand
+from core.jobs import RECURRING_TRANSACTION
+from core.money import format_amount
+from database.services.job_service import JobService
+from database.services.user_service import UserService
+
+
+class RecurringCommand(BaseCommand):
+    """Recurring transactions command handler."""
+
+    def register(self) -> None:
+        """Register the /recurring command and its stop buttons."""
+        self.dp.message.register(self.recurring_command, Command("recurring"))
+        self.dp.callback_query.register(self.stop_callback, F.data.startswith("job_stop:"))
+
+    async def recurring_command(self, message: types.Message) -> None:
+        """Handle the /recurring command."""
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=message.from_user.id,
+            username=message.from_user.username,
+            first_name=message.from_user.first_name,
+            last_name=message.from_user.last_name,
+        )
+        text, keyboard = await self._render(user.id)
+        await message.answer(text, reply_markup=keyboard)
+
+    async def stop_callback(self, callback_query: types.CallbackQuery) -> None:
+        """Stop repeating one entry and show the remaining ones."""
+        await callback_query.answer()
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=callback_query.from_user.id,
+            username=callback_query.from_user.username,
+            first_name=callback_query.from_user.first_name,
+            last_name=callback_query.from_user.last_name,
+        )
+        job_id = int(callback_query.data.split(":", 1)[1])
+        await JobService.cancel_jobs(user.id, kind=RECURRING_TRANSACTION, job_id=job_id)
+        text, keyboard = await self._render(user.id)
+        await callback_query.message.edit_text(text, reply_markup=keyboard)
+
+    async def _render(self, user_id: int):
+        """Get the list of a user's recurring entries and its stop buttons."""
+        jobs = await JobService.get_user_jobs(user_id, kind=RECURRING_TRANSACTION)
+        if not jobs:
+            return (
+                "🔁 Recurring Entries\n\n"
+                "Nothing repeats yet. Save an income or expense and press 🔁 Repeat Monthly.",
+                None,
+            )
+
+        lines = ["🔁 Recurring Entries", ""]
+        builder = InlineKeyboardBuilder()
+        for job in jobs:
+            payload = job.payload
+            amount = format_amount(payload["amount_minor"], payload["currency"])
+            lines.append(f"• {amount} {payload['category']}, next on {job.next_run_at:%d %b %Y}")
+            builder.add(
+                types.InlineKeyboardButton(
+                    text=f"✖️ Stop {payload['category']} {amount}", callback_data=f"job_stop:{job.id}"
+                )
+            )
+        builder.adjust(1)
+        return "\n".join(lines), builder.as_markup()
@@ -0,0 +1,197 @@
+from aiogram import F, types
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from .base import BaseCommand
+from core.config import config
+from core.jobs import RECURRING_TRANSACTION, schedule_recurring_transaction, schedule_spending_digest
+from core.money import format_amount, parse_amount
+from database.services.job_service import JobService
+from database.services.transaction_service import TransactionService
+from database.services.user_service import UserService
+
+INCOME_CATEGORIES = ["Salary", "Business", "Investments", "Gifts", "Other"]
+EXPENSE_CATEGORIES = [
+    "Food", "Transport", "Housing", "Utilities", "Health", "Entertainment", "Shopping", "Other"
+]
+
+
+class TransactionForm(StatesGroup):
+    """Steps of the add income/expense flow."""
+
+    kind = State()
+    amount = State()
+    category = State()
+    description = State()
+
+
+def get_kind_keyboard() -> types.InlineKeyboardMarkup:
+    """Get the income/expense choice keyboard that starts the flow."""
+    builder = InlineKeyboardBuilder()
+    builder.add(types.InlineKeyboardButton(text="📈 Income", callback_data="txn_kind:income"))
+    builder.add(types.InlineKeyboardButton(text="📉 Expense", callback_data="txn_kind:expense"))
+    builder.add(types.InlineKeyboardButton(text="✖️ Cancel", callback_data="txn_cancel"))
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+class TransactionEntry(BaseCommand):
+    """Multi-step add income/expense flow started from the main menu."""
+
+    def register(self) -> None:
+        """Register the handlers of every step of the flow."""
+        self.dp.callback_query.register(
+            self.cancel_callback, StateFilter(TransactionForm), F.data == "txn_cancel"
+        )
+        self.dp.message.register(
+            self.cancel_command, StateFilter(TransactionForm), Command("cancel")
+        )
+        self.dp.callback_query.register(
+            self.kind_chosen, TransactionForm.kind, F.data.startswith("txn_kind:")
+        )
+        self.dp.message.register(self.amount_entered, TransactionForm.amount, F.text)
+        self.dp.callback_query.register(
+            self.category_chosen, TransactionForm.category, F.data.startswith("txn_cat:")
+        )
+        self.dp.message.register(self.category_entered, TransactionForm.category, F.text)
+        self.dp.message.register(self.description_entered, TransactionForm.description, F.text)
+        self.dp.callback_query.register(self.repeat_callback, F.data.startswith("txn_repeat:"))
+
+    async def kind_chosen(self, callback_query: types.CallbackQuery, state: FSMContext) -> None:
+        """Store income or expense and ask for the amount."""
+        await callback_query.answer()
+        kind = callback_query.data.split(":", 1)[1]
+        await state.update_data(kind=kind)
+        await state.set_state(TransactionForm.amount)
+        await callback_query.message.edit_text(
+            f"{'📈 Income' if kind == 'income' else '📉 Expense'}\n\n"
+            f"Enter the amount in {config.DEFAULT_CURRENCY}, for example 12.50\n\n"
+            f"Send /cancel to stop."
+        )
+
+    async def amount_entered(self, message: types.Message, state: FSMContext) -> None:
+        """Validate the amount and ask for the category."""
+        try:
+            amount_minor = parse_amount(message.text)
+        except ValueError:
+            await message.answer(
+                "❌ Please enter a positive amount with at most two decimals, for example 12.50"
+            )
+            return
+
+        data = await state.update_data(amount_minor=amount_minor)
+        await state.set_state(TransactionForm.category)
+
+        categories = INCOME_CATEGORIES if data["kind"] == "income" else EXPENSE_CATEGORIES
+        builder = InlineKeyboardBuilder()
+        for category in categories:
+            builder.add(
+                types.InlineKeyboardButton(text=category, callback_data=f"txn_cat:{category}")
+            )
+        builder.adjust(2)
+        await message.answer(
+            "🏷️ Choose a category or type your own:", reply_markup=builder.as_markup()
+        )
+
+    async def category_chosen(self, callback_query: types.CallbackQuery, state: FSMContext) -> None:
+        """Store a category picked from the keyboard."""
+        await callback_query.answer()
+        await self._ask_description(
+            callback_query.message, state, callback_query.data.split(":", 1)[1]
+        )
+
+    async def category_entered(self, message: types.Message, state: FSMContext) -> None:
+        """Store a typed category."""
+        await self._ask_description(message, state, message.text.strip()[:64])
+
+    async def _ask_description(self, message: types.Message, state: FSMContext, category: str) -> None:
+        """Store the category and ask for an optional note."""
+        await state.update_data(category=category)
+        await state.set_state(TransactionForm.description)
+        await message.answer("📝 Add a note, or send /skip to save without one.")
+
+    async def description_entered(self, message: types.Message, state: FSMContext) -> None:
+        """Save the transaction and end the flow."""
+        description = None if message.text.strip() == "/skip" else message.text.strip()[:255]
+        data = await state.get_data()
+        await state.clear()
+
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=message.from_user.id,
+            username=message.from_user.username,
+            first_name=message.from_user.first_name,
+            last_name=message.from_user.last_name,
+        )
+        amount_minor = data["amount_minor"] if data["kind"] == "income" else -data["amount_minor"]
+        transaction = await TransactionService.add_transaction(
+            user_id=user.id,
+            amount_minor=amount_minor,
+            category=data["category"],
+            description=description,
+        )
+        await schedule_spending_digest(user.id, message.chat.id)
+
+        await message.answer(
+            f"✅ {'Income' if amount_minor > 0 else 'Expense'} saved\n\n"
+            f"Amount: {format_amount(amount_minor, config.DEFAULT_CURRENCY)}\n"
+            f"Category: {data['category']}"
+            + (f"\nNote: {description}" if description else ""),
+            reply_markup=types.InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        types.InlineKeyboardButton(
+                            text="🔁 Repeat Monthly", callback_data=f"txn_repeat:{transaction.id}"
+                        )
+                    ],
+                    *self._get_main_menu().inline_keyboard,
+                ]
+            ),
+        )
+
+    async def repeat_callback(self, callback_query: types.CallbackQuery) -> None:
+        """Record a saved transaction again every month."""
+        await callback_query.answer()
+        user, _ = await UserService.get_or_create_user(
+            telegram_id=callback_query.from_user.id,
+            username=callback_query.from_user.username,
+            first_name=callback_query.from_user.first_name,
+            last_name=callback_query.from_user.last_name,
+        )
+        transaction_id = int(callback_query.data.split(":", 1)[1])
+        transaction = await TransactionService.get_transaction(transaction_id, user.id)
+        if transaction is None:
+            await callback_query.message.answer("❌ That entry no longer exists.")
+            return
+
+        jobs = await JobService.get_user_jobs(user.id, kind=RECURRING_TRANSACTION)
+        if not any(job.payload.get("transaction_id") == transaction_id for job in jobs):
+            await schedule_recurring_transaction(user.id, callback_query.message.chat.id, transaction)
+
+        await callback_query.message.edit_text(
+            f"{callback_query.message.text}\n\n"
+            f"🔁 Repeats on day {min(transaction.occurred_at.day, 28)} of every month. "
+            f"Use /recurring to see or stop repeating entries.",
+            reply_markup=self._get_main_menu(),
+        )
+
+    async def cancel_callback(self, callback_query: types.CallbackQuery, state: FSMContext) -> None:
+        """Abandon the flow from its Cancel button."""
+        await callback_query.answer()
+        await state.clear()
+        await callback_query.message.edit_text("📋 Main Menu:", reply_markup=self._get_main_menu())
+
+    async def cancel_command(self, message: types.Message, state: FSMContext) -> None:
+        """Abandon the flow with /cancel."""
+        await state.clear()
+        await message.answer("✖️ Cancelled.\n\n📋 Main Menu:", reply_markup=self._get_main_menu())
+
+    def _get_main_menu(self):
+        """Get the main menu keyboard."""
+        builder = InlineKeyboardBuilder()
+        builder.add(types.InlineKeyboardButton(text="💰 Add Income/Expense", callback_data="add_transaction"))
+        builder.add(types.InlineKeyboardButton(text="🎯 Set Savings Goal", callback_data="set_savings_goal"))
+        builder.add(types.InlineKeyboardButton(text="📊 Financial Reports", callback_data="financial_reports"))
+        builder.add(types.InlineKeyboardButton(text="🤖 Chat with AI Assistant", callback_data="ai_chat"))
+        builder.adjust(2)  # Arrange buttons in 2 columns
+        return builder.as_markup()
@@ -0,0 +1,53 @@
+"""
+Background writer for buffered session activity timestamps.
+"""
+
+import asyncio
+
+from database.services.session_service import SessionService
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get session logger
+logger = get_lazy_logger("session")
+
+
+class SessionActivityFlusher:
+    """Periodically writes buffered session last_activity values to the database."""
+
+    def __init__(self, interval: float = None):
+        """
+        Initialize the flusher.
+
+        Args:
+            interval (float): Seconds between flushes, defaults to SESSION_ACTIVITY_FLUSH_INTERVAL
+        """
+        self.interval = interval or config.SESSION_ACTIVITY_FLUSH_INTERVAL
+        self.is_running = False
+
+    async def start_flusher(self) -> None:
+        """Start the background flush loop."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        logger.info("🔄 Session activity flusher started")
+
+        while self.is_running:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def stop_flusher(self) -> None:
+        """Stop the flush loop and write any remaining buffered activity."""
+        self.is_running = False
+        await self.flush()
+        logger.info("🛑 Session activity flusher stopped")
+
+    async def flush(self) -> None:
+        """Write buffered activity now."""
+        try:
+            flushed = await SessionService.flush_session_activity()
+            if flushed:
+                logger.debug("💾 Flushed activity of %s sessions", flushed)
+        except Exception as e:
+            logger.error("❌ Error flushing session activity: %s", e)
@@ -0,0 +1,232 @@
+"""
+Prompt assembly and the language model behind the AI assistant.
+"""
+
+import asyncio
+import json
+import re
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from core.config import config
+from core.conversation import ConversationTurn
+from core.money import format_amount
+
+SYSTEM_PROMPT = (
+    "You are a friendly financial planning assistant inside a Telegram bot. "
+    "Give practical, concise answers about budgeting, saving and spending."
+)
+
+# Words the stub model draws its replies from
+STUB_WORDS = (
+    "A good first step is to look at where your money goes each month. "
+    "List your fixed costs such as rent and bills, then your flexible "
+    "spending like food and entertainment. Aim to put a fixed share of "
+    "every income into savings before spending the rest, and keep an "
+    "emergency fund of three to six months of expenses. Review your "
+    "categories in the Financial Reports screen to see which ones grow "
+    "fastest and set a savings goal to track your progress."
+).split()
+
+# Phrases of questions about the user's own money, answered with their ledger
+_OWN_FINANCES = re.compile(
+    r"\b(my|mine|our|i spent|i spend|i earned|i earn|i paid|i've spent|i have spent)\b",
+    re.IGNORECASE,
+)
+
+# Expense categories included in a ledger summary
+LEDGER_CATEGORIES = 3
+
+
+def mentions_own_finances(text: str) -> bool:
+    """Check if a question is about the user's own money rather than finance in general."""
+    return _OWN_FINANCES.search(text) is not None
+
+
+def summarize_ledger(rollups: Sequence) -> str:
+    """
+    Describe a month of the user's ledger for the model.
+
+    Args:
+        rollups (Sequence): Rows of one month as returned by
+            RollupService.get_monthly_rollups
+
+    Returns:
+        str: Income, expenses and top expense categories per currency
+    """
+    if not rollups:
+        return "The user has recorded no transactions this month."
+
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    categories: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for row in rollups:
+        totals[row.currency][0] += row.income_minor
+        totals[row.currency][1] += row.expense_minor
+        if row.expense_minor:
+            categories[row.currency][row.category] += row.expense_minor
+
+    lines = ["The user's ledger this month:"]
+    for currency in sorted(totals):
+        income, expense = totals[currency]
+        line = f"income {format_amount(income, currency)}, expenses {format_amount(expense, currency)}"
+        top = sorted(categories[currency].items(), key=lambda item: item[1], reverse=True)
+        if top:
+            line += "; top expenses " + ", ".join(
+                f"{category} {format_amount(amount, currency)}" for category, amount in top[:LEDGER_CATEGORIES]
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_prompt(
+    turns: Sequence[ConversationTurn], user_content: str, ledger: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Assemble the chat messages sent to the model.
+
+    Args:
+        turns (Sequence[ConversationTurn]): Earlier turns of the session, oldest first
+        user_content (str): The user's new message
+        ledger (Optional[str]): Summary of the user's ledger from
+            summarize_ledger(), for questions about their own money
+
+    Returns:
+        List[Dict[str, str]]: Messages with "role" and "content" keys
+    """
+    prompt = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if ledger:
+        prompt.append({"role": "system", "content": ledger})
+    for turn in turns:
+        prompt.append({"role": "user", "content": turn.user_content})
+        if turn.bot_content:
+            prompt.append({"role": "assistant", "content": turn.bot_content})
+    prompt.append({"role": "user", "content": user_content})
+    return prompt
+
+
+class StubModel:
+    """
+    Local stand-in for a streaming language model.
+
+    Yields a canned reply one word at a time with a configurable delay
+    before the first token and between tokens, so the streaming path can
+    be exercised and measured without a model server.
+    """
+
+    supports_batching = False
+
+    def __init__(
+        self,
+        first_token_delay: float = None,
+        token_delay: float = None,
+        reply_tokens: int = None,
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            first_token_delay (float): Seconds before the first token,
+                defaults to AI_STUB_FIRST_TOKEN_MS
+            token_delay (float): Seconds between tokens, defaults to
+                AI_STUB_TOKEN_MS
+            reply_tokens (int): Tokens per reply, defaults to AI_STUB_REPLY_TOKENS
+        """
+        self.first_token_delay = (
+            first_token_delay if first_token_delay is not None else config.AI_STUB_FIRST_TOKEN_MS / 1000
+        )
+        self.token_delay = token_delay if token_delay is not None else config.AI_STUB_TOKEN_MS / 1000
+        self.reply_tokens = reply_tokens or config.AI_STUB_REPLY_TOKENS
+
+    async def stream(self, prompt: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Generate a reply token by token.
+
+        Args:
+            prompt (List[Dict[str, str]]): Messages built by build_prompt()
+
+        Yields:
+            str: Next piece of the reply text
+        """
+        await asyncio.sleep(self.first_token_delay)
+        # Start at a point derived from the question so replies differ
+        offset = len(prompt[-1]["content"]) % len(STUB_WORDS)
+        for index in range(self.reply_tokens):
+            if index:
+                await asyncio.sleep(self.token_delay)
+            word = STUB_WORDS[(offset + index) % len(STUB_WORDS)]
+            yield word if index == 0 else " " + word
+
+    async def close(self) -> None:
+        """Release resources; the stub holds none."""
+
+
+class HTTPModel:
+    """
+    Client of a model server that streams tokens as newline-delimited JSON.
+
+    A POST of {"prompts": [prompt, ...]} is answered with one
+    {"index": i, "token": "..."} line per generated token, where index is
+    the position of the prompt in the request, so one call can generate
+    replies to several prompts at once.
+    """
+
+    supports_batching = True
+
+    def __init__(self, url: str):
+        """
+        Initialize the client.
+
+        Args:
+            url (str): Generation endpoint of the model server
+        """
+        self.url = url
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _generate(self, prompts: List[List[Dict[str, str]]]) -> AsyncIterator[Tuple[int, str]]:
+        if self._session is None or self._session.closed:
+            # Generation takes as long as it takes; callers enforce deadlines
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None))
+        async with self._session.post(self.url, json={"prompts": prompts}) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.strip():
+                    data = json.loads(line)
+                    yield data["index"], data["token"]
+
+    async def stream(self, prompt: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Generate a reply token by token.
+
+        Args:
+            prompt (List[Dict[str, str]]): Messages built by build_prompt()
+
+        Yields:
+            str: Next piece of the reply text
+        """
+        async for _, token in self._generate([prompt]):
+            yield token
+
+    async def stream_batch(self, prompts: List[List[Dict[str, str]]]) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Generate replies to several prompts in one call.
+
+        Args:
+            prompts (List[List[Dict[str, str]]]): Prompts built by build_prompt()
+
+        Yields:
+            Tuple[int, str]: Index of the prompt and the next piece of its reply
+        """
+        async for pair in self._generate(prompts):
+            yield pair
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# Global model used by the AI assistant
+ai_model = HTTPModel(config.AI_MODEL_URL) if config.AI_MODEL_URL else StubModel()
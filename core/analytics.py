@@ -0,0 +1,385 @@
+"""
+Vectorized ledger analytics on columnar NumPy arrays.
+
+A ledger is loaded once into parallel arrays of user IDs, timestamps,
+amounts and category codes; every statistic is then computed with array
+operations instead of per-transaction Python loops. Group sums use
+float64 accumulators, which stay exact below 2**53 minor units.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from database.services.transaction_service import TransactionService
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class LedgerArrays:
+    """Columnar copy of one or more users' ledgers, ordered by user and time."""
+
+    __slots__ = ("user_ids", "timestamps", "amounts", "category_codes", "categories")
+
+    def __init__(
+        self,
+        user_ids: np.ndarray,
+        timestamps: np.ndarray,
+        amounts: np.ndarray,
+        category_codes: np.ndarray,
+        categories: List[str],
+    ):
+        """
+        Initialize the ledger.
+
+        Args:
+            user_ids (np.ndarray): int64 owner of every transaction
+            timestamps (np.ndarray): datetime64[us] time of every transaction
+            amounts (np.ndarray): int64 signed amount in minor units
+            category_codes (np.ndarray): int64 index into categories
+            categories (List[str]): Category names, sorted
+        """
+        self.user_ids = user_ids
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.category_codes = category_codes
+        self.categories = categories
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, datetime, int, str]]) -> "LedgerArrays":
+        """
+        Build the arrays from (user_id, occurred_at, amount_minor, category) rows.
+
+        Further columns, such as the currency of
+        TransactionService.get_ledger_columns rows, are ignored.
+
+        Args:
+            rows (Sequence[Tuple[int, datetime, int, str]]): Ledger rows
+
+        Returns:
+            LedgerArrays: Columnar ledger
+        """
+        if not rows:
+            return cls(
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype="datetime64[us]"),
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.int64),
+                [],
+            )
+
+        count = len(rows)
+        # Integer microseconds are several times faster to convert than
+        # datetime objects, and a dict encodes categories faster than np.unique
+        timestamps = np.fromiter(
+            ((row[1] - _EPOCH) // _MICROSECOND for row in rows), dtype=np.int64, count=count
+        ).view("datetime64[us]")
+        index: Dict[str, int] = {}
+        codes = np.fromiter(
+            (index.setdefault(row[3], len(index)) for row in rows), dtype=np.int64, count=count
+        )
+        names = sorted(index)
+        ranks = np.empty(len(names), dtype=np.int64)
+        ranks[[index[name] for name in names]] = np.arange(len(names))
+        return cls(
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=count),
+            timestamps,
+            np.fromiter((row[2] for row in rows), dtype=np.int64, count=count),
+            ranks[codes],
+            names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def months(self) -> np.ndarray:
+        """Month of every transaction as int64 months since January 1970."""
+        return self.timestamps.astype("datetime64[M]").astype(np.int64)
+
+    def select(self, start: datetime = None, end: datetime = None) -> "LedgerArrays":
+        """
+        Get the transactions in [start, end).
+
+        Args:
+            start (datetime): Inclusive lower bound, or None
+            end (datetime): Exclusive upper bound, or None
+
+        Returns:
+            LedgerArrays: Ledger sharing this one's category names
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps >= np.datetime64(start, "us")
+        if end is not None:
+            mask &= self.timestamps < np.datetime64(end, "us")
+        return LedgerArrays(
+            self.user_ids[mask],
+            self.timestamps[mask],
+            self.amounts[mask],
+            self.category_codes[mask],
+            self.categories,
+        )
+
+
+async def load_ledger(
+    user_ids: Union[int, Iterable[int]],
+    start: datetime = None,
+    end: datetime = None,
+    currency: str = None,
+) -> LedgerArrays:
+    """
+    Load one or more users' ledgers with a single query.
+
+    Amounts are summed as they are, so pass a currency unless every
+    transaction is known to share one.
+
+    Args:
+        user_ids (Union[int, Iterable[int]]): Database ID of a user, or several
+        start (datetime): Inclusive lower bound of occurred_at
+        end (datetime): Exclusive upper bound of occurred_at
+        currency (str): Only transactions in this currency, or None for all
+
+    Returns:
+        LedgerArrays: Columnar ledger
+    """
+    if isinstance(user_ids, int):
+        user_ids = [user_ids]
+    rows = await TransactionService.get_ledger_columns(list(user_ids), start, end, currency)
+    return LedgerArrays.from_rows(rows)
+
+
+async def load_ledgers_by_currency(
+    user_ids: Iterable[int], start: datetime = None, end: datetime = None
+) -> Dict[str, LedgerArrays]:
+    """
+    Load several users' ledgers with a single query, one ledger per currency.
+
+    Args:
+        user_ids (Iterable[int]): Database IDs of the users
+        start (datetime): Inclusive lower bound of occurred_at
+        end (datetime): Exclusive upper bound of occurred_at
+
+    Returns:
+        Dict[str, LedgerArrays]: Columnar ledger keyed by currency
+    """
+    rows = await TransactionService.get_ledger_columns(list(user_ids), start, end)
+    by_currency: Dict[str, List] = {}
+    for row in rows:
+        by_currency.setdefault(row.currency, []).append(row)
+    return {currency: LedgerArrays.from_rows(rows) for currency, rows in by_currency.items()}
+
+
+def _split(amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split signed amounts into income and expense weights, both positive."""
+    return np.where(amounts > 0, amounts, 0), np.where(amounts < 0, -amounts, 0)
+
+
+def _month_axis(months: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Get the offset of every month from the first one and the span."""
+    first = months.min()
+    offsets = months - first
+    span = int(offsets.max()) + 1
+    axis = np.arange(first, first + span).astype("datetime64[M]")
+    return offsets, axis, span
+
+
+def category_breakdown(ledger: LedgerArrays) -> Dict[str, Dict[str, int]]:
+    """
+    Sum income, expenses and counts per category.
+
+    Args:
+        ledger (LedgerArrays): Transactions to summarize
+
+    Returns:
+        Dict[str, Dict[str, int]]: income_minor, expense_minor and count
+        keyed by category, for categories with transactions only
+    """
+    size = len(ledger.categories)
+    income, expense = _split(ledger.amounts)
+    counts = np.bincount(ledger.category_codes, minlength=size)
+    incomes = np.bincount(ledger.category_codes, weights=income, minlength=size)
+    expenses = np.bincount(ledger.category_codes, weights=expense, minlength=size)
+    return {
+        ledger.categories[code]: {
+            "income_minor": int(incomes[code]),
+            "expense_minor": int(expenses[code]),
+            "count": int(counts[code]),
+        }
+        for code in np.flatnonzero(counts)
+    }
+
+
+def monthly_totals(ledger: LedgerArrays) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum income and expenses per calendar month.
+
+    Months without transactions between the first and the last one are
+    included with zero totals, so the series can be fed to
+    rolling_average and month_over_month directly.
+
+    Args:
+        ledger (LedgerArrays): Transactions to summarize
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: datetime64[M] months,
+        int64 income and int64 expenses per month
+    """
+    if not len(ledger):
+        empty = np.empty(0, dtype=np.int64)
+        return np.empty(0, dtype="datetime64[M]"), empty, empty
+
+    offsets, axis, span = _month_axis(ledger.months)
+    income, expense = _split(ledger.amounts)
+    return (
+        axis,
+        np.bincount(offsets, weights=income, minlength=span).astype(np.int64),
+        np.bincount(offsets, weights=expense, minlength=span).astype(np.int64),
+    )
+
+
+def rolling_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing moving average along the last axis.
+
+    The first window - 1 entries average over the values available so far.
+
+    Args:
+        values (np.ndarray): Series, or one series per row
+        window (int): Number of values averaged
+
+    Returns:
+        np.ndarray: float64 averages with the shape of values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    cumulative = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:] = cumulative[..., :-window]
+    counts = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return (cumulative - shifted) / counts
+
+
+def month_over_month(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Change of every value against the previous one along the last axis.
+
+    Args:
+        values (np.ndarray): Series, or one series per row
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Absolute deltas and percent changes,
+        both one shorter than the series; the percent change is NaN where
+        the previous value is zero
+    """
+    values = np.asarray(values, dtype=np.float64)
+    previous = values[..., :-1]
+    delta = np.diff(values, axis=-1)
+    percent = np.full_like(delta, np.nan)
+    np.divide(delta * 100, previous, out=percent, where=previous != 0)
+    return delta, percent
+
+
+def amount_percentiles(
+    ledger: LedgerArrays, percentiles: Sequence[float] = (50, 90, 99), expenses: bool = True
+) -> Dict[float, float]:
+    """
+    Percentiles of transaction sizes.
+
+    Args:
+        ledger (LedgerArrays): Transactions to summarize
+        percentiles (Sequence[float]): Percentiles between 0 and 100
+        expenses (bool): Expenses if True, income otherwise
+
+    Returns:
+        Dict[float, float]: Size in minor units keyed by percentile, empty
+        if there are no matching transactions
+    """
+    sizes = -ledger.amounts[ledger.amounts < 0] if expenses else ledger.amounts[ledger.amounts > 0]
+    if not len(sizes):
+        return {}
+    return dict(zip(percentiles, np.percentile(sizes, percentiles).tolist()))
+
+
+def monthly_totals_by_user(
+    ledger: LedgerArrays,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum income and expenses per user and month in one pass.
+
+    Args:
+        ledger (LedgerArrays): Transactions of many users
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Sorted user
+        IDs, datetime64[M] months, and int64 income and expense matrices
+        of shape (users, months)
+    """
+    if not len(ledger):
+        empty = np.empty((0, 0), dtype=np.int64)
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[M]"), empty, empty
+
+    users, user_index = np.unique(ledger.user_ids, return_inverse=True)
+    offsets, axis, span = _month_axis(ledger.months)
+    cells = user_index.ravel() * span + offsets
+    size = len(users) * span
+    income, expense = _split(ledger.amounts)
+    return (
+        users,
+        axis,
+        np.bincount(cells, weights=income, minlength=size).astype(np.int64).reshape(len(users), span),
+        np.bincount(cells, weights=expense, minlength=size).astype(np.int64).reshape(len(users), span),
+    )
+
+
+def spending_digests(ledger: LedgerArrays, month: date) -> Dict[int, Dict[str, object]]:
+    """
+    Summarize one month against the previous one for every user at once.
+
+    Args:
+        ledger (LedgerArrays): Transactions of many users covering at
+            least the month and the month before it
+        month (date): Any day of the month summarized
+
+    Returns:
+        Dict[int, Dict[str, object]]: Per user ID: income_minor,
+        expense_minor, previous_expense_minor, expense_change_percent
+        (None without spending in the previous month) and top_category
+        (None without spending in the month)
+    """
+    current = np.datetime64(month, "M").astype(np.int64)
+    months = ledger.months
+    in_month = months == current
+    in_previous = months == current - 1
+
+    users, user_index = np.unique(ledger.user_ids, return_inverse=True)
+    user_index = user_index.ravel()
+    count = len(users)
+    income, expense = _split(ledger.amounts)
+
+    month_income = np.bincount(user_index[in_month], weights=income[in_month], minlength=count)
+    month_expense = np.bincount(user_index[in_month], weights=expense[in_month], minlength=count)
+    previous_expense = np.bincount(
+        user_index[in_previous], weights=expense[in_previous], minlength=count
+    )
+    _, change = month_over_month(np.stack([previous_expense, month_expense], axis=-1))
+
+    size = len(ledger.categories)
+    by_category = np.bincount(
+        user_index[in_month] * size + ledger.category_codes[in_month],
+        weights=expense[in_month],
+        minlength=count * size,
+    ).reshape(count, size)
+    top = by_category.argmax(axis=1) if size else np.zeros(count, dtype=np.int64)
+
+    return {
+        int(user_id): {
+            "income_minor": int(month_income[index]),
+            "expense_minor": int(month_expense[index]),
+            "previous_expense_minor": int(previous_expense[index]),
+            "expense_change_percent": None if np.isnan(change[index, 0]) else float(change[index, 0]),
+            "top_category": ledger.categories[top[index]] if month_expense[index] else None,
+        }
+        for index, user_id in enumerate(users)
+    }
@@ -0,0 +1,289 @@
+"""
+Cache of AI assistant answers to generic questions asked by many users.
+"""
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from core.config import config
+
+# Apostrophes are dropped so "what's" and "whats" fold to the same word
+_APOSTROPHES = re.compile(r"['’]")
+_NON_WORD = re.compile(r"[\W_]+")
+_NUMBER = re.compile(r"\d+")
+
+# Length of the character n-grams compared by the approximate tier
+NGRAM_SIZE = 3
+
+# Words that turn a question around; approximate matches must share all of
+# them, so "should I not invest" never borrows the answer to "should I invest"
+NEGATIONS = frozenset({
+    "not", "no", "never", "nor", "neither", "without", "none", "nothing",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "cant",
+    "cannot", "wont", "shouldnt", "wouldnt", "couldnt", "avoid", "stop",
+})
+
+# Opposites that trigram similarity barely tells apart, such as invest/divest
+ANTONYMS = (
+    ("invest", "divest"),
+    ("buy", "sell"),
+    ("save", "spend"),
+    ("saving", "spending"),
+    ("borrow", "lend"),
+    ("deposit", "withdraw"),
+    ("income", "expense", "expenses"),
+    ("increase", "decrease"),
+    ("more", "less", "fewer"),
+    ("higher", "lower"),
+    ("high", "low"),
+    ("before", "after"),
+    ("early", "late"),
+    ("short", "long"),
+    ("rent", "own"),
+    ("profit", "loss"),
+    ("gain", "lose"),
+    ("credit", "debit"),
+    ("asset", "liability"),
+    ("gross", "net"),
+    ("fixed", "variable"),
+    ("over", "under"),
+    ("above", "below"),
+    ("open", "close"),
+    ("start", "end"),
+    ("better", "worse"),
+    ("best", "worst"),
+)
+POLARITY_WORDS = NEGATIONS | frozenset(word for group in ANTONYMS for word in group)
+
+
+def normalize_question(text: str) -> str:
+    """
+    Fold case, whitespace and punctuation out of a question.
+
+    Args:
+        text (str): Question as the user typed it
+
+    Returns:
+        str: Lowercase words separated by single spaces
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(_NON_WORD.sub(" ", _APOSTROPHES.sub("", text)).split())
+
+
+def question_ngrams(normalized: str) -> FrozenSet[str]:
+    """Get the character n-grams of a normalized question, padded at both ends."""
+    padded = f" {normalized} "
+    return frozenset(padded[index:index + NGRAM_SIZE] for index in range(len(padded) - NGRAM_SIZE + 1))
+
+
+def question_numbers(normalized: str) -> Tuple[str, ...]:
+    """Get the numbers in a normalized question, which approximate matches must share."""
+    return tuple(_NUMBER.findall(normalized))
+
+
+def question_polarity(normalized: str) -> FrozenSet[str]:
+    """Get the negation and antonym words of a normalized question, which approximate matches must share."""
+    return frozenset(word for word in normalized.split() if word in POLARITY_WORDS)
+
+
+class CachedAnswer:
+    """An answer with the normalized question it was generated for and its hit statistics."""
+
+    __slots__ = (
+        "question",
+        "answer",
+        "ngrams",
+        "numbers",
+        "polarity",
+        "created_at",
+        "expires_at",
+        "hits",
+        "last_hit_at",
+    )
+
+    def __init__(self, question: str, answer: str, ttl: float):
+        now = time.monotonic()
+        self.question = question
+        self.answer = answer
+        self.ngrams = question_ngrams(question)
+        self.numbers = question_numbers(question)
+        self.polarity = question_polarity(question)
+        self.created_at = now
+        self.expires_at = now + ttl
+        self.hits = 0
+        self.last_hit_at: Optional[float] = None
+
+
+class AnswerCache:
+    """
+    Bounded LRU cache of answers keyed by normalized question text.
+
+    Lookups try the exact normalized question first. When that misses and
+    ANSWER_CACHE_SIMILARITY is above zero, the cached question with the
+    highest Jaccard similarity of character trigrams is used if it reaches
+    the threshold and contains the same numbers and the same negation and
+    antonym words, which catches typos and small rewordings; "save 10%"
+    never borrows the answer to "save 20%", nor "should I not invest" or
+    "should I divest" the answer to "should I invest". A typo in one of
+    those words makes the lookup miss. Candidates come from an inverted
+    index of trigrams, so only questions sharing text with the new one
+    are scored. Approximate matching is off by default.
+
+    Entries expire after ANSWER_CACHE_TTL seconds and the least recently
+    used is evicted beyond ANSWER_CACHE_SIZE entries. Callers decide what
+    is cacheable: only answers that do not depend on the user's own data
+    or earlier conversation belong here.
+    """
+
+    def __init__(self, max_size: int = None, ttl: float = None, similarity: float = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Entries before the least recently used is
+                evicted, 0 disables the cache
+            ttl (float): Entry lifetime in seconds
+            similarity (float): Trigram similarity an approximate match
+                needs, 0 disables approximate matching
+        """
+        self.max_size = max_size if max_size is not None else config.ANSWER_CACHE_SIZE
+        self.ttl = ttl or config.ANSWER_CACHE_TTL
+        self.similarity = similarity if similarity is not None else config.ANSWER_CACHE_SIMILARITY
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, question: str) -> Tuple[Optional[CachedAnswer], str]:
+        """
+        Look up the answer to a question and mark it as recently used.
+
+        Args:
+            question (str): Question as the user typed it
+
+        Returns:
+            Tuple[Optional[CachedAnswer], str]: The entry, or None, and how
+            it was found: "exact", "similar" or "miss"
+        """
+        normalized = normalize_question(question)
+        now = time.monotonic()
+
+        entry = self._entries.get(normalized)
+        if entry is not None and entry.expires_at < now:
+            self._remove(normalized)
+            entry = None
+        kind = "exact"
+        if entry is None and self.similarity > 0 and normalized:
+            entry = self._most_similar(normalized, now)
+            kind = "similar"
+        if entry is None:
+            self.misses += 1
+            return None, "miss"
+
+        self._entries.move_to_end(entry.question)
+        entry.hits += 1
+        entry.last_hit_at = now
+        if kind == "exact":
+            self.exact_hits += 1
+        else:
+            self.similar_hits += 1
+        return entry, kind
+
+    def set(self, question: str, answer: str) -> None:
+        """
+        Store the answer to a question, evicting the least recently used entry when full.
+
+        Args:
+            question (str): Question as the user typed it
+            answer (str): Complete answer text
+        """
+        normalized = normalize_question(question)
+        if self.max_size <= 0 or not normalized:
+            return
+
+        if normalized in self._entries:
+            self._remove(normalized)
+        entry = CachedAnswer(normalized, answer, self.ttl)
+        self._entries[normalized] = entry
+        for ngram in entry.ngrams:
+            self._postings.setdefault(ngram, set()).add(normalized)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, question: str) -> None:
+        """Remove the entry of a question if present."""
+        normalized = normalize_question(question)
+        if normalized in self._entries:
+            self._remove(normalized)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._postings.clear()
+
+    def top(self, limit: int = 10) -> List[CachedAnswer]:
+        """Get the entries with the most hits, most first."""
+        return sorted(self._entries.values(), key=lambda entry: entry.hits, reverse=True)[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Current size and hit/miss/eviction counters
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, normalized: str) -> None:
+        entry = self._entries.pop(normalized)
+        for ngram in entry.ngrams:
+            keys = self._postings.get(ngram)
+            if keys is not None:
+                keys.discard(normalized)
+                if not keys:
+                    del self._postings[ngram]
+
+    def _most_similar(self, normalized: str, now: float) -> Optional[CachedAnswer]:
+        """Find the live entry most similar to a question, if similar enough."""
+        ngrams = question_ngrams(normalized)
+        numbers = question_numbers(normalized)
+        polarity = question_polarity(normalized)
+        overlaps: Dict[str, int] = {}
+        for ngram in ngrams:
+            for key in self._postings.get(ngram, ()):
+                overlaps[key] = overlaps.get(key, 0) + 1
+
+        best, best_score = None, self.similarity
+        expired = []
+        for key, overlap in overlaps.items():
+            entry = self._entries[key]
+            score = overlap / (len(ngrams) + len(entry.ngrams) - overlap)
+            if score < best_score or entry.numbers != numbers or entry.polarity != polarity:
+                continue
+            if entry.expires_at < now:
+                expired.append(key)
+                continue
+            best, best_score = entry, score
+        for key in expired:
+            self._remove(key)
+        return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global answer cache of the AI assistant
+answer_cache = AnswerCache()
@@ -0,0 +1,189 @@
+"""
+Background archival of old conversation messages to cold storage.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, Optional
+
+from database.services.archive_service import ArchiveService
+from core.config import config
+from core.leader import LeaderElection
+from core.logging_config import get_lazy_logger
+from core.message_archive import MessageArchive
+from core.metrics import ARCHIVE_MESSAGES, ARCHIVE_RUN_DURATION
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+
+class MessageArchiver:
+    """
+    Moves messages of long-ended sessions out of the messages table.
+
+    Every ARCHIVE_INTERVAL seconds the sessions that ended more than
+    ARCHIVE_AFTER_DAYS days ago and still have messages are taken in
+    keyset order, ARCHIVE_SESSION_BATCH at a time. Their rows are appended
+    to the message archive and, once the archive file is synced, deleted
+    with one short transaction per ARCHIVE_DELETE_CHUNK rows, pausing
+    ARCHIVE_CHUNK_PAUSE_MS between chunks so row locks and replication lag
+    stay small next to live traffic. A run stops after ARCHIVE_MAX_ROWS
+    rows and carries on at the next interval.
+
+    With several instances only the elected leader archives.
+    """
+
+    def __init__(
+        self,
+        archive: MessageArchive = None,
+        leader: Optional[LeaderElection] = None,
+        after_days: int = None,
+        session_batch: int = None,
+        delete_chunk: int = None,
+        chunk_pause: float = None,
+        max_rows: int = None,
+    ):
+        """
+        Initialize the archiver.
+
+        Args:
+            archive (MessageArchive): Archive written to, defaults to one in ARCHIVE_DIR
+            leader (Optional[LeaderElection]): Election deciding which
+                instance archives; without it this one always does
+            after_days (int): Days after a session ended before its
+                messages are archived
+            session_batch (int): Sessions archived per archive append
+            delete_chunk (int): Rows deleted per transaction
+            chunk_pause (float): Seconds between delete transactions
+            max_rows (int): Rows archived per run
+        """
+        self.archive = archive or MessageArchive()
+        self.leader = leader
+        self.after_days = after_days if after_days is not None else config.ARCHIVE_AFTER_DAYS
+        self.session_batch = session_batch or config.ARCHIVE_SESSION_BATCH
+        self.delete_chunk = delete_chunk or config.ARCHIVE_DELETE_CHUNK
+        self.chunk_pause = (
+            chunk_pause if chunk_pause is not None else config.ARCHIVE_CHUNK_PAUSE_MS / 1000
+        )
+        self.max_rows = max_rows or config.ARCHIVE_MAX_ROWS
+        self.is_running = False
+        self._stopped: Optional[asyncio.Event] = None
+
+    def _may_run(self) -> bool:
+        return self.leader is None or self.leader.is_leader
+
+    async def start_archiver(self) -> None:
+        """Start the background task that archives old messages every ARCHIVE_INTERVAL."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._stopped = asyncio.Event()
+        logger.info("🗄️ Message archiver started for sessions ended %s days ago", self.after_days)
+
+        while self.is_running:
+            try:
+                if self._may_run():
+                    await self.archive_old_messages()
+            except Exception as e:
+                logger.error("❌ Error in message archiver: %s", e)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=config.ARCHIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop_archiver(self) -> None:
+        """Stop the background archiver after its current chunk."""
+        self.is_running = False
+        if self._stopped is not None:
+            self._stopped.set()
+        logger.info("🛑 Message archiver stopped")
+
+    async def archive_old_messages(self) -> Dict[str, int]:
+        """
+        Archive and delete the messages of sessions ended before the cutoff.
+
+        Returns:
+            dict: Sessions and rows archived, rows deleted and archive bytes written
+        """
+        cutoff = datetime.now() - timedelta(days=self.after_days)
+        loop = asyncio.get_running_loop()
+        totals = {"sessions": 0, "rows": 0, "deleted": 0, "bytes": 0}
+        started_at = time.perf_counter()
+        after_id = 0
+        # Restored sessions stay in the table as long as if they had just ended
+        held = await loop.run_in_executor(None, self.archive.restored_since, cutoff.timestamp())
+
+        while totals["rows"] < self.max_rows:
+            # Stopping or losing leadership ends the run between batches
+            if self._stopped is not None and self._stopped.is_set():
+                break
+            if not self._may_run():
+                break
+
+            session_ids = await ArchiveService.get_archivable_sessions(
+                cutoff, after_id=after_id, limit=self.session_batch
+            )
+            if not session_ids:
+                break
+            after_id = session_ids[-1]
+            session_ids = [session_id for session_id in session_ids if session_id not in held]
+            if not session_ids:
+                continue
+            rows = await ArchiveService.get_message_rows(session_ids)
+            sessions = [
+                (session_id, list(session_rows))
+                for session_id, session_rows in groupby(rows, key=lambda row: row["session_id"])
+            ]
+            totals["bytes"] += await loop.run_in_executor(None, self.archive.append, sessions)
+            totals["sessions"] += len(sessions)
+            totals["rows"] += len(rows)
+            ARCHIVE_MESSAGES.labels("archived").inc(len(rows))
+
+            message_ids = [row["id"] for row in rows]
+            for offset in range(0, len(message_ids), self.delete_chunk):
+                deleted = await ArchiveService.delete_messages(message_ids[offset:offset + self.delete_chunk])
+                totals["deleted"] += deleted
+                ARCHIVE_MESSAGES.labels("deleted").inc(deleted)
+                if self.chunk_pause > 0:
+                    await asyncio.sleep(self.chunk_pause)
+
+        ARCHIVE_RUN_DURATION.observe(time.perf_counter() - started_at)
+        if totals["rows"]:
+            logger.info(
+                "🗄️ Archived %s messages of %s sessions (%s bytes) and deleted %s rows",
+                totals["rows"],
+                totals["sessions"],
+                totals["bytes"],
+                totals["deleted"],
+            )
+        return totals
+
+    async def restore_session(self, session_id: int) -> int:
+        """
+        Put the archived messages of a session back into the messages table.
+
+        The archive copy stays, and the archiver leaves the session alone
+        for ARCHIVE_AFTER_DAYS days from the restore.
+
+        Args:
+            session_id (int): ID of the session
+
+        Returns:
+            int: Number of rows inserted, 0 if none were archived or all
+            are already in the table
+        """
+        loop = asyncio.get_running_loop()
+        location = await loop.run_in_executor(None, self.archive.locate, session_id)
+        if location is None:
+            logger.warning("⚠️ Session %s has no archived messages", session_id)
+            return 0
+
+        rows = await loop.run_in_executor(None, self.archive.read, location)
+        restored = await ArchiveService.restore_messages(rows)
+        await loop.run_in_executor(None, self.archive.mark_restored, session_id)
+        ARCHIVE_MESSAGES.labels("restored").inc(restored)
+        logger.info("📤 Restored %s of %s archived messages of session %s", restored, len(rows), session_id)
+        return restored
@@ -0,0 +1,234 @@
+"""
+In-process caching primitives for the financial planner bot.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries before the least recently used is evicted
+            ttl (float): Entry lifetime in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Optional[Any]: Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a single entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Current size and hit/miss/eviction counters
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskLRUCache:
+    """
+    Size-bounded LRU cache of byte blobs stored as files in a directory.
+
+    Every entry is one file named after the hash of its key; recency is
+    kept in memory and mirrored to file modification times, so the order
+    survives restarts. Methods are thread-safe so they can run in an
+    executor off the event loop.
+    """
+
+    SUFFIX = ".bin"
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Initialize the cache and index the files already in the directory.
+
+        Args:
+            directory (str): Directory holding the entries, created if missing
+            max_bytes (int): Total size of entries before the least recently
+                used are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._sizes[name] = size
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _name(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest() + self.SUFFIX
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the size bound holds."""
+        while self.total_bytes > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read an entry and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[bytes]: Stored bytes, or None if missing
+        """
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._sizes:
+                self.misses += 1
+                return None
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+                os.utime(path)
+            except FileNotFoundError:
+                self.total_bytes -= self._sizes.pop(name)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(name)
+            self.hits += 1
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """
+        Store an entry, evicting least recently used ones when over the bound.
+
+        Args:
+            key (str): Cache key
+            data (bytes): Bytes to store
+        """
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        with self._lock:
+            # Atomic, so readers in other processes never see a partial file
+            os.replace(temporary, path)
+            self.total_bytes += len(data) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            self._evict()
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry if present."""
+        name = self._name(key)
+        with self._lock:
+            size = self._sizes.pop(name, None)
+            if size is None:
+                return
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Current entry count and size and hit/miss/eviction counters
+        """
+        return {
+            "size": len(self._sizes),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._sizes)
@@ -0,0 +1,66 @@
+"""
+Chart drawing functions run in the chart worker processes.
+
+Kept free of bot, database and logging imports so worker processes start
+quickly; everything here takes plain values and returns PNG bytes.
+"""
+
+import io
+from typing import Sequence
+
+from core.money import MINOR_UNITS
+
+INCOME_COLOR = "#2e7d32"
+EXPENSE_COLOR = "#c62828"
+
+
+def render_income_expense_chart(
+    labels: Sequence[str],
+    income_minor: Sequence[int],
+    expense_minor: Sequence[int],
+    currency: str,
+) -> bytes:
+    """
+    Draw monthly income and expenses as grouped bars.
+
+    Args:
+        labels (Sequence[str]): Month labels
+        income_minor (Sequence[int]): Income per month in minor units
+        expense_minor (Sequence[int]): Expenses per month in minor units
+        currency (str): Currency code shown on the axis
+
+    Returns:
+        bytes: PNG image
+    """
+    # The object-oriented API needs no pyplot state or GUI backend
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(8, 4.5), dpi=100)
+    axes = figure.add_subplot()
+    positions = range(len(labels))
+    width = 0.4
+    axes.bar(
+        [position - width / 2 for position in positions],
+        [value / MINOR_UNITS for value in income_minor],
+        width,
+        label="Income",
+        color=INCOME_COLOR,
+    )
+    axes.bar(
+        [position + width / 2 for position in positions],
+        [value / MINOR_UNITS for value in expense_minor],
+        width,
+        label="Expenses",
+        color=EXPENSE_COLOR,
+    )
+    axes.set_xticks(list(positions))
+    axes.set_xticklabels(labels)
+    axes.set_ylabel(currency)
+    axes.set_title("Income vs expenses")
+    axes.grid(axis="y", alpha=0.3)
+    axes.legend()
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
@@ -0,0 +1,167 @@
+"""
+Report chart delivery: rendering in worker processes, a disk cache of the
+images and reuse of Telegram file IDs.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+
+from core.cache import DiskLRUCache
+from core.config import config
+from core.logging_config import get_lazy_logger
+from core.metrics import CHART_REQUESTS, CHART_RENDER_DURATION
+from core.workers import WorkerPool
+
+# Get bot logger
+logger = get_lazy_logger("bot")
+
+
+def data_version(*series: Any) -> str:
+    """
+    Get a short version tag of the data a chart is drawn from.
+
+    Args:
+        *series (Any): Values the chart depends on, with stable reprs
+
+    Returns:
+        str: Hex digest that changes whenever the data does
+    """
+    return hashlib.sha1(repr(series).encode()).hexdigest()[:16]
+
+
+def chart_key(user_id: int, period: str, chart_type: str, version: str) -> str:
+    """Get the cache key of one rendering of a chart."""
+    return f"{user_id}:{period}:{chart_type}:{version}"
+
+
+class ChartService:
+    """
+    Sends report charts at the lowest available cost.
+
+    A chart already uploaded through this bot is resent by its Telegram
+    file_id, with no render and no upload. Otherwise the PNG comes from the
+    disk cache, or is rendered in a worker process so drawing never blocks
+    the event loop. Concurrent requests for the same chart share one render.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, workers: int = None):
+        """
+        Initialize the service; the cache and workers are created on first use.
+
+        Args:
+            cache_dir (str): Directory of the image cache, defaults to CHART_CACHE_DIR
+            max_bytes (int): Size bound of the image cache, defaults to CHART_CACHE_MAX_BYTES
+            workers (int): Render processes, defaults to CHART_WORKERS
+        """
+        self.cache_dir = cache_dir or config.CHART_CACHE_DIR
+        self.max_bytes = max_bytes or config.CHART_CACHE_MAX_BYTES
+        self.pool = WorkerPool(workers or config.CHART_WORKERS)
+        self._cache: Optional[DiskLRUCache] = None
+        self._renders: Dict[str, asyncio.Future] = {}
+
+    @property
+    def cache(self) -> DiskLRUCache:
+        """Disk cache of rendered images and uploaded file IDs."""
+        if self._cache is None:
+            self._cache = DiskLRUCache(self.cache_dir, self.max_bytes)
+        return self._cache
+
+    async def _run_io(self, function: Callable, *args: Any) -> Any:
+        """Run a disk cache call in the default thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def render(self, key: str, chart_type: str, render: Callable[..., bytes], *args: Any) -> bytes:
+        """
+        Render a chart in a worker process, sharing renders of the same key.
+
+        Args:
+            key (str): Cache key of the chart
+            chart_type (str): Chart type, used as metrics label
+            render (Callable[..., bytes]): Picklable module-level function
+                returning PNG bytes
+            *args (Any): Arguments of the render function
+
+        Returns:
+            bytes: PNG image
+        """
+        pending = self._renders.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self.pool.run(render, *args))
+        self._renders[key] = future
+        started_at = time.perf_counter()
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._renders.pop(key, None)
+                CHART_RENDER_DURATION.labels(chart_type).observe(time.perf_counter() - started_at)
+            else:
+                # The caller was cancelled; drop the entry when the render ends
+                future.add_done_callback(lambda _: self._renders.pop(key, None))
+
+    async def send_chart(
+        self,
+        message: types.Message,
+        key: str,
+        chart_type: str,
+        render: Callable[..., bytes],
+        *args: Any,
+        caption: str = None,
+    ) -> types.Message:
+        """
+        Send a chart to the chat of a message.
+
+        Args:
+            message (types.Message): Message whose chat receives the chart
+            key (str): Cache key from chart_key
+            chart_type (str): Chart type, used as metrics label
+            render (Callable[..., bytes]): Picklable module-level function
+                returning PNG bytes
+            *args (Any): Arguments of the render function
+            caption (str): Optional photo caption
+
+        Returns:
+            types.Message: The sent photo message
+        """
+        # File IDs are only valid for the bot that uploaded the file
+        file_id_key = f"{key}:file_id:{message.bot.id}"
+        file_id = await self._run_io(self.cache.get, file_id_key)
+        if file_id is not None:
+            try:
+                sent = await message.answer_photo(file_id.decode(), caption=caption)
+                CHART_REQUESTS.labels(chart_type, "file_id").inc()
+                return sent
+            except TelegramBadRequest as e:
+                logger.warning("⚠️ Cached chart file_id rejected, uploading again: %s", e)
+                await self._run_io(self.cache.invalidate, file_id_key)
+
+        image = await self._run_io(self.cache.get, key)
+        if image is not None:
+            source = "disk"
+        else:
+            source = "render"
+            image = await self.render(key, chart_type, render, *args)
+            await self._run_io(self.cache.set, key, image)
+
+        sent = await message.answer_photo(
+            types.BufferedInputFile(image, filename=f"{chart_type}.png"), caption=caption
+        )
+        CHART_REQUESTS.labels(chart_type, source).inc()
+        if sent.photo:
+            await self._run_io(self.cache.set, file_id_key, sent.photo[-1].file_id.encode())
+        return sent
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, waiting for running renders."""
+        self.pool.shutdown()
+
+
+# Global chart service
+chart_service = ChartService()
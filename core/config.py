@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 from typing import Optional
 
@@ -23,6 +24,35 @@ class Config:
             "BOT_DESCRIPTION", "A simple financial planner bot"
         )
 
+        # Update delivery configuration
+        self.BOT_MODE: str = os.getenv("BOT_MODE", "polling").lower()  # polling or webhook
+        self.WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")  # Public base URL
+        self.WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/webhook")
+        self.WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+        self.WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8080"))
+        self.WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
+        self.WEBHOOK_CONCURRENCY: int = int(
+            os.getenv("WEBHOOK_CONCURRENCY", "64")
+        )  # Updates handled at once
+        self.WEBHOOK_QUEUE_SIZE: int = int(
+            os.getenv("WEBHOOK_QUEUE_SIZE", "1000")
+        )  # Accepted updates waiting for a handler
+
+        # Multi-instance configuration
+        self.INSTANCE_ID: str = os.getenv(
+            "INSTANCE_ID", f"{socket.gethostname()}:{os.getpid()}"
+        )  # Unique name of this bot process
+        self.INSTANCE_COUNT: int = int(os.getenv("INSTANCE_COUNT", "1"))
+        self.INSTANCE_INDEX: int = int(
+            os.getenv("INSTANCE_INDEX", "0")
+        )  # Partition of users this instance expires sessions for
+        self.LEADER_LEASE_TTL: float = float(
+            os.getenv("LEADER_LEASE_TTL", "30")
+        )  # Seconds before a dead leader is replaced
+        self.LEADER_HEARTBEAT_INTERVAL: float = float(
+            os.getenv("LEADER_HEARTBEAT_INTERVAL", "10")
+        )  # Seconds between lease renewals
+
         # Database configuration
         self.DB_HOST: str = os.getenv("DB_HOST", "localhost")
         self.DB_PORT: int = int(os.getenv("DB_PORT", "3306"))
@@ -35,6 +65,180 @@ class Config:
         self.SESSION_TIME: int = int(
             os.getenv("SESSION_TIME", "30")
         )  # Session timeout in minutes
+        self.SESSION_SWEEP_INTERVAL: int = int(
+            os.getenv("SESSION_SWEEP_INTERVAL", "900")
+        )  # Reconciliation sweep interval in seconds
+        self.SESSION_SWEEP_BATCH_SIZE: int = int(
+            os.getenv("SESSION_SWEEP_BATCH_SIZE", "500")
+        )  # Sessions ended per sweep chunk
+        self.SESSION_ACTIVITY_FLUSH_INTERVAL: float = float(
+            os.getenv("SESSION_ACTIVITY_FLUSH_INTERVAL", "5")
+        )  # Seconds between batched last_activity writes
+
+        # Cache configuration
+        self.USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+        self.USER_CACHE_TTL: int = int(
+            os.getenv("USER_CACHE_TTL", "3600")
+        )  # User identity cache lifetime in seconds
+
+        # Message ingestion configuration
+        self.MESSAGE_BATCH_SIZE: int = int(os.getenv("MESSAGE_BATCH_SIZE", "100"))
+        self.MESSAGE_BATCH_DELAY_MS: int = int(
+            os.getenv("MESSAGE_BATCH_DELAY_MS", "10")
+        )  # Collection window of a message insert batch
+        self.MESSAGE_QUEUE_SIZE: int = int(os.getenv("MESSAGE_QUEUE_SIZE", "1000"))
+        self.CONTEXT_TURNS: int = max(
+            1, int(os.getenv("CONTEXT_TURNS", "20"))
+        )  # Latest message pairs kept in memory per active session
+
+        # Outbound message configuration
+        self.OUTBOUND_GLOBAL_RATE: float = float(
+            os.getenv("OUTBOUND_GLOBAL_RATE", "30")
+        )  # Messages per second across all chats
+        self.OUTBOUND_CHAT_RATE: float = float(
+            os.getenv("OUTBOUND_CHAT_RATE", "1")
+        )  # Messages per second to a single chat
+        self.OUTBOUND_CHAT_BURST: int = int(
+            os.getenv("OUTBOUND_CHAT_BURST", "3")
+        )  # Messages to a single chat sent back to back before the rate applies
+        self.OUTBOUND_CONCURRENCY: int = int(os.getenv("OUTBOUND_CONCURRENCY", "8"))
+        self.OUTBOUND_QUEUE_SIZE: int = int(os.getenv("OUTBOUND_QUEUE_SIZE", "10000"))
+
+        # Ledger configuration
+        self.DEFAULT_CURRENCY: str = os.getenv("DEFAULT_CURRENCY", "USD").upper()
+        self.TRANSACTION_BATCH_SIZE: int = int(
+            os.getenv("TRANSACTION_BATCH_SIZE", "1000")
+        )  # Rows per batch insert statement
+        self.REPORT_MONTHS: int = max(
+            1, int(os.getenv("REPORT_MONTHS", "6"))
+        )  # Months shown on the Financial Reports screen
+
+        # Chart configuration
+        self.CHART_WORKERS: int = int(
+            os.getenv("CHART_WORKERS", "2")
+        )  # Processes rendering report charts
+        self.CHART_CACHE_DIR: str = os.getenv("CHART_CACHE_DIR", "cache/charts")
+        self.CHART_CACHE_MAX_BYTES: int = int(
+            os.getenv("CHART_CACHE_MAX_BYTES", "104857600")
+        )  # 100MB of cached chart images
+
+        # Savings projection configuration
+        self.PROJECTION_WORKERS: int = int(
+            os.getenv("PROJECTION_WORKERS", "1")
+        )  # Processes running goal simulations
+        self.PROJECTION_PATHS: int = int(
+            os.getenv("PROJECTION_PATHS", "100000")
+        )  # Monte Carlo paths per projection
+        self.PROJECTION_ANNUAL_RETURN: float = float(
+            os.getenv("PROJECTION_ANNUAL_RETURN", "0.05")
+        )  # Expected yearly return on savings
+        self.PROJECTION_VOLATILITY: float = float(
+            os.getenv("PROJECTION_VOLATILITY", "0.10")
+        )  # Yearly standard deviation of returns
+        self.PROJECTION_HISTORY_MONTHS: int = max(
+            1, int(os.getenv("PROJECTION_HISTORY_MONTHS", "12"))
+        )  # Full months of ledger history used to estimate contributions
+        self.PROJECTION_CACHE_SIZE: int = int(
+            os.getenv("PROJECTION_CACHE_SIZE", "1000")
+        )  # Memoized projections
+        self.PROJECTION_CACHE_TTL: int = int(
+            os.getenv("PROJECTION_CACHE_TTL", "3600")
+        )  # Seconds
+
+        # Job scheduler configuration
+        self.SCHEDULER_LOOKAHEAD: int = int(
+            os.getenv("SCHEDULER_LOOKAHEAD", "300")
+        )  # Seconds of upcoming job runs held in memory
+        self.SCHEDULER_BATCH_SIZE: int = int(
+            os.getenv("SCHEDULER_BATCH_SIZE", "500")
+        )  # Due jobs fired per transaction
+        self.SCHEDULER_MAX_QUEUED: int = int(
+            os.getenv("SCHEDULER_MAX_QUEUED", "100000")
+        )  # Upcoming job runs held in memory at most
+        self.SCHEDULER_MAX_CATCH_UP: int = int(
+            os.getenv("SCHEDULER_MAX_CATCH_UP", "100")
+        )  # Missed runs of one job fired per batch
+        self.SCHEDULER_RETRY_DELAY: int = int(
+            os.getenv("SCHEDULER_RETRY_DELAY", "60")
+        )  # Seconds before a failed job is retried
+        self.GOAL_REMINDER_SCHEDULE: str = os.getenv(
+            "GOAL_REMINDER_SCHEDULE", "0 9 1 * *"
+        )  # Cron expression of savings goal check-ins
+        self.SPENDING_DIGEST_SCHEDULE: str = os.getenv(
+            "SPENDING_DIGEST_SCHEDULE", "0 8 1 * *"
+        )  # Cron expression of monthly spending digests, empty to turn them off
+
+        # AI assistant configuration
+        self.AI_MODEL_URL: str = os.getenv(
+            "AI_MODEL_URL", ""
+        )  # Streaming model endpoint, empty for the built-in stub model
+        self.AI_STREAMING: bool = os.getenv("AI_STREAMING", "True").lower() == "true"
+        self.AI_STREAM_EDIT_INTERVAL: float = float(
+            os.getenv("AI_STREAM_EDIT_INTERVAL", "1.0")
+        )  # Seconds between edits of a streamed reply
+        self.AI_STUB_FIRST_TOKEN_MS: int = int(
+            os.getenv("AI_STUB_FIRST_TOKEN_MS", "500")
+        )  # Stub model delay before its first token
+        self.AI_STUB_TOKEN_MS: int = int(
+            os.getenv("AI_STUB_TOKEN_MS", "30")
+        )  # Stub model delay between tokens
+        self.AI_STUB_REPLY_TOKENS: int = int(
+            os.getenv("AI_STUB_REPLY_TOKENS", "150")
+        )  # Tokens in a stub model reply
+
+        # LLM gateway configuration
+        self.AI_GATEWAY_CONCURRENCY: int = max(
+            1, int(os.getenv("AI_GATEWAY_CONCURRENCY", "8"))
+        )  # Model calls in flight at once
+        self.AI_GATEWAY_MAX_BATCH: int = max(
+            1, int(os.getenv("AI_GATEWAY_MAX_BATCH", "1"))
+        )  # Requests per model call for backends that batch, 1 disables batching
+        self.AI_GATEWAY_BATCH_WINDOW_MS: int = int(
+            os.getenv("AI_GATEWAY_BATCH_WINDOW_MS", "20")
+        )  # Wait for more requests to fill a batch
+        self.AI_GATEWAY_USER_QUEUE: int = max(
+            1, int(os.getenv("AI_GATEWAY_USER_QUEUE", "3"))
+        )  # Unfinished requests per user before new ones are rejected
+        self.AI_GATEWAY_TIMEOUT: float = float(
+            os.getenv("AI_GATEWAY_TIMEOUT", "120")
+        )  # Seconds a request may wait and run in total
+
+        # Answer cache configuration
+        self.ANSWER_CACHE_SIZE: int = int(
+            os.getenv("ANSWER_CACHE_SIZE", "1000")
+        )  # Cached answers to generic questions, 0 disables the cache
+        self.ANSWER_CACHE_TTL: int = int(
+            os.getenv("ANSWER_CACHE_TTL", "86400")
+        )  # Seconds a cached answer is served
+        self.ANSWER_CACHE_SIMILARITY: float = float(
+            os.getenv("ANSWER_CACHE_SIMILARITY", "0")
+        )  # Trigram similarity of an approximate match, 0 disables approximate matching
+
+        # Message archive configuration
+        self.ARCHIVE_AFTER_DAYS: int = int(
+            os.getenv("ARCHIVE_AFTER_DAYS", "90")
+        )  # Days after a session ended before its messages are archived, 0 disables archival
+        self.ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive/messages")
+        self.ARCHIVE_INTERVAL: int = int(
+            os.getenv("ARCHIVE_INTERVAL", "3600")
+        )  # Seconds between archival runs
+        self.ARCHIVE_SESSION_BATCH: int = max(
+            1, int(os.getenv("ARCHIVE_SESSION_BATCH", "100"))
+        )  # Sessions read and archived together
+        self.ARCHIVE_DELETE_CHUNK: int = max(
+            1, int(os.getenv("ARCHIVE_DELETE_CHUNK", "500"))
+        )  # Archived rows deleted per transaction
+        self.ARCHIVE_CHUNK_PAUSE_MS: int = int(
+            os.getenv("ARCHIVE_CHUNK_PAUSE_MS", "100")
+        )  # Pause between delete transactions
+        self.ARCHIVE_MAX_ROWS: int = max(
+            1, int(os.getenv("ARCHIVE_MAX_ROWS", "100000"))
+        )  # Rows archived per run
+
+        # Metrics configuration
+        self.METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+        self.METRICS_HOST: str = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9108"))
 
         # Optional settings
         self.DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
@@ -44,6 +248,8 @@ class Config:
         self.LOG_DIR: str = os.getenv("LOG_DIR", "logs")
         self.LOG_MAX_SIZE: int = int(os.getenv("LOG_MAX_SIZE", "10485760"))  # 10MB in bytes
         self.LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+        self.LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "True").lower() == "true"
+        self.LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
         # Validate required configuration
         self._validate_config()
@@ -55,6 +261,28 @@ class Config:
                 "BOT_TOKEN is required but not found in config.env file. "
                 "Please add your bot token to the config.env file."
             )
+        if self.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError(
+                f"BOT_MODE must be 'polling' or 'webhook', got '{self.BOT_MODE}'."
+            )
+        if self.BOT_MODE == "webhook" and not (self.WEBHOOK_URL and self.WEBHOOK_SECRET):
+            raise ValueError(
+                "WEBHOOK_URL and WEBHOOK_SECRET are required when BOT_MODE is 'webhook'. "
+                "Please add them to the config.env file."
+            )
+        if not 0 <= self.INSTANCE_INDEX < self.INSTANCE_COUNT:
+            raise ValueError(
+                f"INSTANCE_INDEX must be between 0 and INSTANCE_COUNT - 1, "
+                f"got {self.INSTANCE_INDEX} with INSTANCE_COUNT={self.INSTANCE_COUNT}."
+            )
+        if self.AI_STREAM_EDIT_INTERVAL <= 0:
+            raise ValueError(
+                f"AI_STREAM_EDIT_INTERVAL must be positive, got {self.AI_STREAM_EDIT_INTERVAL}."
+            )
+        if not 0 <= self.ANSWER_CACHE_SIMILARITY <= 1:
+            raise ValueError(
+                f"ANSWER_CACHE_SIMILARITY must be between 0 and 1, got {self.ANSWER_CACHE_SIMILARITY}."
+            )
         if not self.DB_PASSWORD:
             raise ValueError(
                 "DB_PASSWORD is required but not found in config.env file. "
@@ -73,6 +301,7 @@ class Config:
             "name": self.BOT_NAME,
             "description": self.BOT_DESCRIPTION,
             "debug": self.DEBUG,
+            "mode": self.BOT_MODE,
         }
 
     def is_debug_mode(self) -> bool:
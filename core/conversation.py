@@ -0,0 +1,145 @@
+"""
+In-memory conversation context of active sessions for the AI assistant.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+from core.config import config
+
+
+class ConversationTurn:
+    """One message pair of a conversation: the user's text and the bot's reply."""
+
+    __slots__ = ("message_id", "user_content", "bot_content", "user_sent_at")
+
+    def __init__(self, message_id: int, user_content: str, bot_content: Optional[str], user_sent_at):
+        self.message_id = message_id
+        self.user_content = user_content
+        self.bot_content = bot_content
+        self.user_sent_at = user_sent_at
+
+    @classmethod
+    def from_model(cls, message) -> "ConversationTurn":
+        """Build a turn from a Message model or row."""
+        return cls(
+            message_id=message.id,
+            user_content=message.user_content,
+            bot_content=message.bot_content,
+            user_sent_at=message.user_sent_at,
+        )
+
+
+class ConversationContext:
+    """
+    Ring buffer of the latest turns of each active session.
+
+    A session's buffer is filled from the messages table on first access,
+    or created empty with the session, then kept current by the message
+    writes, so assembling a prompt needs no history query. Buffers are
+    dropped when their session ends or times out.
+
+    A write that lands while a session's history is being read cannot be
+    placed relative to the rows read, so it cancels that load; the next
+    access reads the history again.
+
+    Only writes made by this instance reach the buffers. With several
+    instances, buffers of sessions dropped from the registry are
+    discarded with them, and MessageService checks a buffer against the
+    session's latest message ID before serving it.
+    """
+
+    def __init__(self, max_turns: int = None):
+        """
+        Initialize the context store.
+
+        Args:
+            max_turns (int): Turns kept per session, defaults to CONTEXT_TURNS
+        """
+        self.max_turns = max_turns or config.CONTEXT_TURNS
+        self._buffers: Dict[int, Deque[ConversationTurn]] = {}
+        self._loading: Set[int] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: int) -> Optional[List[ConversationTurn]]:
+        """
+        Get a session's buffered turns, oldest first.
+
+        Returns:
+            Optional[List[ConversationTurn]]: Turns, or None if the session
+            is not buffered yet
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(buffer)
+
+    def start(self, session_id: int) -> None:
+        """Create the empty buffer of a new session, which has no history to read."""
+        self._buffers[session_id] = deque(maxlen=self.max_turns)
+
+    def begin_load(self, session_id: int) -> None:
+        """Mark a session whose history is about to be read from the database."""
+        self._loading.add(session_id)
+
+    def finish_load(self, session_id: int, turns: List[ConversationTurn]) -> bool:
+        """
+        Buffer the history read for a session.
+
+        Args:
+            session_id (int): Session whose history was read
+            turns (List[ConversationTurn]): Latest turns, oldest first
+
+        Returns:
+            bool: False if a write since begin_load() made the history stale
+        """
+        if session_id not in self._loading:
+            return False
+        self._loading.discard(session_id)
+        if session_id not in self._buffers:
+            self._buffers[session_id] = deque(turns, maxlen=self.max_turns)
+        return True
+
+    def cancel_load(self, session_id: int) -> None:
+        """Forget a load that failed."""
+        self._loading.discard(session_id)
+
+    def append(self, session_id: int, turn: ConversationTurn) -> None:
+        """Record a new turn of a session, evicting its oldest when full."""
+        buffer = self._buffers.get(session_id)
+        if buffer is not None:
+            buffer.append(turn)
+        else:
+            self._loading.discard(session_id)
+
+    def set_reply(self, session_id: int, message_id: int, bot_content: str) -> None:
+        """Record the bot's reply to a buffered turn."""
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            self._loading.discard(session_id)
+            return
+        # Replies go to the latest turns, so search from the end
+        for turn in reversed(buffer):
+            if turn.message_id == message_id:
+                turn.bot_content = bot_content
+                return
+
+    def discard(self, session_id: int) -> None:
+        """Drop the buffer of an ended session."""
+        self._buffers.pop(session_id, None)
+        self._loading.discard(session_id)
+
+    def clear(self) -> None:
+        """Drop every buffer."""
+        self._buffers.clear()
+        self._loading.clear()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+# Global conversation context of active sessions
+conversation_context = ConversationContext()
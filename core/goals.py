@@ -0,0 +1,258 @@
+"""
+Savings goal progress and projections, memoized and computed off the event loop.
+"""
+
+import asyncio
+import hashlib
+import statistics
+from datetime import date, datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from core.config import config
+from core.logging_config import get_lazy_logger
+from core.money import format_amount
+from core.projection import project
+from core.workers import WorkerPool
+from database.database import commit_unit_of_work
+from database.models import SavingsGoal
+from database.services.rollup_service import RollupService, month_start, shift_month
+from database.services.transaction_service import TransactionService
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+
+def months_between(start: date, end: date) -> int:
+    """Get the number of whole calendar months from one date's month to another's."""
+    return max(0, (end.year - start.year) * 12 + end.month - start.month)
+
+
+class GoalProjector:
+    """
+    Computes savings goal progress and projections.
+
+    Projections run in worker processes, so a simulation of a hundred
+    thousand paths never stalls update handling. Results are memoized per
+    goal parameters and ledger version: repeat views are served from
+    memory until the goal or the ledger changes, and concurrent requests
+    for the same projection share one computation.
+    """
+
+    def __init__(self, workers: int = None, paths: int = None):
+        """
+        Initialize the projector; worker processes start on first use.
+
+        Args:
+            workers (int): Simulation processes, defaults to PROJECTION_WORKERS
+            paths (int): Monte Carlo paths, defaults to PROJECTION_PATHS
+        """
+        self.pool = WorkerPool(workers or config.PROJECTION_WORKERS)
+        self.paths = paths or config.PROJECTION_PATHS
+        self._results = TTLCache(
+            max_size=config.PROJECTION_CACHE_SIZE, ttl=config.PROJECTION_CACHE_TTL
+        )
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def get_progress(self, goal: SavingsGoal) -> int:
+        """
+        Estimate current savings towards a goal.
+
+        Savings recorded with the goal plus the net of every transaction in
+        the goal's currency since then: the rest of the month the goal was
+        set comes from the ledger, later months from the rollups.
+
+        Args:
+            goal (SavingsGoal): The goal
+
+        Returns:
+            int: Savings in minor units
+        """
+        next_month = shift_month(month_start(goal.saved_at), 1)
+        first_month = await TransactionService.get_totals(
+            goal.user_id,
+            goal.saved_at,
+            datetime.combine(next_month, datetime.min.time()),
+            currency=goal.currency,
+        )
+        net = first_month["income_minor"] - first_month["expense_minor"]
+        for row in await RollupService.get_monthly_rollups(goal.user_id, next_month):
+            if row.currency == goal.currency:
+                net += row.income_minor - row.expense_minor
+        return goal.saved_minor + net
+
+    async def get_contribution_stats(self, goal: SavingsGoal, today: date) -> Tuple[float, float]:
+        """
+        Estimate the mean and spread of monthly savings from recent full months.
+
+        Args:
+            goal (SavingsGoal): The goal
+            today (date): Current date; its month is excluded as incomplete
+
+        Returns:
+            Tuple[float, float]: Mean and standard deviation of monthly net
+            savings in minor units
+        """
+        this_month = month_start(today)
+        first_month = shift_month(this_month, -config.PROJECTION_HISTORY_MONTHS)
+        net: Dict[date, int] = {}
+        for row in await RollupService.get_monthly_rollups(goal.user_id, first_month, this_month):
+            if row.currency == goal.currency:
+                net[row.month] = net.get(row.month, 0) + row.income_minor - row.expense_minor
+        if not net:
+            return 0.0, 0.0
+
+        # Months between the first active one and now count as zero savings
+        first_active = min(net)
+        series: List[int] = [
+            net.get(shift_month(first_active, offset), 0)
+            for offset in range(months_between(first_active, this_month))
+        ]
+        spread = statistics.pstdev(series) if len(series) > 1 else 0.0
+        return float(statistics.fmean(series)), float(spread)
+
+    async def project(
+        self, goal: SavingsGoal, today: date = None, db_session: Optional[AsyncSession] = None
+    ) -> Dict[str, object]:
+        """
+        Project a goal, from memory when neither the goal nor the ledger changed.
+
+        Args:
+            goal (SavingsGoal): The goal
+            today (date): Current date, defaults to today
+            db_session (Optional[AsyncSession]): Handler's unit of work,
+                committed once the inputs are read so its connection is not
+                held while a worker runs the projection
+
+        Returns:
+            Dict[str, object]: Results of core.projection.project plus
+            current (savings now), months (left until the target date),
+            contribution_mean and contribution_std
+        """
+        today = today or date.today()
+        version = await RollupService.get_ledger_version(goal.user_id)
+        key = (
+            goal.user_id,
+            goal.target_minor,
+            goal.saved_minor,
+            goal.saved_at,
+            goal.currency,
+            goal.target_date,
+            month_start(today),
+            version,
+            self.paths,
+        )
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self._compute(goal, today, key, db_session))
+        self._pending[key] = future
+        future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _compute(
+        self,
+        goal: SavingsGoal,
+        today: date,
+        key: Tuple,
+        db_session: Optional[AsyncSession] = None,
+    ) -> Dict[str, object]:
+        """Gather the inputs, run the projection in a worker and memoize it."""
+        current = await self.get_progress(goal)
+        mean, spread = await self.get_contribution_stats(goal, today)
+        if db_session is not None:
+            await commit_unit_of_work(db_session)
+        months = months_between(today, goal.target_date)
+        # Equal inputs give equal results, whichever worker runs them
+        seed = int.from_bytes(hashlib.sha256(repr(key).encode()).digest()[:8], "big")
+
+        result = await self.pool.run(
+            project,
+            goal.target_minor,
+            current,
+            months,
+            mean,
+            spread,
+            config.PROJECTION_ANNUAL_RETURN,
+            config.PROJECTION_VOLATILITY,
+            self.paths,
+            seed,
+        )
+        result.update(
+            current=current, months=months, contribution_mean=mean, contribution_std=spread
+        )
+        self._results.set(key, result)
+        logger.debug("🎯 Projected goal of user %s over %s months", goal.user_id, months)
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, waiting for running projections."""
+        self.pool.shutdown()
+
+
+def render_goal_report(goal: SavingsGoal, projection: Dict[str, object]) -> str:
+    """
+    Render goal progress and projection text.
+
+    Args:
+        goal (SavingsGoal): The goal
+        projection (Dict[str, object]): Result of GoalProjector.project
+
+    Returns:
+        str: Report text
+    """
+    currency = goal.currency
+    current = projection["current"]
+    progress = max(0, min(100, current * 100 // goal.target_minor)) if goal.target_minor else 100
+    filled = progress // 10
+    lines = [
+        "🎯 Savings Goal",
+        "",
+        f"Target: {format_amount(goal.target_minor, currency)} by {goal.target_date:%d %b %Y}",
+        f"Saved so far: {format_amount(current, currency)} ({progress}%)",
+        "▓" * filled + "░" * (10 - filled),
+        "",
+    ]
+
+    if current >= goal.target_minor:
+        lines.append("🎉 You have reached your goal!")
+        return "\n".join(lines)
+
+    months = projection["months"]
+    if months == 0:
+        lines.append("⏰ The target date has arrived.")
+    else:
+        required = round(projection["required_contribution"])
+        lines.append(f"💡 Save {format_amount(required, currency)} per month to get there on time.")
+
+    mean = round(projection["contribution_mean"])
+    if mean > 0:
+        lines.append(f"📈 You have been saving about {format_amount(mean, currency)} per month.")
+        months_to_target = projection["months_to_target"]
+        if months_to_target is not None:
+            lines.append(f"At that pace you reach the target in about {months_to_target:.0f} months.")
+    else:
+        lines.append("📉 Your recent months show no net savings.")
+
+    if months:
+        simulation = projection["simulation"]
+        low = round(simulation["balance_percentiles"][10])
+        high = round(simulation["balance_percentiles"][90])
+        lines.extend([
+            "",
+            f"🎲 Chance of reaching the target on time: {simulation['probability'] * 100:.0f}% "
+            f"({simulation['paths']:,} simulations)",
+            f"Likely balance by then: {format_amount(low, currency)} - {format_amount(high, currency)}",
+        ])
+    return "\n".join(lines)
+
+
+# Global savings goal projector
+goal_projector = GoalProjector()
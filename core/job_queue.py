@@ -0,0 +1,118 @@
+"""
+In-memory queue of the near-term runs of scheduled jobs.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class JobQueue:
+    """
+    Upcoming job runs in a min-heap, covering a window of the scheduled_jobs table.
+
+    Only runs before the horizon are held, so memory is bounded by the jobs
+    due within the scheduler's lookahead rather than by the size of the
+    table. Every run before the horizon is either in the queue or has fired;
+    runs after it are loaded as the window moves forward. Rescheduling and
+    cancelling do not touch the heap: superseded entries are skipped when
+    popped.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, Tuple[datetime, int]] = {}
+        self._listener: Optional[Callable[[], None]] = None
+        self.horizon: Optional[datetime] = None
+
+    def set_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """
+        Set a callback invoked when a run earlier than all others is queued.
+
+        Args:
+            listener (Optional[Callable[[], None]]): Callback, or None to remove it
+        """
+        self._listener = listener
+
+    def reset(self) -> None:
+        """Forget every queued run; nothing is known until the next load."""
+        self._heap.clear()
+        self._scheduled.clear()
+        self.horizon = None
+
+    def load(self, jobs: Iterable, horizon: datetime) -> None:
+        """
+        Queue runs read from the table and move the horizon.
+
+        Args:
+            jobs (Iterable): (id, user_id, next_run_at) rows
+            horizon (datetime): Every run before it is now known
+        """
+        for job in jobs:
+            self.push(job.id, job.user_id, job.next_run_at)
+        self.horizon = horizon
+
+    def push(self, job_id: int, user_id: int, run_at: datetime) -> None:
+        """Queue a run, superseding any earlier entry of the job."""
+        if self._scheduled.get(job_id) == (run_at, user_id):
+            return
+        is_earliest = not self._heap or run_at < self._heap[0][0]
+        self._scheduled[job_id] = (run_at, user_id)
+        heapq.heappush(self._heap, (run_at, job_id))
+        if len(self._heap) > 2 * len(self._scheduled) + 1024:
+            # Mostly superseded entries; rebuild from the live ones
+            self._heap = [(run_at, job_id) for job_id, (run_at, _) in self._scheduled.items()]
+            heapq.heapify(self._heap)
+        if is_earliest and self._listener is not None:
+            self._listener()
+
+    def offer(self, job_id: int, user_id: int, run_at: Optional[datetime]) -> None:
+        """
+        Queue a run scheduled outside the scheduler if it falls in the window.
+
+        Later runs are picked up when the window reaches them; a None run
+        cancels the job.
+        """
+        if run_at is None:
+            self.discard(job_id)
+        elif self.horizon is not None and run_at < self.horizon:
+            self.push(job_id, user_id, run_at)
+        else:
+            # A queued run moved beyond the window is no longer valid
+            self.discard(job_id)
+
+    def discard(self, job_id: int) -> None:
+        """Drop the queued run of a job."""
+        self._scheduled.pop(job_id, None)
+
+    def next_run(self) -> Optional[datetime]:
+        """Get the earliest queued run, which may belong to a superseded entry."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int) -> List[Tuple[int, int]]:
+        """
+        Pop runs due at or before a moment.
+
+        Args:
+            now (datetime): Reference time
+            limit (int): Most runs returned
+
+        Returns:
+            List[Tuple[int, int]]: (job_id, user_id) of the due runs in time order
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            run_at, job_id = heapq.heappop(self._heap)
+            scheduled = self._scheduled.get(job_id)
+            if scheduled is None or scheduled[0] != run_at:
+                continue
+            del self._scheduled[job_id]
+            due.append((job_id, scheduled[1]))
+        return due
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+
+# Global scheduled job queue
+job_queue = JobQueue()
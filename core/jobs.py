@@ -0,0 +1,231 @@
+"""
+Scheduled job kinds: savings goal check-ins, recurring transactions and
+monthly spending digests.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from database import after_commit, get_db_session
+from database.services.goal_service import GoalService
+from database.services.job_service import JobService
+from database.services.rollup_service import month_start, shift_month
+from database.services.transaction_service import TransactionService
+from core.analytics import load_ledgers_by_currency, spending_digests
+from core.config import config
+from core.goals import goal_projector
+from core.logging_config import get_lazy_logger
+from core.money import format_amount
+from core.outbound import OutboundDispatcher, Priority
+from core.recurrence import CRON
+from core.scheduler import JobRun, JobScheduler
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+# Job kinds
+GOAL_REMINDER = "goal_reminder"
+RECURRING_TRANSACTION = "recurring_transaction"
+SPENDING_DIGEST = "spending_digest"
+
+
+def monthly_schedule(moment: datetime) -> str:
+    """
+    Get a cron expression repeating a moment's day and time every month.
+
+    Days after the 28th are moved to the 28th so every month has a run.
+    """
+    return f"{moment.minute} {moment.hour} {min(moment.day, 28)} * *"
+
+
+async def schedule_goal_reminder(user_id: int, chat_id: int) -> None:
+    """Replace a user's savings goal check-ins with ones on GOAL_REMINDER_SCHEDULE."""
+    await JobService.cancel_jobs(user_id, kind=GOAL_REMINDER)
+    await JobService.schedule_job(
+        user_id=user_id,
+        kind=GOAL_REMINDER,
+        schedule_type=CRON,
+        schedule=config.GOAL_REMINDER_SCHEDULE,
+        payload={"chat_id": chat_id},
+    )
+
+
+async def schedule_spending_digest(user_id: int, chat_id: int) -> None:
+    """Send a user the previous month's spending digest on SPENDING_DIGEST_SCHEDULE, once."""
+    if not config.SPENDING_DIGEST_SCHEDULE:
+        return
+    if await JobService.get_user_jobs(user_id, kind=SPENDING_DIGEST):
+        return
+    await JobService.schedule_job(
+        user_id=user_id,
+        kind=SPENDING_DIGEST,
+        schedule_type=CRON,
+        schedule=config.SPENDING_DIGEST_SCHEDULE,
+        payload={"chat_id": chat_id},
+    )
+
+
+async def schedule_recurring_transaction(user_id: int, chat_id: int, transaction) -> None:
+    """
+    Repeat a transaction every month on its day and time.
+
+    Months missed while the bot was down are all recorded once it is back.
+
+    Args:
+        user_id (int): Owner of the transaction
+        chat_id (int): Chat notified of each recorded copy
+        transaction: Transaction model to repeat
+    """
+    await JobService.schedule_job(
+        user_id=user_id,
+        kind=RECURRING_TRANSACTION,
+        schedule_type=CRON,
+        schedule=monthly_schedule(transaction.occurred_at),
+        payload={
+            "chat_id": chat_id,
+            "transaction_id": transaction.id,
+            "amount_minor": transaction.amount_minor,
+            "currency": transaction.currency,
+            "category": transaction.category,
+            "description": transaction.description,
+        },
+        catch_up=True,
+    )
+
+
+class JobHandlers:
+    """Handlers of the bot's job kinds."""
+
+    def __init__(self, outbound: OutboundDispatcher):
+        """
+        Initialize the handlers.
+
+        Args:
+            outbound (OutboundDispatcher): Dispatcher that queues notifications
+        """
+        self.outbound = outbound
+
+    def register(self, scheduler: JobScheduler) -> None:
+        """Register every job kind with a scheduler."""
+        scheduler.register(GOAL_REMINDER, self.send_goal_reminders)
+        scheduler.register(RECURRING_TRANSACTION, self.record_recurring_transactions)
+        scheduler.register(SPENDING_DIGEST, self.send_spending_digests)
+
+    async def _notify(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Queue a background message once the batch's unit of work commits."""
+        async for session in get_db_session():
+            after_commit(
+                session,
+                lambda: self.outbound.post_message(
+                    chat_id, text, priority=Priority.BACKGROUND, **kwargs
+                ),
+            )
+
+    async def send_goal_reminders(self, runs: List[JobRun]) -> None:
+        """Send a progress check-in for each due savings goal reminder."""
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(text="🎯 View Projection", callback_data="set_savings_goal")]
+            ]
+        )
+        for run in runs:
+            goal = await GoalService.get_goal(run.job.user_id)
+            if goal is None:
+                continue
+
+            current = await goal_projector.get_progress(goal)
+            progress = max(0, current * 100 // goal.target_minor) if goal.target_minor else 100
+            await self._notify(
+                run.job.payload["chat_id"],
+                "🎯 Savings Goal Check-in\n\n"
+                f"Saved so far: {format_amount(current, goal.currency)} of "
+                f"{format_amount(goal.target_minor, goal.currency)} ({progress}%)\n"
+                f"Target date: {goal.target_date:%d %b %Y}",
+                reply_markup=keyboard,
+            )
+
+    async def record_recurring_transactions(self, runs: List[JobRun]) -> None:
+        """Record every due copy of recurring transactions in one batch insert."""
+        rows = [
+            {
+                "user_id": run.job.user_id,
+                "amount_minor": run.job.payload["amount_minor"],
+                "currency": run.job.payload["currency"],
+                "category": run.job.payload["category"],
+                "description": run.job.payload["description"],
+                "occurred_at": fire_time,
+            }
+            for run in runs
+            for fire_time in run.fire_times
+        ]
+        await TransactionService.add_transactions(rows)
+        logger.debug("🔁 Recorded %s recurring transactions", len(rows))
+
+        for run in runs:
+            payload = run.job.payload
+            amount_minor = payload["amount_minor"]
+            copies = len(run.fire_times)
+            await self._notify(
+                payload["chat_id"],
+                f"🔁 Recurring {'income' if amount_minor > 0 else 'expense'} recorded"
+                + (f" for {copies} missed months" if copies > 1 else "")
+                + f"\n\nAmount: {format_amount(amount_minor, payload['currency'])}\n"
+                f"Category: {payload['category']}",
+            )
+
+    async def send_spending_digests(self, runs: List[JobRun]) -> None:
+        """
+        Send each due digest the totals of the month before its run.
+
+        Runs summarizing the same month share one ledger query and one
+        vectorized pass per currency over all of their users' transactions.
+        """
+        by_month: Dict[date, List[JobRun]] = defaultdict(list)
+        for run in runs:
+            by_month[shift_month(month_start(run.fire_times[-1]), -1)].append(run)
+
+        for month, month_runs in by_month.items():
+            ledgers = await load_ledgers_by_currency(
+                {run.job.user_id for run in month_runs},
+                start=datetime.combine(shift_month(month, -1), datetime.min.time()),
+                end=datetime.combine(shift_month(month, 1), datetime.min.time()),
+            )
+            digests: Dict[int, Dict[str, Dict[str, object]]] = defaultdict(dict)
+            for currency, ledger in ledgers.items():
+                for user_id, digest in spending_digests(ledger, month).items():
+                    if digest["income_minor"] or digest["expense_minor"]:
+                        digests[user_id][currency] = digest
+            logger.debug("📊 Summarized %s for %s users", f"{month:%b %Y}", len(digests))
+
+            for run in month_runs:
+                user_digests = digests.get(run.job.user_id)
+                if not user_digests:
+                    continue
+                await self._notify(
+                    run.job.payload["chat_id"],
+                    self._format_digest(month, user_digests),
+                )
+
+    @staticmethod
+    def _format_digest(month: date, digests: Dict[str, Dict[str, object]]) -> str:
+        """Format one user's spending digest, with a section per currency."""
+        lines = [f"📊 Your {month:%B %Y} in numbers"]
+        for currency in sorted(digests):
+            digest = digests[currency]
+            change = digest["expense_change_percent"]
+            lines.append("")
+            if len(digests) > 1:
+                lines.append(f"💱 {currency}")
+            lines.append(f"Income: {format_amount(digest['income_minor'], currency)}")
+            lines.append(f"Expenses: {format_amount(digest['expense_minor'], currency)}")
+            if change is not None:
+                lines.append(
+                    f"{'📈' if change > 0 else '📉'} {abs(change):.0f}% "
+                    f"{'more' if change > 0 else 'less'} spent than the month before"
+                )
+            if digest["top_category"] is not None:
+                lines.append(f"Biggest expense category: {digest['top_category']}")
+        return "\n".join(lines)
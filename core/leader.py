@@ -0,0 +1,278 @@
+"""
+Leader election between bot instances through a lease row in the database.
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+from database.services.lease_service import LeaseService
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+
+class LeaderElection:
+    """
+    Keeps one instance at a time holding a named role.
+
+    Every instance tries to take or renew the lease each heartbeat. The
+    holder renews it long before it expires; if the holder dies, the lease
+    runs out after its TTL and the next instance to try takes over.
+    Leadership is given up locally as soon as a renewal is overdue, so a
+    stalled holder stops acting before anyone else can take over.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        instance_id: str = None,
+        ttl: float = None,
+        heartbeat_interval: float = None,
+    ):
+        """
+        Initialize the election.
+
+        Args:
+            name (str): Name of the role, used as the lease name
+            instance_id (str): ID of this instance, defaults to INSTANCE_ID
+            ttl (float): Lease lifetime in seconds, defaults to LEADER_LEASE_TTL
+            heartbeat_interval (float): Seconds between renewals,
+                defaults to LEADER_HEARTBEAT_INTERVAL
+        """
+        self.name = name
+        self.instance_id = instance_id or config.INSTANCE_ID
+        self.ttl = ttl or config.LEADER_LEASE_TTL
+        self.heartbeat_interval = heartbeat_interval or config.LEADER_HEARTBEAT_INTERVAL
+        self.is_running = False
+        self._valid_until = 0.0
+        self._listener: Optional[Callable[[], None]] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Check if this instance currently holds the role."""
+        return time.monotonic() < self._valid_until
+
+    def set_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """
+        Set a callback invoked when this instance becomes the leader.
+
+        Args:
+            listener (Optional[Callable[[], None]]): Callback, or None to remove it
+        """
+        self._listener = listener
+
+    async def start_election(self) -> None:
+        """Start the background heartbeat loop."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._stopped = asyncio.Event()
+        logger.info("🗳️ Leader election for %s started as %s", self.name, self.instance_id)
+
+        while self.is_running:
+            await self.heartbeat()
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop_election(self) -> None:
+        """Stop the heartbeat loop and release the role if held."""
+        self.is_running = False
+        if self._stopped is not None:
+            self._stopped.set()
+
+        await self.resign()
+
+    async def resign(self) -> None:
+        """Stop acting and release the role if held, so another instance can take it."""
+        if self.is_leader:
+            self._valid_until = 0.0
+            try:
+                await LeaseService.release(self.name, self.instance_id)
+                logger.info("🔓 Released leadership of %s", self.name)
+            except Exception as e:
+                logger.error("❌ Error releasing lease %s: %s", self.name, e)
+
+    async def heartbeat(self) -> bool:
+        """
+        Take or renew the lease once.
+
+        Returns:
+            bool: True if the lease was taken or renewed
+        """
+        was_leader = self.is_leader
+        started_at = time.monotonic()
+        try:
+            acquired = await LeaseService.acquire(self.name, self.instance_id, self.ttl)
+        except Exception as e:
+            # The lease may still be ours; keep acting until it would have expired
+            logger.error("❌ Error renewing lease %s: %s", self.name, e)
+            acquired = False
+        else:
+            if not acquired:
+                self._valid_until = 0.0
+
+        if acquired:
+            # Measured from before the request so a slow commit cannot extend it
+            self._valid_until = started_at + self.ttl
+            if not was_leader:
+                logger.info("👑 %s became leader of %s", self.instance_id, self.name)
+                if self._listener is not None:
+                    self._listener()
+        elif was_leader and not self.is_leader:
+            logger.warning("⚠️ %s lost leadership of %s", self.instance_id, self.name)
+        return acquired
+
+
+class PartitionLeases:
+    """
+    Shares per-user background work among the live instances.
+
+    Users are split into INSTANCE_COUNT partitions by user_id modulo
+    INSTANCE_COUNT, and each partition is a lease, so exactly one instance
+    works on a partition at a time. Every instance holds the partition of
+    its own INSTANCE_INDEX and a presence lease announcing that it is
+    alive. The partition of an instance whose presence lease has run out
+    is taken over by the first live instance to try; once the instance is
+    back and its presence lease is held again, the taker releases the
+    partition so its home instance can take it on the next heartbeat.
+    With INSTANCE_COUNT=1 this is a plain leader election.
+    """
+
+    def __init__(
+        self,
+        name: str = "user_partition",
+        count: int = None,
+        index: int = None,
+        instance_id: str = None,
+        ttl: float = None,
+        heartbeat_interval: float = None,
+    ):
+        """
+        Initialize the partition leases.
+
+        Args:
+            name (str): Prefix of the lease names
+            count (int): Number of partitions, defaults to INSTANCE_COUNT
+            index (int): Home partition of this instance, defaults to INSTANCE_INDEX
+            instance_id (str): ID of this instance, defaults to INSTANCE_ID
+            ttl (float): Lease lifetime in seconds, defaults to LEADER_LEASE_TTL
+            heartbeat_interval (float): Seconds between renewals,
+                defaults to LEADER_HEARTBEAT_INTERVAL
+        """
+        self.count = count or config.INSTANCE_COUNT
+        self.index = index if index is not None else config.INSTANCE_INDEX
+        self.instance_id = instance_id or config.INSTANCE_ID
+        self.heartbeat_interval = heartbeat_interval or config.LEADER_HEARTBEAT_INTERVAL
+        self.is_running = False
+        self._partitions = [
+            LeaderElection(f"{name}:{index}", self.instance_id, ttl, heartbeat_interval)
+            for index in range(self.count)
+        ]
+        self._presence_names = [f"{name}_home:{index}" for index in range(self.count)]
+        self._presence = LeaderElection(
+            self._presence_names[self.index], self.instance_id, ttl, heartbeat_interval
+        )
+        self._listeners: List[Callable[[], None]] = []
+        self._stopped: Optional[asyncio.Event] = None
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Add a callback invoked when this instance takes a partition."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        """Remove a callback added with add_listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def owned_partitions(self) -> Set[int]:
+        """Get the partitions this instance currently works on."""
+        return {index for index, election in enumerate(self._partitions) if election.is_leader}
+
+    def owns_user(self, user_id: int) -> bool:
+        """
+        Check if per-user background work for a user belongs to this instance.
+
+        Args:
+            user_id (int): Database ID of the user
+
+        Returns:
+            bool: True if this instance holds the user's partition
+        """
+        return self._partitions[user_id % self.count].is_leader
+
+    def partition_filter(self) -> Optional[Tuple[int, Sequence[int]]]:
+        """
+        Get the (count, indexes) filter of the users this instance works on.
+
+        Returns:
+            Optional[Tuple[int, Sequence[int]]]: None when every partition
+            is held here, otherwise the partition count and the held indexes
+        """
+        owned = self.owned_partitions()
+        if len(owned) == self.count:
+            return None
+        return self.count, sorted(owned)
+
+    async def start(self) -> None:
+        """Start the background heartbeat loop."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._stopped = asyncio.Event()
+        logger.info(
+            "🗳️ Partition leases started as %s, home partition %s of %s",
+            self.instance_id,
+            self.index,
+            self.count,
+        )
+
+        while self.is_running:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error("❌ Error in partition lease heartbeat: %s", e)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop the heartbeat loop and release every lease held."""
+        self.is_running = False
+        if self._stopped is not None:
+            self._stopped.set()
+
+        for election in self._partitions:
+            await election.resign()
+        await self._presence.resign()
+
+    async def heartbeat(self) -> None:
+        """Renew the leases held, take over orphaned partitions and hand back reclaimed ones."""
+        await self._presence.heartbeat()
+        holders = {}
+        if self.count > 1:
+            holders = await LeaseService.get_holders(self._presence_names)
+
+        taken = False
+        for index, election in enumerate(self._partitions):
+            home = holders.get(self._presence_names[index])
+            if index != self.index and home is not None and home != self.instance_id:
+                # Its home instance is alive: leave the partition to it
+                if election.is_leader:
+                    await election.resign()
+                continue
+            was_leader = election.is_leader
+            if await election.heartbeat() and not was_leader:
+                taken = True
+
+        if taken:
+            for listener in list(self._listeners):
+                listener()
@@ -0,0 +1,372 @@
+"""
+Gateway between the AI assistant and the model: fair queueing, a global cap and batching.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from core.ai_client import ai_model
+from core.config import config
+from core.logging_config import get_lazy_logger
+from core.metrics import AI_GATEWAY_BATCH_SIZE, AI_GATEWAY_REQUESTS, AI_GATEWAY_WAIT
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+# Marks the end of a request's tokens
+_END = object()
+
+
+class GatewayError(Exception):
+    """Base class of errors raised to callers of the gateway."""
+
+
+class GatewayBusy(GatewayError):
+    """The user already has as many unfinished requests as allowed."""
+
+
+class GatewayCancelled(GatewayError):
+    """The request was cancelled, e.g. because its session ended."""
+
+
+class GatewayTimeout(GatewayError):
+    """The request did not finish within AI_GATEWAY_TIMEOUT."""
+
+
+class LLMRequest:
+    """One prompt queued or running in the gateway, whose tokens the caller iterates."""
+
+    __slots__ = (
+        "user_id",
+        "session_id",
+        "prompt",
+        "submitted_at",
+        "is_running",
+        "is_done",
+        "_gateway",
+        "_tokens",
+        "_expiry",
+    )
+
+    def __init__(self, gateway: "LLMGateway", user_id: int, session_id: int, prompt: Any):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.prompt = prompt
+        self.submitted_at = time.perf_counter()
+        self.is_running = False
+        self.is_done = False
+        self._gateway = gateway
+        self._tokens: asyncio.Queue = asyncio.Queue()
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+    def _put(self, token: str) -> None:
+        if not self.is_done:
+            self._tokens.put_nowait(token)
+
+    def _finish(self, error: Optional[BaseException] = None) -> bool:
+        """Mark the request done, handing the caller an error if any; False if already done."""
+        if self.is_done:
+            return False
+        self.is_done = True
+        if self._expiry is not None:
+            self._expiry.cancel()
+        self._tokens.put_nowait(error if error is not None else _END)
+        return True
+
+    async def tokens(self) -> AsyncIterator[str]:
+        """
+        Iterate the reply as it is generated.
+
+        Leaving the iteration early cancels the request.
+
+        Yields:
+            str: Next piece of the reply text
+
+        Raises:
+            GatewayCancelled: If the request was cancelled
+            GatewayTimeout: If the request ran out of time
+            Exception: Errors of the model
+        """
+        try:
+            while True:
+                item = await self._tokens.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not self.is_done:
+                self._gateway.cancel(self)
+
+
+class LLMGateway:
+    """
+    Schedules model calls for the AI assistant.
+
+    Every user has a FIFO queue and at most one request running, and users
+    with queued requests take turns in round-robin order, so a user
+    sending many messages waits for their own replies instead of holding
+    everyone else back. At most AI_GATEWAY_CONCURRENCY model calls run at
+    once. Backends that support batching get up to AI_GATEWAY_MAX_BATCH
+    requests of different users per call, waiting up to
+    AI_GATEWAY_BATCH_WINDOW_MS for a batch to fill.
+
+    Requests are cancelled when their session ends, when their caller
+    stops reading and after AI_GATEWAY_TIMEOUT seconds. A cancelled queued
+    request never reaches the model; a running one is dropped from its
+    batch, and a call whose requests are all cancelled is aborted.
+
+    If the gateway is not running requests are sent to the model right away.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_concurrency: int = None,
+        max_batch: int = None,
+        batch_window: float = None,
+        user_queue_size: int = None,
+        timeout: float = None,
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            model: Model with stream(prompt), and stream_batch(prompts) when
+                its supports_batching attribute is true
+            max_concurrency (int): Model calls in flight at once
+            max_batch (int): Requests per call to a batching model
+            batch_window (float): Seconds a call waits for a batch to fill
+            user_queue_size (int): Unfinished requests per user
+            timeout (float): Seconds a request may wait and run in total
+        """
+        self.model = model
+        self.max_concurrency = max_concurrency or config.AI_GATEWAY_CONCURRENCY
+        self.max_batch = max_batch or config.AI_GATEWAY_MAX_BATCH
+        self.batch_window = (
+            batch_window if batch_window is not None else config.AI_GATEWAY_BATCH_WINDOW_MS / 1000
+        )
+        self.user_queue_size = user_queue_size or config.AI_GATEWAY_USER_QUEUE
+        self.timeout = timeout or config.AI_GATEWAY_TIMEOUT
+
+        self._queues: Dict[int, Deque[LLMRequest]] = {}
+        self._ready: Deque[int] = deque()
+        self._busy_users: Set[int] = set()
+        self._by_session: Dict[int, Set[LLMRequest]] = {}
+        self._calls: Dict[asyncio.Task, List[LLMRequest]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the scheduler task is running."""
+        return self._scheduler_task is not None
+
+    @property
+    def batch_size(self) -> int:
+        """Requests per model call, 1 unless the model supports batching."""
+        return self.max_batch if getattr(self.model, "supports_batching", False) else 1
+
+    async def start(self) -> None:
+        """Start the scheduler task."""
+        if self.is_running:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._scheduler_task = asyncio.create_task(self._scheduler())
+        logger.info(
+            "🧠 LLM gateway started with %s concurrent calls of up to %s requests",
+            self.max_concurrency,
+            self.batch_size,
+        )
+
+    async def stop(self) -> None:
+        """Cancel every queued and running request and stop the scheduler."""
+        if not self.is_running:
+            return
+
+        self._scheduler_task.cancel()
+        await asyncio.gather(self._scheduler_task, return_exceptions=True)
+        self._scheduler_task = None
+
+        for queue in list(self._queues.values()):
+            for request in list(queue):
+                self.cancel(request)
+        calls = list(self._calls)
+        for task in calls:
+            task.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        logger.info("🛑 LLM gateway stopped")
+
+    def submit(self, user_id: int, session_id: int, prompt: Any) -> LLMRequest:
+        """
+        Queue a prompt.
+
+        Args:
+            user_id (int): User the request is scheduled fairly against
+            session_id (int): Session whose end cancels the request
+            prompt (Any): Prompt passed to the model
+
+        Returns:
+            LLMRequest: Request whose tokens() yield the reply
+
+        Raises:
+            GatewayBusy: If the user has AI_GATEWAY_USER_QUEUE unfinished requests
+        """
+        queue = self._queues.get(user_id)
+        unfinished = (len(queue) if queue else 0) + (user_id in self._busy_users)
+        if unfinished >= self.user_queue_size:
+            AI_GATEWAY_REQUESTS.labels("rejected").inc()
+            raise GatewayBusy(f"User {user_id} has {unfinished} unfinished requests")
+
+        request = LLMRequest(self, user_id, session_id, prompt)
+        request._expiry = asyncio.get_running_loop().call_later(
+            self.timeout, self._expire, request
+        )
+        self._by_session.setdefault(session_id, set()).add(request)
+
+        if not self.is_running:
+            self._start_call([request])
+            return request
+
+        if queue is None:
+            queue = self._queues[user_id] = deque()
+        queue.append(request)
+        if len(queue) == 1 and user_id not in self._busy_users:
+            self._ready.append(user_id)
+            self._wakeup.set()
+        return request
+
+    def cancel(self, request: LLMRequest, error: GatewayError = None) -> None:
+        """
+        Cancel a request, queued or running.
+
+        Args:
+            request (LLMRequest): Request to cancel
+            error (GatewayError): Error handed to its caller, defaults to
+                GatewayCancelled
+        """
+        if not request._finish(error or GatewayCancelled("Request cancelled")):
+            return
+        AI_GATEWAY_REQUESTS.labels("timeout" if isinstance(error, GatewayTimeout) else "cancelled").inc()
+        self._forget(request)
+
+        if not request.is_running:
+            queue = self._queues.get(request.user_id)
+            if queue is not None and request in queue:
+                queue.remove(request)
+                if not queue:
+                    del self._queues[request.user_id]
+                    if request.user_id in self._ready:
+                        self._ready.remove(request.user_id)
+            return
+
+        # Abort the call once none of its requests is still wanted
+        for task, requests in self._calls.items():
+            if request in requests:
+                if all(other.is_done for other in requests):
+                    task.cancel()
+                return
+
+    def cancel_session(self, session_id: int) -> int:
+        """
+        Cancel every request of a session, e.g. when it ends.
+
+        Returns:
+            int: Number of requests cancelled
+        """
+        requests = list(self._by_session.get(session_id, ()))
+        for request in requests:
+            self.cancel(request)
+        return len(requests)
+
+    def queued(self) -> int:
+        """Get the number of requests waiting for a model call."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _expire(self, request: LLMRequest) -> None:
+        self.cancel(request, GatewayTimeout(f"Request not finished within {self.timeout}s"))
+
+    def _forget(self, request: LLMRequest) -> None:
+        requests = self._by_session.get(request.session_id)
+        if requests is not None:
+            requests.discard(request)
+            if not requests:
+                del self._by_session[request.session_id]
+
+    def _take(self, limit: int) -> List[LLMRequest]:
+        """Take the next request of up to limit users in round-robin order."""
+        taken = []
+        while self._ready and len(taken) < limit:
+            user_id = self._ready.popleft()
+            queue = self._queues.get(user_id)
+            if not queue or user_id in self._busy_users:
+                continue
+            request = queue.popleft()
+            if not queue:
+                del self._queues[user_id]
+            self._busy_users.add(user_id)
+            taken.append(request)
+        return taken
+
+    async def _scheduler(self) -> None:
+        """Start model calls while there are free slots and ready users."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._ready and len(self._calls) < self.max_concurrency:
+                batch_size = self.batch_size
+                if batch_size > 1 and len(self._ready) < batch_size and self.batch_window > 0:
+                    # Let more users join the call
+                    await asyncio.sleep(self.batch_window)
+                requests = self._take(batch_size)
+                if requests:
+                    self._start_call(requests)
+
+    def _start_call(self, requests: List[LLMRequest]) -> None:
+        now = time.perf_counter()
+        for request in requests:
+            request.is_running = True
+            AI_GATEWAY_WAIT.observe(now - request.submitted_at)
+        AI_GATEWAY_BATCH_SIZE.observe(len(requests))
+        task = asyncio.create_task(self._call(requests))
+        self._calls[task] = requests
+
+    async def _call(self, requests: List[LLMRequest]) -> None:
+        """Run one model call and hand each request its tokens."""
+        try:
+            if len(requests) == 1:
+                request = requests[0]
+                async for token in self.model.stream(request.prompt):
+                    request._put(token)
+            else:
+                async for index, token in self.model.stream_batch([request.prompt for request in requests]):
+                    requests[index]._put(token)
+            for request in requests:
+                if request._finish():
+                    AI_GATEWAY_REQUESTS.labels("completed").inc()
+        except asyncio.CancelledError:
+            for request in requests:
+                request._finish(GatewayCancelled("Gateway stopped"))
+        except Exception as e:
+            logger.error("❌ Model call for %s requests failed: %s", len(requests), e)
+            for request in requests:
+                if request._finish(e):
+                    AI_GATEWAY_REQUESTS.labels("failed").inc()
+        finally:
+            del self._calls[asyncio.current_task()]
+            for request in requests:
+                self._forget(request)
+                self._busy_users.discard(request.user_id)
+                if request.user_id in self._queues:
+                    self._ready.append(request.user_id)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+
+# Global gateway of the AI assistant's model
+llm_gateway = LLMGateway(ai_model)
@@ -3,16 +3,136 @@ Centralized logging configuration for the financial planner bot.
 Provides separate log files for different components with proper formatting.
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
 
 from .config import config
 
 
+# Loggers configured by LoggingConfig
+COMPONENT_LOGGERS = ("bot", "database", "session", "app", "error")
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that leaves flushing to the background writer."""
+
+    def flush(self):
+        """Defer flushing until the writer finishes its current batch."""
+
+    def flush_batch(self):
+        """Flush everything written during the current batch."""
+        super().flush()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that forwards records to a component's real handlers.
+
+    Once the queue passes its high-water mark DEBUG records are dropped so
+    that the more important records still fit.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handlers: List[logging.Handler],
+        high_water: int,
+        writer: "BackgroundLogWriter",
+    ):
+        super().__init__(log_queue)
+        self.handlers = handlers
+        self.high_water = high_water
+        self.writer = writer
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno <= logging.DEBUG and self.queue.qsize() >= self.high_water:
+            self.dropped += 1
+            return
+        self.writer.ensure_started()
+        # Records above DEBUG wait for room rather than being lost
+        self.queue.put((record, self.handlers))
+
+
+class BackgroundLogWriter(threading.Thread):
+    """
+    Thread that writes queued records in batches and flushes once per batch.
+
+    The thread starts with the first record, so processes that import the
+    logging configuration without logging, such as chart and projection
+    workers, never run one.
+    """
+
+    # Maximum records handled between flushes
+    BATCH_SIZE = 512
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self._start_lock = threading.Lock()
+        self._launched = False
+
+    def ensure_started(self) -> None:
+        """Start the thread unless it is already running."""
+        if self._launched:
+            return
+        with self._start_lock:
+            if not self._launched:
+                self.start()
+                self._launched = True
+
+    def run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            touched: Set[logging.Handler] = set()
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                    continue
+                record, handlers = item
+                for handler in handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+                        touched.add(handler)
+
+            for handler in touched:
+                try:
+                    if isinstance(handler, BatchedRotatingFileHandler):
+                        handler.flush_batch()
+                    else:
+                        handler.flush()
+                except Exception:
+                    handler.handleError(None)
+
+            if stop:
+                return
+
+    def stop(self) -> None:
+        """Write everything queued so far, then end the thread."""
+        with self._start_lock:
+            if not self._launched:
+                return
+        self.queue.put(self._STOP)
+        self.join()
+
+
 class LoggingConfig:
     """Centralized logging configuration manager."""
     
@@ -30,8 +150,79 @@ class LoggingConfig:
         }
         self.log_level = log_level_map.get(config.LOG_LEVEL, logging.INFO)
         
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[BackgroundLogWriter] = None
+        self._handlers: Dict[str, List[logging.Handler]] = {}
+        
         # Configure different loggers
         self._setup_loggers()
+        
+        # Move file writes off the calling thread
+        if config.LOG_ASYNC:
+            self._start_background_writer()
+    
+    def _create_file_handler(self, filename: str) -> logging.Handler:
+        """
+        Create a rotating file handler for a component log file.
+        
+        Args:
+            filename (str): Log file name inside the log directory
+            
+        Returns:
+            logging.Handler: Handler honoring LOG_MAX_SIZE and LOG_BACKUP_COUNT
+        """
+        handler_class = (
+            BatchedRotatingFileHandler
+            if config.LOG_ASYNC
+            else logging.handlers.RotatingFileHandler
+        )
+        # Files are opened by the first record written to them
+        return handler_class(
+            self.log_dir / filename,
+            maxBytes=config.LOG_MAX_SIZE,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+    
+    def _start_background_writer(self):
+        """Route every component logger through one queue and writer thread."""
+        self._queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        high_water = int(config.LOG_QUEUE_SIZE * 0.8)
+        self._writer = BackgroundLogWriter(self._queue)
+        
+        for name in COMPONENT_LOGGERS:
+            component_logger = logging.getLogger(name)
+            self._handlers[name] = list(component_logger.handlers)
+            component_logger.handlers = [
+                BoundedQueueHandler(self._queue, self._handlers[name], high_water, self._writer)
+            ]
+        
+        atexit.register(self.shutdown)
+    
+    def shutdown(self):
+        """Drain queued records and attach the file handlers directly again."""
+        if self._writer is None:
+            return
+        
+        dropped = sum(
+            handler.dropped
+            for name in COMPONENT_LOGGERS
+            for handler in logging.getLogger(name).handlers
+            if isinstance(handler, BoundedQueueHandler)
+        )
+        
+        for name, handlers in self._handlers.items():
+            logging.getLogger(name).handlers = handlers
+        self._writer.stop()
+        self._writer = None
+        
+        if dropped:
+            self.get_logger("app").warning(f"⚠️ Dropped {dropped} DEBUG log records under load")
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flush_batch()
     
     def _setup_loggers(self):
         """Set up all loggers with appropriate handlers."""
@@ -64,12 +255,7 @@ class LoggingConfig:
         bot_logger.setLevel(self.log_level)
         
         # Bot log file handler
-        bot_handler = logging.handlers.RotatingFileHandler(
-            self.log_dir / "bot.log",
-            maxBytes=config.LOG_MAX_SIZE,
-            backupCount=config.LOG_BACKUP_COUNT,
-            encoding='utf-8'
-        )
+        bot_handler = self._create_file_handler("bot.log")
         
         # Bot console handler (only in debug mode)
         if config.is_debug_mode():
@@ -99,12 +285,7 @@ class LoggingConfig:
         db_logger.setLevel(self.log_level)
         
         # Database log file handler
-        db_handler = logging.handlers.RotatingFileHandler(
-            self.log_dir / "database.log",
-            maxBytes=config.LOG_MAX_SIZE,
-            backupCount=config.LOG_BACKUP_COUNT,
-            encoding='utf-8'
-        )
+        db_handler = self._create_file_handler("database.log")
         
         # Database formatter
         db_formatter = logging.Formatter(
@@ -123,12 +304,7 @@ class LoggingConfig:
         session_logger.setLevel(self.log_level)
         
         # Session log file handler
-        session_handler = logging.handlers.RotatingFileHandler(
-            self.log_dir / "session.log",
-            maxBytes=config.LOG_MAX_SIZE,
-            backupCount=config.LOG_BACKUP_COUNT,
-            encoding='utf-8'
-        )
+        session_handler = self._create_file_handler("session.log")
         
         # Session formatter
         session_formatter = logging.Formatter(
@@ -147,12 +323,7 @@ class LoggingConfig:
         app_logger.setLevel(self.log_level)
         
         # App log file handler
-        app_handler = logging.handlers.RotatingFileHandler(
-            self.log_dir / "app.log",
-            maxBytes=config.LOG_MAX_SIZE,
-            backupCount=config.LOG_BACKUP_COUNT,
-            encoding='utf-8'
-        )
+        app_handler = self._create_file_handler("app.log")
         
         # App formatter
         app_formatter = logging.Formatter(
@@ -171,12 +342,7 @@ class LoggingConfig:
         error_logger.setLevel(logging.ERROR)
         
         # Error log file handler
-        error_handler = logging.handlers.RotatingFileHandler(
-            self.log_dir / "error.log",
-            maxBytes=config.LOG_MAX_SIZE,
-            backupCount=config.LOG_BACKUP_COUNT,
-            encoding='utf-8'
-        )
+        error_handler = self._create_file_handler("error.log")
         
         # Error formatter
         error_formatter = logging.Formatter(
@@ -214,6 +380,132 @@ class LoggingConfig:
         app_logger.info("=" * 60)
 
 
+class lazy:
+    """Log argument whose value is computed only if the record is emitted."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+    def __repr__(self) -> str:
+        return repr(self.func())
+
+
+class LazyLogger:
+    """
+    Logger facade that checks the level before doing any work.
+
+    Messages use %-style arguments so formatting is deferred until a handler
+    emits the record; wrap expensive arguments in lazy(). Repetitive
+    messages can be sampled or rate limited per call-site key.
+
+    Records go through the public Logger.log() with the facade's own frame
+    added to stacklevel, which attributes them to the calling line on
+    every supported Python; Logger._log() counts frames differently
+    before 3.11.
+    """
+
+    __slots__ = ("logger", "_sample_counts", "_rate_limits")
+
+    def __init__(self, logger: logging.Logger):
+        """
+        Initialize the facade.
+
+        Args:
+            logger (logging.Logger): Logger that receives the records
+        """
+        self.logger = logger
+        self._sample_counts: Dict[Hashable, int] = {}
+        self._rate_limits: Dict[Hashable, List[float]] = {}
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Check if records of the given level would be handled."""
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.INFO):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.WARNING):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.ERROR):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.ERROR, msg, *args, **kwargs)
+
+    def exception(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.ERROR):
+            kwargs.setdefault("exc_info", True)
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.ERROR, msg, *args, **kwargs)
+
+    def critical(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.log(logging.CRITICAL, msg, *args, **kwargs)
+
+    def sampled(self, level: int, key: Hashable, every: int, msg: str, *args: Any) -> None:
+        """
+        Log only one of every `every` calls made with the same key.
+
+        Args:
+            level (int): Logging level
+            key (Hashable): Call-site key the calls are counted under
+            every (int): Sampling interval
+            msg (str): Message with %-style placeholders
+            *args: Message arguments
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        count = self._sample_counts.get(key, 0)
+        self._sample_counts[key] = count + 1
+        if count % every == 0:
+            if every > 1:
+                msg = f"{msg} (sampled 1/{every})"
+            self.logger.log(level, msg, *args, stacklevel=2)
+
+    def rate_limited(self, level: int, key: Hashable, interval: float, msg: str, *args: Any) -> None:
+        """
+        Log at most once per `interval` seconds for the same key.
+
+        The first record after a quiet period reports how many were suppressed.
+
+        Args:
+            level (int): Logging level
+            key (Hashable): Call-site key the limit applies to
+            interval (float): Minimum seconds between records
+            msg (str): Message with %-style placeholders
+            *args: Message arguments
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        state = self._rate_limits.get(key)
+        if state is None:
+            state = self._rate_limits[key] = [0.0, 0]
+        if now - state[0] < interval:
+            state[1] += 1
+            return
+        if state[1]:
+            msg = f"{msg} ({state[1]} similar suppressed)"
+        state[0] = now
+        state[1] = 0
+        self.logger.log(level, msg, *args, stacklevel=2)
+
+
 # Global logging configuration instance
 logging_config = LoggingConfig()
 
@@ -231,7 +523,25 @@ def get_logger(name: str) -> logging.Logger:
     return logging_config.get_logger(name)
 
 
+def get_lazy_logger(name: str) -> LazyLogger:
+    """
+    Get a lazy, sampling-capable facade over a component logger.
+    
+    Args:
+        name (str): Logger name (bot, database, session, app, error)
+        
+    Returns:
+        LazyLogger: Facade over the configured logger instance
+    """
+    return LazyLogger(logging_config.get_logger(name))
+
+
 def setup_logging():
     """Initialize the logging system."""
     logging_config.log_startup_info()
     return logging_config
+
+
+def shutdown_logging():
+    """Write all queued log records before the process exits."""
+    logging_config.shutdown()
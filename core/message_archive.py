@@ -0,0 +1,221 @@
+"""
+Compressed, append-only archive files of old conversation messages.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import config
+
+# Columns stored as ISO 8601 strings
+DATETIME_COLUMNS = ("user_sent_at", "bot_sent_at")
+
+DATA_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx"
+# Sessions put back into the messages table, with the time of the restore
+RESTORED_FILE = "restored.tsv"
+
+
+def _encode(row: Dict[str, Any]) -> str:
+    values = dict(row)
+    for column in DATETIME_COLUMNS:
+        if values.get(column) is not None:
+            values[column] = values[column].isoformat()
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(line: str) -> Dict[str, Any]:
+    values = json.loads(line)
+    for column in DATETIME_COLUMNS:
+        if values.get(column) is not None:
+            values[column] = datetime.fromisoformat(values[column])
+    return values
+
+
+class ArchiveLocation:
+    """Where the archived messages of one session are stored."""
+
+    __slots__ = ("path", "offset", "length", "rows")
+
+    def __init__(self, path: str, offset: int, length: int, rows: int):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.rows = rows
+
+
+class MessageArchive:
+    """
+    Directory of gzip files holding archived message rows, one member per session.
+
+    Each instance appends to a file of its own per month, named
+    messages-YYYY-MM-<instance>.jsonl.gz, and never rewrites it. Every
+    session's rows are compressed as a separate gzip member, so the file
+    is also a valid concatenated gzip stream, and a sidecar .idx file
+    records one tab-separated line per member: session ID, byte offset,
+    byte length and row count. Restoring a session reads the index lines
+    and decompresses only that member.
+
+    A member is fsynced before its index line is written and the index
+    line before the caller deletes the rows, so a crash at any point
+    leaves either rows still in the database or a readable member. Bytes
+    of a member whose index line was never written are ignored, and when
+    a session is archived again the last index line wins. Restores are
+    logged in restored.tsv so the archiver can leave restored sessions
+    alone for a while.
+
+    Methods block on file IO and are meant to run in an executor.
+    """
+
+    def __init__(self, directory: str = None, instance_id: str = None):
+        """
+        Initialize the archive.
+
+        Args:
+            directory (str): Directory of the archive files, defaults to
+                ARCHIVE_DIR and is created if missing
+            instance_id (str): Name part keeping instances out of each
+                other's files, defaults to INSTANCE_ID
+        """
+        self.directory = directory or config.ARCHIVE_DIR
+        self.instance_id = instance_id or config.INSTANCE_ID
+        self._lock = threading.Lock()
+
+    def _base_path(self, moment: datetime) -> str:
+        return os.path.join(self.directory, f"messages-{moment:%Y-%m}-{self.instance_id}")
+
+    def append(self, sessions: Iterable[Tuple[int, List[Dict[str, Any]]]]) -> int:
+        """
+        Append the rows of several sessions to this month's file.
+
+        Args:
+            sessions (Iterable[Tuple[int, List[Dict[str, Any]]]]): Session
+                IDs with their message rows as column dictionaries
+
+        Returns:
+            int: Bytes written to the data file
+        """
+        base = self._base_path(datetime.now())
+        index_lines = []
+        written = 0
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(base + DATA_SUFFIX, "ab") as data:
+                offset = data.tell()
+                for session_id, rows in sessions:
+                    member = gzip.compress(
+                        "".join(_encode(row) + "\n" for row in rows).encode(), mtime=0
+                    )
+                    data.write(member)
+                    index_lines.append(f"{session_id}\t{offset}\t{len(member)}\t{len(rows)}\n")
+                    offset += len(member)
+                    written += len(member)
+                data.flush()
+                os.fsync(data.fileno())
+            with open(base + INDEX_SUFFIX, "a") as index:
+                index.write("".join(index_lines))
+                index.flush()
+                os.fsync(index.fileno())
+        return written
+
+    def locate(self, session_id: int) -> Optional[ArchiveLocation]:
+        """
+        Find the latest archived copy of a session's messages.
+
+        Args:
+            session_id (int): ID of the session
+
+        Returns:
+            Optional[ArchiveLocation]: Location of its member, or None if
+            the session was never archived
+        """
+        if not os.path.isdir(self.directory):
+            return None
+
+        wanted = f"{session_id}\t"
+        found = None
+        found_mtime = -1.0
+        for name in os.listdir(self.directory):
+            if not name.endswith(INDEX_SUFFIX):
+                continue
+            index_path = os.path.join(self.directory, name)
+            location = None
+            with open(index_path) as index:
+                for line in index:
+                    if line.startswith(wanted):
+                        _, offset, length, rows = line.split("\t")
+                        location = (int(offset), int(length), int(rows))
+            mtime = os.path.getmtime(index_path)
+            if location is not None and mtime > found_mtime:
+                data_path = index_path[: -len(INDEX_SUFFIX)] + DATA_SUFFIX
+                found = ArchiveLocation(data_path, *location)
+                found_mtime = mtime
+        return found
+
+    def read(self, location: ArchiveLocation) -> List[Dict[str, Any]]:
+        """
+        Read the message rows of an archived session.
+
+        Args:
+            location (ArchiveLocation): Location returned by locate()
+
+        Returns:
+            List[Dict[str, Any]]: Rows as column dictionaries, in ID order
+        """
+        with open(location.path, "rb") as data:
+            data.seek(location.offset)
+            member = data.read(location.length)
+        text = gzip.decompress(member).decode()
+        return [_decode(line) for line in text.splitlines() if line]
+
+    def mark_restored(self, session_id: int) -> None:
+        """Record that a session's messages were put back into the messages table."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, RESTORED_FILE), "a") as restored:
+                restored.write(f"{session_id}\t{time.time():.0f}\n")
+                restored.flush()
+                os.fsync(restored.fileno())
+
+    def restored_since(self, since: float) -> Set[int]:
+        """
+        Get the sessions restored after a moment.
+
+        Args:
+            since (float): Unix time
+
+        Returns:
+            Set[int]: IDs of the sessions
+        """
+        path = os.path.join(self.directory, RESTORED_FILE)
+        if not os.path.exists(path):
+            return set()
+
+        session_ids = set()
+        with open(path) as restored:
+            for line in restored:
+                session_id, restored_at = line.split("\t")
+                if float(restored_at) >= since:
+                    session_ids.add(int(session_id))
+        return session_ids
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the size of the archive.
+
+        Returns:
+            dict: Number of data files and their total bytes
+        """
+        files = 0
+        total_bytes = 0
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(DATA_SUFFIX):
+                    files += 1
+                    total_bytes += entry.stat().st_size
+        return {"files": files, "bytes": total_bytes}
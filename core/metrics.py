@@ -0,0 +1,394 @@
+"""
+Lightweight Prometheus-style metrics for the financial planner bot.
+
+Metrics are recorded in process with plain counters and fixed-bucket
+histograms and served in the Prometheus text format by a small HTTP
+listener.
+"""
+
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SyncSession
+
+from core.answer_cache import answer_cache
+from core.config import config
+from core.conversation import conversation_context
+from core.logging_config import get_lazy_logger
+from core.job_queue import job_queue
+from core.session_registry import session_registry
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class of labelled metrics."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *labelvalues: str):
+        """Get the child metric of a label combination."""
+        child = self._children.get(labelvalues)
+        if child is None:
+            child = self._children[labelvalues] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for labelvalues, child in sorted(self._children.items()):
+            lines.extend(self._render_child(labelvalues, child))
+        return lines
+
+    def _render_child(self, labelvalues, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _render_child(self, labelvalues, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {child.value}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally read from a callback."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            self.labels().set(self.callback())
+        return super().render()
+
+    def _render_child(self, labelvalues, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {child.value}"]
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observing costs one bisect and two additions."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe a value on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def _render_child(self, labelvalues, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+            labels = _format_labels(self.labelnames, labelvalues, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {child.sum}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric to the registry."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+HANDLER_LATENCY = registry.register(
+    Histogram("bot_handler_latency_seconds", "Handler execution time", ["handler"])
+)
+DB_QUERY_DURATION = registry.register(
+    Histogram("bot_db_query_duration_seconds", "Database statement execution time", ["statement"])
+)
+DB_POOL_CHECKOUT_WAIT = registry.register(
+    Histogram("bot_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+)
+SESSION_SWEEP_DURATION = registry.register(
+    Histogram(
+        "bot_session_sweep_duration_seconds",
+        "Duration of database session sweep passes",
+        buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+    )
+)
+ACTIVE_SESSIONS = registry.register(
+    Gauge("bot_active_sessions", "Sessions in the active session registry", callback=lambda: len(session_registry))
+)
+CONTEXT_SESSIONS = registry.register(
+    Gauge("bot_context_sessions", "Sessions with buffered conversation context", callback=lambda: len(conversation_context))
+)
+OUTBOUND_MESSAGES = registry.register(
+    Counter("bot_outbound_messages_total", "Outbound Telegram calls by priority and result", ["priority", "result"])
+)
+CHART_REQUESTS = registry.register(
+    Counter("bot_chart_requests_total", "Charts sent by how they were obtained", ["chart", "source"])
+)
+CHART_RENDER_DURATION = registry.register(
+    Histogram("bot_chart_render_duration_seconds", "Chart render time including worker queueing", ["chart"])
+)
+SCHEDULER_JOB_RUNS = registry.register(
+    Counter("bot_scheduler_job_runs_total", "Scheduled job runs fired by kind", ["kind"])
+)
+SCHEDULER_BATCH_DURATION = registry.register(
+    Histogram("bot_scheduler_batch_duration_seconds", "Time to fire one batch of due jobs")
+)
+SCHEDULER_QUEUED_JOBS = registry.register(
+    Gauge("bot_scheduler_queued_jobs", "Upcoming job runs held in memory", callback=lambda: len(job_queue))
+)
+AI_REPLY_LATENCY = registry.register(
+    Histogram(
+        "bot_ai_reply_seconds",
+        "Time from an AI chat message to the first model token, the first reply text shown and the full reply",
+        ["stage"],
+        buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+    )
+)
+AI_REPLY_EDITS = registry.register(
+    Counter("bot_ai_reply_edits_total", "Edits of streamed AI replies by result", ["result"])
+)
+AI_GATEWAY_REQUESTS = registry.register(
+    Counter("bot_ai_gateway_requests_total", "LLM gateway requests by outcome", ["result"])
+)
+AI_GATEWAY_WAIT = registry.register(
+    Histogram(
+        "bot_ai_gateway_wait_seconds",
+        "Time LLM gateway requests spend queued before their model call starts",
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0),
+    )
+)
+AI_GATEWAY_BATCH_SIZE = registry.register(
+    Histogram(
+        "bot_ai_gateway_batch_size",
+        "Requests per model call started by the LLM gateway",
+        buckets=(1, 2, 4, 8, 16, 32, 64),
+    )
+)
+AI_ANSWER_CACHE = registry.register(
+    Counter(
+        "bot_ai_answer_cache_lookups_total",
+        "AI chat messages by answer cache result: exact, similar, miss or skipped",
+        ["result"],
+    )
+)
+AI_ANSWER_CACHE_SIZE = registry.register(
+    Gauge("bot_ai_answer_cache_entries", "Answers held by the answer cache", callback=lambda: len(answer_cache))
+)
+ARCHIVE_MESSAGES = registry.register(
+    Counter("bot_archive_messages_total", "Message rows archived, deleted from the table and restored", ["action"])
+)
+ARCHIVE_RUN_DURATION = registry.register(
+    Histogram(
+        "bot_archive_run_duration_seconds",
+        "Duration of message archival runs including throttling pauses",
+        buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0, 3600.0),
+    )
+)
+
+
+# Statement text -> "VERB table" label; statements are parameterized so this stays small
+_statement_labels: Dict[str, str] = {}
+_TABLE_PATTERNS = {
+    "SELECT": re.compile(r"\bFROM\s+`?(\w+)", re.IGNORECASE),
+    "DELETE": re.compile(r"\bFROM\s+`?(\w+)", re.IGNORECASE),
+    "INSERT": re.compile(r"\bINTO\s+`?(\w+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+`?(\w+)", re.IGNORECASE),
+}
+_MAX_STATEMENT_LABELS = 1000
+
+
+def _statement_label(statement: str) -> str:
+    """Get a low-cardinality "VERB table" label for a SQL statement."""
+    label = _statement_labels.get(statement)
+    if label is None:
+        words = statement.split(None, 1)
+        verb = words[0].upper() if words else "OTHER"
+        pattern = _TABLE_PATTERNS.get(verb)
+        match = pattern.search(statement) if pattern else None
+        label = f"{verb} {match.group(1).lower()}" if match else verb
+        if len(_statement_labels) < _MAX_STATEMENT_LABELS:
+            _statement_labels[statement] = label
+    return label
+
+
+def instrument_engine(engine) -> None:
+    """
+    Record statement timings of a SQLAlchemy engine.
+
+    Args:
+        engine: Async or sync SQLAlchemy engine
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("query_start_times")
+        if start_times:
+            DB_QUERY_DURATION.labels(_statement_label(statement)).observe(
+                time.perf_counter() - start_times.pop()
+            )
+
+
+@event.listens_for(SyncSession, "after_transaction_create")
+def _after_transaction_create(session, transaction) -> None:
+    """Remember when a session started needing a connection."""
+    if transaction.parent is None:
+        session.info["checkout_started_at"] = time.perf_counter()
+
+
+@event.listens_for(SyncSession, "after_begin")
+def _after_begin(session, transaction, connection) -> None:
+    """Record how long the session waited for its pooled connection."""
+    started_at = session.info.pop("checkout_started_at", None)
+    if started_at is not None:
+        DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started_at)
+
+
+class MetricsServer:
+    """Small HTTP listener serving the registry at /metrics."""
+
+    def __init__(self, host: str = None, port: int = None):
+        """
+        Initialize the server.
+
+        Args:
+            host (str): Interface to bind, defaults to METRICS_HOST
+            port (int): Port to bind, defaults to METRICS_PORT
+        """
+        self.host = host or config.METRICS_HOST
+        self.port = port or config.METRICS_PORT
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def start(self) -> None:
+        """Start listening."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("📈 Metrics served at http://%s:%s/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,58 @@
+"""
+Conversion between user-entered amounts and integer minor units.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+# Minor units per major unit, e.g. cents per dollar
+MINOR_UNITS = 100
+
+# Largest amount accepted from a user, in major units
+MAX_AMOUNT = Decimal("1000000000")
+
+
+def parse_amount(text: str) -> int:
+    """
+    Parse a user-entered amount into minor units.
+
+    Accepts a dot or comma as decimal separator and spaces or apostrophes
+    as thousands separators.
+
+    Args:
+        text (str): Amount as typed, e.g. "1 234,50"
+
+    Returns:
+        int: Amount in minor units, e.g. 123450
+
+    Raises:
+        ValueError: If the text is not a positive amount with at most two decimals
+    """
+    cleaned = text.strip().replace(" ", "").replace("'", "").replace(",", ".")
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"'{text}' is not a number")
+
+    if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT:
+        raise ValueError(f"'{text}' is not a valid amount")
+    minor = amount * MINOR_UNITS
+    if minor != minor.to_integral_value():
+        raise ValueError(f"'{text}' has more than two decimals")
+    return int(minor)
+
+
+def format_amount(amount_minor: int, currency: str = "") -> str:
+    """
+    Format minor units for display.
+
+    Args:
+        amount_minor (int): Signed amount in minor units
+        currency (str): Currency code appended to the amount
+
+    Returns:
+        str: Amount such as "-1,234.50 USD"
+    """
+    sign = "-" if amount_minor < 0 else ""
+    major, minor = divmod(abs(amount_minor), MINOR_UNITS)
+    text = f"{sign}{major:,}.{minor:02d}"
+    return f"{text} {currency}" if currency else text
@@ -0,0 +1,385 @@
+"""
+Rate-limited, prioritized dispatcher for outbound Telegram API calls.
+"""
+
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, TelegramMethod
+
+from core.config import config
+from core.logging_config import get_lazy_logger
+from core.metrics import OUTBOUND_MESSAGES
+
+# Get bot logger
+logger = get_lazy_logger("bot")
+
+# Set in the dispatcher's workers, whose calls the request middleware passes through
+_dispatching: ContextVar[bool] = ContextVar("outbound_dispatching", default=False)
+
+
+class Priority(IntEnum):
+    """Priority classes of outbound calls, lower values are sent first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum number of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Get the seconds until a token is available, without taking it."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Take one token, which must be available."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        """Check if the bucket has refilled completely."""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _OutboundCall:
+    """Queued Telegram API call with its result future."""
+
+    __slots__ = ("method", "chat_id", "priority", "future", "attempts")
+
+    def __init__(self, method: TelegramMethod, chat_id: int, priority: Priority, future: asyncio.Future):
+        self.method = method
+        self.chat_id = chat_id
+        self.priority = priority
+        self.future = future
+        self.attempts = 0
+
+
+class OutboundRequestMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware that queues chat-bound calls in the dispatcher.
+
+    Handlers keep calling message.answer(), edit_text() and the like; any
+    call with a chat_id made outside the dispatcher's workers is submitted
+    as an interactive call and awaited. Calls without a chat, such as
+    getUpdates or answerCallbackQuery, and every call while the dispatcher
+    is stopped go straight to Telegram.
+    """
+
+    def __init__(self, outbound: "OutboundDispatcher"):
+        self.outbound = outbound
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Any:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or _dispatching.get() or not self.outbound.is_running:
+            return await make_request(bot, method)
+        future = await self.outbound.submit(method, chat_id, Priority.INTERACTIVE)
+        return await future
+
+
+class OutboundDispatcher:
+    """
+    Central queue for outbound Telegram calls.
+
+    Calls are sent by a bounded pool of workers in priority order while
+    respecting a global and a per-chat token bucket. A 429 response pauses
+    all sending for its retry_after and the call is retried.
+
+    The dispatcher installs OutboundRequestMiddleware on the bot's session,
+    so replies sent by handlers are queued as interactive calls ahead of
+    background sends and count against the same buckets.
+    """
+
+    # Per-chat buckets kept before idle ones are pruned
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = None,
+        chat_rate: float = None,
+        chat_burst: int = None,
+        max_concurrency: int = None,
+        queue_size: int = None,
+        max_retries: int = 3,
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            bot (Bot): Aiogram bot instance used to send calls
+            global_rate (float): Calls per second across all chats
+            chat_rate (float): Calls per second to a single chat
+            chat_burst (int): Calls to a single chat sent back to back
+                before chat_rate applies
+            max_concurrency (int): Number of calls in flight at once
+            queue_size (int): Queued calls before enqueueing blocks
+            max_retries (int): Retries of a call after a 429 response
+        """
+        self.bot = bot
+        self.global_rate = global_rate or config.OUTBOUND_GLOBAL_RATE
+        self.chat_rate = chat_rate or config.OUTBOUND_CHAT_RATE
+        self.chat_burst = chat_burst or config.OUTBOUND_CHAT_BURST
+        self.max_concurrency = max_concurrency or config.OUTBOUND_CONCURRENCY
+        self.queue_size = queue_size or config.OUTBOUND_QUEUE_SIZE
+        self.max_retries = max_retries
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._workers = []
+        self._delayed = set()
+        self.sent_count = 0
+        self.failed_count = 0
+        bot.session.middleware(OutboundRequestMiddleware(self))
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the workers are sending queued calls."""
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self._workers:
+            return
+
+        self._queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+        logger.info("📤 Outbound dispatcher started with %s workers", self.max_concurrency)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Drain queued calls and stop the workers.
+
+        Args:
+            timeout (float): Seconds to wait for the queue to drain
+        """
+        if not self._workers:
+            return
+
+        async def drain() -> None:
+            while True:
+                await self._queue.join()
+                if not self._delayed:
+                    return
+                await asyncio.wait(set(self._delayed))
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Outbound queue not drained, dropping %s calls", self._queue.qsize())
+
+        for task in list(self._delayed) + self._workers:
+            task.cancel()
+        await asyncio.gather(*self._delayed, *self._workers, return_exceptions=True)
+        self._workers = []
+        self._delayed.clear()
+        logger.info("🛑 Outbound dispatcher stopped")
+
+    async def submit(
+        self,
+        method: TelegramMethod,
+        chat_id: int,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> asyncio.Future:
+        """
+        Queue a Telegram API call.
+
+        Blocks while the queue is full. If the dispatcher is not running the
+        call is sent immediately.
+
+        Args:
+            method (TelegramMethod): Method object to send through the bot
+            chat_id (int): Chat the call is rate limited against
+            priority (Priority): Priority class of the call
+
+        Returns:
+            asyncio.Future: Resolved with the API result once sent
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Failures are logged here, so unawaited futures must not warn again
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if not self._workers:
+            try:
+                future.set_result(await self.bot(method))
+            except Exception as e:
+                future.set_exception(e)
+                logger.error("❌ Error sending to chat %s: %s", chat_id, e)
+            return future
+
+        call = _OutboundCall(method, chat_id, priority, future)
+        await self._queue.put((priority, next(self._sequence), call))
+        return future
+
+    async def send_message(
+        self,
+        chat_id: int,
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        """
+        Queue a sendMessage call.
+
+        Args:
+            chat_id (int): Target chat
+            text (str): Message text
+            priority (Priority): Priority class of the message
+            **kwargs: Additional sendMessage parameters
+
+        Returns:
+            asyncio.Future: Resolved with the sent message
+        """
+        return await self.submit(
+            SendMessage(chat_id=chat_id, text=text, **kwargs), chat_id, priority
+        )
+
+    def post_message(
+        self,
+        chat_id: int,
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Queue a sendMessage call without waiting, e.g. from an after-commit callback.
+
+        Messages posted one after another are queued in that order, and
+        stop() waits for them to be queued before draining.
+
+        Args:
+            chat_id (int): Target chat
+            text (str): Message text
+            priority (Priority): Priority class of the message
+            **kwargs: Additional sendMessage parameters
+        """
+        task = asyncio.create_task(self.send_message(chat_id, text, priority, **kwargs))
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        """Get the bucket of a chat, pruning idle buckets when there are too many."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self._chat_buckets = {
+                    key: value
+                    for key, value in self._chat_buckets.items()
+                    if not value.is_full(now)
+                }
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _requeue_later(self, item: tuple, delay: float) -> None:
+        """Put a call back on the queue after a delay without holding a worker."""
+
+        async def requeue() -> None:
+            await asyncio.sleep(delay)
+            await self._queue.put(item)
+
+        task = asyncio.create_task(requeue())
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    async def _worker(self) -> None:
+        """Send queued calls while respecting rate limits."""
+        _dispatching.set(True)
+        while True:
+            item = await self._queue.get()
+            _, _, call = item
+            try:
+                if call.future.cancelled():
+                    continue
+
+                while True:
+                    now = time.monotonic()
+                    chat_bucket = self._chat_bucket(call.chat_id, now)
+                    chat_delay = chat_bucket.delay(now)
+                    if chat_delay > 0:
+                        # Let other chats go ahead while this one is throttled
+                        self._requeue_later(item, chat_delay)
+                        break
+
+                    # Global limits apply to every call, so wait in place
+                    delay = max(self._paused_until - now, self._global_bucket.delay(now))
+                    if delay <= 0:
+                        self._global_bucket.take(now)
+                        chat_bucket.take(now)
+                        await self._send(item)
+                        break
+                    await asyncio.sleep(delay)
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, item: tuple) -> None:
+        """Perform a call, retrying it after a 429 response."""
+        _, _, call = item
+        call.attempts += 1
+        priority = call.priority.name.lower()
+        try:
+            result = await self.bot(call.method)
+        except TelegramRetryAfter as e:
+            self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+            if call.attempts <= self.max_retries:
+                OUTBOUND_MESSAGES.labels(priority, "retried").inc()
+                logger.warning(
+                    "⏳ Flood control for chat %s, retrying in %ss", call.chat_id, e.retry_after
+                )
+                self._requeue_later(item, e.retry_after)
+                return
+            self.failed_count += 1
+            OUTBOUND_MESSAGES.labels(priority, "failed").inc()
+            call.future.set_exception(e)
+            logger.error("❌ Giving up sending to chat %s: %s", call.chat_id, e)
+        except Exception as e:
+            self.failed_count += 1
+            OUTBOUND_MESSAGES.labels(priority, "failed").inc()
+            if not call.future.done():
+                call.future.set_exception(e)
+            logger.error("❌ Error sending to chat %s: %s", call.chat_id, e)
+        else:
+            self.sent_count += 1
+            OUTBOUND_MESSAGES.labels(priority, "sent").inc()
+            if not call.future.done():
+                call.future.set_result(result)
@@ -0,0 +1,188 @@
+"""
+Savings projection math: deterministic compound-growth solving and
+vectorized Monte Carlo simulation.
+
+Kept free of bot, database and logging imports so it can run in worker
+processes; amounts are in minor units and rates are annual fractions.
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+# Balance percentiles reported by simulate()
+BALANCE_PERCENTILES = (10, 50, 90)
+
+
+def monthly_rate(annual_return: float) -> float:
+    """Get the monthly rate that compounds to an annual return."""
+    return (1 + annual_return) ** (1 / 12) - 1
+
+
+def future_value(current: float, contribution: float, annual_return: float, months: int) -> float:
+    """
+    Balance after contributing at the end of every month with compound growth.
+
+    Args:
+        current (float): Balance today
+        contribution (float): Amount added each month
+        annual_return (float): Expected yearly return, e.g. 0.05
+        months (int): Number of months
+
+    Returns:
+        float: Balance after the given number of months
+    """
+    rate = monthly_rate(annual_return)
+    if rate == 0:
+        return current + contribution * months
+    growth = (1 + rate) ** months
+    return current * growth + contribution * (growth - 1) / rate
+
+
+def required_contribution(target: float, current: float, annual_return: float, months: int) -> float:
+    """
+    Monthly contribution that reaches a target in a number of months.
+
+    Args:
+        target (float): Balance to reach
+        current (float): Balance today
+        annual_return (float): Expected yearly return
+        months (int): Months until the target date
+
+    Returns:
+        float: Contribution per month, 0 if growth alone gets there
+    """
+    if months <= 0:
+        return max(0.0, target - current)
+    rate = monthly_rate(annual_return)
+    if rate == 0:
+        return max(0.0, (target - current) / months)
+    growth = (1 + rate) ** months
+    return max(0.0, (target - current * growth) * rate / (growth - 1))
+
+
+def months_to_target(target: float, current: float, contribution: float, annual_return: float) -> Optional[float]:
+    """
+    Months until a target is reached at a fixed contribution.
+
+    Args:
+        target (float): Balance to reach
+        current (float): Balance today
+        contribution (float): Amount added each month
+        annual_return (float): Expected yearly return
+
+    Returns:
+        Optional[float]: Months needed, 0 if already reached, None if never
+    """
+    if current >= target:
+        return 0.0
+    rate = monthly_rate(annual_return)
+    if rate == 0:
+        return (target - current) / contribution if contribution > 0 else None
+
+    # Solve current * g^n + c * (g^n - 1) / r = target for g^n
+    numerator = target * rate + contribution
+    denominator = current * rate + contribution
+    if denominator <= 0 or numerator / denominator <= 1:
+        return None
+    return math.log(numerator / denominator) / math.log(1 + rate)
+
+
+def simulate(
+    target: float,
+    current: float,
+    months: int,
+    contribution_mean: float,
+    contribution_std: float,
+    annual_return: float,
+    annual_volatility: float,
+    paths: int,
+    seed: int,
+) -> Dict[str, object]:
+    """
+    Monte Carlo simulation of a savings balance.
+
+    Every path draws a lognormal monthly return and a normally distributed
+    contribution each month; paths are advanced together as vectors, so
+    memory stays O(paths) whatever the horizon.
+
+    Args:
+        target (float): Balance to reach
+        current (float): Balance today
+        months (int): Months until the target date
+        contribution_mean (float): Average monthly contribution
+        contribution_std (float): Standard deviation of the monthly contribution
+        annual_return (float): Expected yearly return
+        annual_volatility (float): Yearly standard deviation of returns
+        paths (int): Number of simulated paths
+        seed (int): Random seed, so equal inputs give equal results
+
+    Returns:
+        Dict[str, object]: probability of reaching the target by the
+        date, median months to reach it (None if most paths never do)
+        and the balance percentiles at the date
+    """
+    rng = np.random.default_rng(seed)
+    sigma = annual_volatility / math.sqrt(12)
+    mu = math.log1p(monthly_rate(annual_return)) - sigma ** 2 / 2
+
+    balance = np.full(paths, float(current))
+    reached_at = np.full(paths, np.inf)
+    reached_at[balance >= target] = 0
+    for month in range(1, months + 1):
+        balance *= np.exp(rng.normal(mu, sigma, paths))
+        balance += rng.normal(contribution_mean, contribution_std, paths)
+        np.maximum(balance, 0, out=balance)
+        newly_reached = (balance >= target) & np.isinf(reached_at)
+        reached_at[newly_reached] = month
+
+    reached = np.isfinite(reached_at)
+    median_months = float(np.median(reached_at)) if reached.mean() >= 0.5 else None
+    return {
+        "probability": float(reached.mean()),
+        "median_months": median_months,
+        "balance_percentiles": dict(
+            zip(BALANCE_PERCENTILES, np.percentile(balance, BALANCE_PERCENTILES).tolist())
+        ),
+        "paths": paths,
+    }
+
+
+def project(
+    target: float,
+    current: float,
+    months: int,
+    contribution_mean: float,
+    contribution_std: float,
+    annual_return: float,
+    annual_volatility: float,
+    paths: int,
+    seed: int,
+) -> Dict[str, object]:
+    """
+    Full projection of a goal: deterministic figures plus the simulation.
+
+    Arguments are those of simulate().
+
+    Returns:
+        Dict[str, object]: required_contribution, expected_balance at the
+        date at the average contribution, months_to_target at that
+        contribution, and the simulate() results under "simulation"
+    """
+    return {
+        "required_contribution": required_contribution(target, current, annual_return, months),
+        "expected_balance": future_value(current, contribution_mean, annual_return, months),
+        "months_to_target": months_to_target(target, current, contribution_mean, annual_return),
+        "simulation": simulate(
+            target,
+            current,
+            months,
+            contribution_mean,
+            contribution_std,
+            annual_return,
+            annual_volatility,
+            paths,
+            seed,
+        ),
+    }
@@ -0,0 +1,236 @@
+"""
+Recurrence rules of scheduled jobs: one-off, fixed interval and cron.
+
+Times are naive local datetimes like the rest of the bot; cron fields are
+matched against the server's local time.
+"""
+
+import calendar
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+# Recurrence types of a scheduled job
+ONCE = "once"
+INTERVAL = "interval"
+CRON = "cron"
+SCHEDULE_TYPES = (ONCE, INTERVAL, CRON)
+
+# Shortest allowed interval, in seconds
+MIN_INTERVAL = 60
+
+# Years searched for a cron match before giving up, e.g. on "0 0 31 2 *"
+_CRON_SEARCH_YEARS = 5
+
+
+def _parse_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    """
+    Parse one cron field: *, a value, a range a-b, a list, and /step on any of them.
+
+    Raises:
+        ValueError: If the field is malformed or out of range
+    """
+    values = set()
+    for part in field.split(","):
+        body, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if body == "*":
+            start, end = low, high
+        elif "-" in body:
+            start, end = (int(value) for value in body.split("-", 1))
+        else:
+            start = int(body)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+def _next_value(values: Sequence[int], value: int) -> Optional[int]:
+    """Get the smallest of sorted values at or above a value, or None."""
+    index = bisect_left(values, value)
+    return values[index] if index < len(values) else None
+
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Day-of-week runs from 0 (Sunday) to 6, with 7 also meaning Sunday. As in
+    cron, when both day fields are restricted a day matching either fires.
+    """
+
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "any_day", "any_weekday")
+
+    def __init__(self, expression: str):
+        """
+        Parse a cron expression.
+
+        Args:
+            expression (str): Expression such as "0 9 1 * *"
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields")
+
+        self.expression = expression
+        # Sorted so the next valid day, hour or minute is found by bisection
+        self.minutes = tuple(sorted(_parse_field(fields[0], 0, 59)))
+        self.hours = tuple(sorted(_parse_field(fields[1], 0, 23)))
+        self.days = tuple(sorted(_parse_field(fields[2], 1, 31)))
+        self.months = _parse_field(fields[3], 1, 12)
+        weekdays = _parse_field(fields[4], 0, 7)
+        # Cron counts from Sunday, datetime.weekday() from Monday
+        self.weekdays = frozenset((weekday - 1) % 7 for weekday in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = moment.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def _next_day(self, moment: datetime) -> datetime:
+        """Get midnight of the first day after a moment's day that may match."""
+        if self.any_weekday:
+            day = _next_value(self.days, moment.day + 1)
+            if day is not None and day <= calendar.monthrange(moment.year, moment.month)[1]:
+                return datetime(moment.year, moment.month, day)
+            year, month = divmod(moment.year * 12 + moment.month, 12)
+            return datetime(year, month + 1, 1)
+        return datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Get the first matching minute strictly after a moment.
+
+        Months and days that cannot match are skipped and the hour and
+        minute are found by bisection, so a monthly rule takes a few steps
+        rather than one per minute.
+
+        Raises:
+            ValueError: If the expression never matches, e.g. "0 0 30 2 *"
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last_year = candidate.year + _CRON_SEARCH_YEARS
+        while candidate.year <= last_year:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.year * 12 + candidate.month, 12)
+                candidate = datetime(year, month + 1, 1)
+                continue
+            if not self._day_matches(candidate):
+                candidate = self._next_day(candidate)
+                continue
+            hour = _next_value(self.hours, candidate.hour)
+            if hour is None:
+                candidate = self._next_day(candidate)
+                continue
+            if hour != candidate.hour:
+                candidate = candidate.replace(hour=hour, minute=0)
+            minute = _next_value(self.minutes, candidate.minute)
+            if minute is None:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            return candidate.replace(minute=minute)
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+
+@lru_cache(maxsize=1024)
+def parse_cron(expression: str) -> CronSchedule:
+    """Parse a cron expression, reusing schedules shared by many jobs."""
+    return CronSchedule(expression)
+
+
+def validate_schedule(schedule_type: str, schedule: Optional[str]) -> None:
+    """
+    Check a recurrence rule.
+
+    Args:
+        schedule_type (str): ONCE, INTERVAL or CRON
+        schedule (Optional[str]): Seconds for INTERVAL, an expression for CRON
+
+    Raises:
+        ValueError: If the rule is invalid
+    """
+    if schedule_type == ONCE:
+        return
+    if schedule_type == INTERVAL:
+        if schedule is None or not schedule.isdigit() or int(schedule) < MIN_INTERVAL:
+            raise ValueError(f"Interval must be a whole number of seconds >= {MIN_INTERVAL}")
+        return
+    if schedule_type == CRON:
+        parse_cron(schedule or "").next_after(datetime.now())
+        return
+    raise ValueError(f"Unknown schedule type '{schedule_type}'")
+
+
+def next_run(schedule_type: str, schedule: Optional[str], after: datetime) -> Optional[datetime]:
+    """
+    Get the next run of a rule strictly after a moment.
+
+    Returns:
+        Optional[datetime]: Next run, or None for a one-off job
+    """
+    if schedule_type == INTERVAL:
+        return after + timedelta(seconds=int(schedule))
+    if schedule_type == CRON:
+        return parse_cron(schedule).next_after(after)
+    return None
+
+
+def due_runs(
+    schedule_type: str,
+    schedule: Optional[str],
+    next_run_at: datetime,
+    now: datetime,
+    catch_up: bool,
+    limit: int,
+) -> Tuple[List[datetime], Optional[datetime]]:
+    """
+    Get the runs of a due job and the run after them.
+
+    A job that missed several runs, e.g. while the bot was down, either
+    fires every missed run (catch_up) or fires once for all of them.
+    Catch-up fires at most limit runs at a time; the returned next run is
+    then still in the past and the rest follow in later batches.
+
+    Args:
+        schedule_type (str): ONCE, INTERVAL or CRON
+        schedule (Optional[str]): Rule of the job
+        next_run_at (datetime): Scheduled run, at or before now
+        now (datetime): Current time
+        catch_up (bool): Fire every missed run rather than one
+        limit (int): Most runs returned with catch_up
+
+    Returns:
+        Tuple[List[datetime], Optional[datetime]]: Scheduled times of the
+        runs to fire now, and the next run or None when the job is done
+    """
+    if schedule_type == ONCE:
+        return [next_run_at], None
+
+    if schedule_type == INTERVAL:
+        interval = timedelta(seconds=int(schedule))
+        missed = (now - next_run_at) // interval + 1
+        if not catch_up:
+            return [next_run_at], next_run_at + missed * interval
+        count = min(missed, limit)
+        return [next_run_at + index * interval for index in range(count)], next_run_at + count * interval
+
+    if not catch_up:
+        # Jump straight past now instead of walking every missed run
+        return [next_run_at], next_run(schedule_type, schedule, max(now, next_run_at))
+
+    runs = [next_run_at]
+    following = next_run(schedule_type, schedule, next_run_at)
+    while following <= now and len(runs) < limit:
+        runs.append(following)
+        following = next_run(schedule_type, schedule, following)
+    return runs, following
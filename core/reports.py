@@ -0,0 +1,156 @@
+"""
+Rendering of the Financial Reports screen from monthly rollups.
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+
+from aiogram import types
+
+from core.chart_render import render_income_expense_chart
+from core.charts import chart_service, chart_key, data_version
+from core.logging_config import get_lazy_logger
+from core.money import format_amount
+from database.services.rollup_service import shift_month
+
+# Get bot logger
+logger = get_lazy_logger("bot")
+
+# Expense categories listed for the latest month
+TOP_CATEGORIES = 3
+
+
+def render_monthly_report(rollups: Sequence, first_month: date, months: int) -> str:
+    """
+    Render monthly summaries and the spending trend.
+
+    Works on rollup rows only, so the cost grows with the number of months
+    and categories shown, never with the size of the ledger.
+
+    Args:
+        rollups (Sequence): Rows as returned by RollupService.get_monthly_rollups
+        first_month (date): Oldest month shown
+        months (int): Number of months shown
+
+    Returns:
+        str: Report text
+    """
+    if not rollups:
+        return (
+            "📊 Financial Reports\n\n"
+            "No transactions yet. Add income or expenses to see monthly summaries."
+        )
+
+    month_list = [shift_month(first_month, offset) for offset in range(months)]
+    by_currency: Dict[str, Dict[date, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    categories: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    latest = month_list[-1]
+    for row in rollups:
+        totals = by_currency[row.currency][row.month]
+        totals[0] += row.income_minor
+        totals[1] += row.expense_minor
+        if row.month == latest and row.expense_minor:
+            categories[row.currency][row.category] += row.expense_minor
+
+    lines = ["📊 Financial Reports"]
+    for currency in sorted(by_currency):
+        monthly = by_currency[currency]
+        lines.append(f"\n💱 {currency}, last {months} months")
+        for month in month_list:
+            income, expense = monthly.get(month, (0, 0))
+            lines.append(
+                f"{month:%b %Y}: +{format_amount(income)} / -{format_amount(expense)}"
+                f" = {format_amount(income - expense)}"
+            )
+
+        latest_expense = monthly.get(latest, (0, 0))[1]
+        # Months before the first transaction would drag the average down
+        earlier = [monthly[month][1] for month in month_list[:-1] if month in monthly]
+        average = sum(earlier) // len(earlier) if earlier else 0
+        if average:
+            change = (latest_expense - average) * 100 // average
+            trend = "📈" if change > 0 else "📉"
+            lines.append(
+                f"\n{trend} Spending this month is {abs(change)}% "
+                f"{'above' if change > 0 else 'below'} the average of the previous months"
+            )
+
+        top = sorted(categories[currency].items(), key=lambda item: item[1], reverse=True)
+        if top:
+            lines.append("\n🏷️ Top expenses this month:")
+            for category, amount in top[:TOP_CATEGORIES]:
+                lines.append(f"• {category}: {format_amount(amount, currency)}")
+
+    return "\n".join(lines)
+
+
+def monthly_series(
+    rollups: Sequence, first_month: date, months: int
+) -> Dict[str, Tuple[List[int], List[int]]]:
+    """
+    Get income and expenses per month for every currency in the rollups.
+
+    Args:
+        rollups (Sequence): Rows as returned by RollupService.get_monthly_rollups
+        first_month (date): Oldest month
+        months (int): Number of months
+
+    Returns:
+        Dict[str, Tuple[List[int], List[int]]]: Zero-filled income and
+        expense lists in minor units, keyed by currency
+    """
+    offsets = {shift_month(first_month, offset): offset for offset in range(months)}
+    series: Dict[str, Tuple[List[int], List[int]]] = {}
+    for row in rollups:
+        offset = offsets.get(row.month)
+        if offset is None:
+            continue
+        income, expense = series.setdefault(row.currency, ([0] * months, [0] * months))
+        income[offset] += row.income_minor
+        expense[offset] += row.expense_minor
+    return series
+
+
+async def send_income_expense_chart(
+    message: types.Message, user_id: int, rollups: Sequence, first_month: date, months: int
+) -> None:
+    """
+    Send the income vs expenses chart of a user's main currency.
+
+    The chart complements the text report, so failures are logged rather
+    than raised.
+
+    Args:
+        message (types.Message): Message whose chat receives the chart
+        user_id (int): Database ID of the user
+        rollups (Sequence): Rows as returned by RollupService.get_monthly_rollups
+        first_month (date): Oldest month shown
+        months (int): Number of months shown
+    """
+    series = monthly_series(rollups, first_month, months)
+    if not series:
+        return
+
+    currency = max(series, key=lambda code: sum(series[code][0]) + sum(series[code][1]))
+    income, expense = series[currency]
+    labels = [f"{shift_month(first_month, offset):%b %y}" for offset in range(months)]
+    key = chart_key(
+        user_id,
+        f"{first_month:%Y-%m}+{months}",
+        "income_expense",
+        data_version(currency, income, expense),
+    )
+    try:
+        await chart_service.send_chart(
+            message,
+            key,
+            "income_expense",
+            render_income_expense_chart,
+            labels,
+            income,
+            expense,
+            currency,
+        )
+    except Exception as e:
+        logger.error("❌ Error sending income/expense chart to user %s: %s", user_id, e)
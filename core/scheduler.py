@@ -0,0 +1,298 @@
+"""
+Scheduler firing reminders, recurring transactions and other user jobs.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from database import unit_of_work
+from database.models import ScheduledJob
+from database.services.job_service import JobService
+from core.config import config
+from core.job_queue import job_queue
+from core.leader import PartitionLeases
+from core.logging_config import get_lazy_logger
+from core.metrics import SCHEDULER_BATCH_DURATION, SCHEDULER_JOB_RUNS
+from core.recurrence import due_runs
+
+# Get app logger
+logger = get_lazy_logger("app")
+
+
+class JobRun:
+    """Due job handed to its handler, with the scheduled times being fired."""
+
+    __slots__ = ("job", "fire_times")
+
+    def __init__(self, job: ScheduledJob, fire_times: List[datetime]):
+        self.job = job
+        self.fire_times = fire_times
+
+
+# Handlers receive every due run of their kind in a batch
+JobHandler = Callable[[List[JobRun]], Awaitable[None]]
+
+
+class JobScheduler:
+    """
+    Fires scheduled jobs at their next_run_at.
+
+    The scheduled_jobs table is the source of truth; only the runs due
+    within SCHEDULER_LOOKAHEAD seconds are held in the job queue's heap, read
+    in keyset-ordered chunks as the window moves, so millions of scheduled
+    jobs cost one index range scan per window rather than memory. Runs
+    missed while the bot was down are overdue rows and fire on the first
+    load.
+
+    Runs that fall due together are fired in batches of
+    SCHEDULER_BATCH_SIZE: one query loads the jobs, each kind's handler is
+    called once with all of its runs, and the jobs are advanced in the same
+    transaction as the handlers' database writes, so a recurring
+    transaction is recorded exactly once. The jobs are locked while they
+    fire, so a job cancelled meanwhile either fires before the cancel or
+    not at all. Handlers queue their messages after the commit, so a batch
+    that rolls back sends nothing. A failing batch is retried job by job,
+    so one bad job only delays itself.
+    """
+
+    def __init__(
+        self,
+        lookahead: float = None,
+        batch_size: int = None,
+        max_queued: int = None,
+        partitions: Optional[PartitionLeases] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            lookahead (float): Seconds of upcoming runs held in memory,
+                defaults to SCHEDULER_LOOKAHEAD
+            batch_size (int): Runs fired per transaction, defaults to
+                SCHEDULER_BATCH_SIZE
+            max_queued (int): Most runs held in memory, defaults to
+                SCHEDULER_MAX_QUEUED
+            partitions (Optional[PartitionLeases]): Leases deciding whose
+                jobs this instance fires; without them it fires everyone's
+        """
+        self.lookahead = timedelta(seconds=lookahead or config.SCHEDULER_LOOKAHEAD)
+        self.batch_size = batch_size or config.SCHEDULER_BATCH_SIZE
+        self.max_queued = max_queued or config.SCHEDULER_MAX_QUEUED
+        self.partitions = partitions
+        self.is_running = False
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._cursor: Optional[Tuple[datetime, int]] = None
+        self._reload_requested = False
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        Register the handler of a job kind.
+
+        Args:
+            kind (str): Job kind, as stored in scheduled_jobs.kind
+            handler (JobHandler): Coroutine function called with the due
+                runs of the kind inside the batch's unit of work
+        """
+        self._handlers[kind] = handler
+
+    async def start_scheduler(self) -> None:
+        """Start the background task that fires due jobs."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._wakeup = asyncio.Event()
+        self._cursor = None
+        job_queue.reset()
+        job_queue.set_listener(self._wakeup.set)
+        if self.partitions is not None:
+            self.partitions.add_listener(self._request_reload)
+        logger.info("🔄 Job scheduler started")
+
+        while self.is_running:
+            try:
+                self._wakeup.clear()
+
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._cursor = None
+                    job_queue.horizon = None
+                if self._needs_load():
+                    await self.load_window()
+                await self.fire_due_jobs()
+
+                # Sleep until the next run, the next window load or a wakeup
+                now = datetime.now()
+                wake_at = now + self.lookahead
+                if len(job_queue) < self.max_queued:
+                    wake_at = job_queue.horizon - self.lookahead / 2
+                next_run = job_queue.next_run()
+                if next_run is not None:
+                    wake_at = min(wake_at, next_run)
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=max((wake_at - now).total_seconds(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            except Exception as e:
+                logger.error("❌ Error in job scheduler: %s", e)
+                await asyncio.sleep(60)  # Wait 1 minute before retrying
+
+        job_queue.set_listener(None)
+        if self.partitions is not None:
+            self.partitions.remove_listener(self._request_reload)
+
+    async def stop_scheduler(self) -> None:
+        """Stop the background scheduler."""
+        self.is_running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info("🛑 Job scheduler stopped")
+
+    def _request_reload(self) -> None:
+        """Read the window again from its start, e.g. after taking over a partition."""
+        self._reload_requested = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _owns_user(self, user_id: int) -> bool:
+        return self.partitions is None or self.partitions.owns_user(user_id)
+
+    def _needs_load(self) -> bool:
+        """Check if the window should move forward and there is room for it."""
+        if job_queue.horizon is None:
+            return True
+        return (
+            datetime.now() + self.lookahead / 2 >= job_queue.horizon
+            and len(job_queue) < self.max_queued
+        )
+
+    async def load_window(self) -> int:
+        """
+        Queue the runs up to the end of the lookahead window.
+
+        Rows are read in keyset order. When the queue is full the horizon
+        stops at the last row read and the next load continues from there
+        as queued runs fire. A load that reaches the end of the window makes
+        the next one start over, so jobs scheduled by other instances for
+        this instance's users are picked up within half a window. With
+        several instances only jobs of the user partitions this instance
+        holds are read.
+
+        Returns:
+            int: Number of runs queued
+        """
+        horizon = datetime.now() + self.lookahead
+        partition = None
+        if self.partitions is not None:
+            partition = self.partitions.partition_filter()
+            if partition is not None and not partition[1]:
+                job_queue.horizon = horizon
+                return 0
+
+        loaded = 0
+        while True:
+            limit = min(self.batch_size, self.max_queued - len(job_queue))
+            if limit <= 0:
+                # Queue full: every run up to the cursor is known
+                if self._cursor is not None:
+                    job_queue.horizon = self._cursor[0]
+                break
+            rows = await JobService.get_upcoming_jobs(
+                before=horizon, after=self._cursor, limit=limit, partition=partition
+            )
+            if rows:
+                self._cursor = (rows[-1].next_run_at, rows[-1].id)
+                loaded += len(rows)
+            if len(rows) < limit:
+                job_queue.load(rows, horizon)
+                self._cursor = None
+                break
+            job_queue.load(rows, self._cursor[0])
+
+        if loaded:
+            logger.debug("📥 Queued %s job runs up to %s", loaded, job_queue.horizon)
+        return loaded
+
+    async def fire_due_jobs(self) -> int:
+        """
+        Fire every due run in batches.
+
+        Returns:
+            int: Number of jobs fired
+        """
+        fired = 0
+        while True:
+            now = datetime.now()
+            due = {
+                job_id: user_id
+                for job_id, user_id in job_queue.pop_due(now, self.batch_size)
+                if self._owns_user(user_id)
+            }
+            if not due:
+                return fired
+
+            try:
+                fired += await self._fire_batch(list(due), now)
+            except Exception as e:
+                logger.error("❌ Batch of %s jobs failed, retrying one by one: %s", len(due), e)
+                for job_id, user_id in due.items():
+                    try:
+                        fired += await self._fire_batch([job_id], now)
+                    except Exception as e:
+                        logger.error("❌ Job %s failed: %s", job_id, e)
+                        # The row still holds the failed run, which stays due
+                        retry_at = datetime.now() + timedelta(seconds=config.SCHEDULER_RETRY_DELAY)
+                        job_queue.push(job_id, user_id, retry_at)
+            # Let updates through between batches of a large backlog
+            await asyncio.sleep(0)
+
+    async def _fire_batch(self, job_ids: Sequence[int], now: datetime) -> int:
+        """Fire a batch of due jobs in one unit of work and queue their next runs."""
+        started_at = time.perf_counter()
+        runs_by_kind: Dict[str, List[JobRun]] = defaultdict(list)
+        advances = []
+
+        async with unit_of_work():
+            for job in await JobService.get_jobs(job_ids, for_update=True):
+                if job.next_run_at is None or job.next_run_at > now:
+                    # Cancelled or rescheduled since it was queued
+                    job_queue.offer(job.id, job.user_id, job.next_run_at)
+                    continue
+                if job.kind not in self._handlers:
+                    logger.warning("⚠️ No handler for job %s of kind '%s'", job.id, job.kind)
+                    continue
+
+                fire_times, following = due_runs(
+                    job.schedule_type,
+                    job.schedule,
+                    job.next_run_at,
+                    now,
+                    job.catch_up,
+                    config.SCHEDULER_MAX_CATCH_UP,
+                )
+                runs_by_kind[job.kind].append(JobRun(job, fire_times))
+                advances.append({
+                    "job_id": job.id,
+                    "due_at": job.next_run_at,
+                    "following": following,
+                    "last_run_at": now,
+                    "runs": len(fire_times),
+                    "user_id": job.user_id,
+                })
+
+            for kind, runs in runs_by_kind.items():
+                await self._handlers[kind](runs)
+            await JobService.advance_jobs(advances)
+
+        for advance in advances:
+            job_queue.offer(advance["job_id"], advance["user_id"], advance["following"])
+        for kind, runs in runs_by_kind.items():
+            SCHEDULER_JOB_RUNS.labels(kind).inc(sum(len(run.fire_times) for run in runs))
+        SCHEDULER_BATCH_DURATION.observe(time.perf_counter() - started_at)
+        return len(advances)
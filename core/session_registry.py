@@ -0,0 +1,180 @@
+"""
+In-memory registry of active sessions kept coherent with the sessions table.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import config
+
+
+class ActiveSession:
+    """Snapshot of an active session held in the registry."""
+
+    __slots__ = ("id", "user_id", "started_at", "last_activity")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        started_at: datetime,
+        last_activity: datetime,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.started_at = started_at
+        self.last_activity = last_activity
+
+    @classmethod
+    def from_model(cls, session_obj) -> "ActiveSession":
+        """Build a snapshot from a Session model or row."""
+        return cls(
+            id=session_obj.id,
+            user_id=session_obj.user_id,
+            started_at=session_obj.started_at,
+            last_activity=session_obj.last_activity or session_obj.started_at,
+        )
+
+    @property
+    def expires_at(self) -> datetime:
+        """Time at which the session expires without further activity."""
+        return self.last_activity + timedelta(minutes=config.get_session_timeout())
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """
+        Check if the session has exceeded the SESSION_TIME timeout.
+
+        Args:
+            now (Optional[datetime]): Reference time, defaults to the current time
+
+        Returns:
+            bool: True if the session has expired
+        """
+        return self.expires_at < (now or datetime.now())
+
+
+class ActiveSessionRegistry:
+    """
+    Active sessions keyed by user_id, rebuilt from the database at startup.
+
+    Expiry deadlines are kept in a min-heap. Activity does not touch the heap:
+    a popped entry whose session has since been active is simply pushed back
+    with its new deadline.
+    """
+
+    def __init__(self):
+        self._by_user: Dict[int, ActiveSession] = {}
+        self._by_id: Dict[int, ActiveSession] = {}
+        self._deadlines: List[Tuple[datetime, int]] = []
+        self._listener: Optional[Callable[[], None]] = None
+        self.is_loaded = False
+
+    def set_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """
+        Set a callback invoked when a deadline earlier than all others is scheduled.
+
+        Args:
+            listener (Optional[Callable[[], None]]): Callback, or None to remove it
+        """
+        self._listener = listener
+
+    def load(self, sessions: Iterable) -> None:
+        """
+        Replace the registry contents with the given active sessions.
+
+        Args:
+            sessions (Iterable): Session models or rows that are currently active
+        """
+        self._by_user.clear()
+        self._by_id.clear()
+        self._deadlines.clear()
+        for session_obj in sessions:
+            active_session = ActiveSession.from_model(session_obj)
+            self._by_user[active_session.user_id] = active_session
+            self._by_id[active_session.id] = active_session
+            self._deadlines.append((active_session.expires_at, active_session.id))
+        heapq.heapify(self._deadlines)
+        self.is_loaded = True
+        if self._listener is not None:
+            self._listener()
+
+    def add(self, active_session: ActiveSession) -> None:
+        """Register a newly active session, replacing the user's previous one."""
+        previous = self._by_user.get(active_session.user_id)
+        if previous is not None and previous.id != active_session.id:
+            self._by_id.pop(previous.id, None)
+        self._by_user[active_session.user_id] = active_session
+        self._by_id[active_session.id] = active_session
+        self._schedule(active_session)
+
+    def _schedule(self, active_session: ActiveSession) -> None:
+        """Push the session's deadline, waking the listener if it is the earliest."""
+        deadline = active_session.expires_at
+        is_earliest = not self._deadlines or deadline < self._deadlines[0][0]
+        heapq.heappush(self._deadlines, (deadline, active_session.id))
+        if is_earliest and self._listener is not None:
+            self._listener()
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Get the earliest scheduled deadline, which may belong to a stale entry."""
+        return self._deadlines[0][0] if self._deadlines else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[ActiveSession]:
+        """
+        Pop the sessions whose deadline has passed.
+
+        Entries of ended sessions are dropped and entries of sessions that
+        have been active since they were scheduled are re-armed.
+
+        Args:
+            now (Optional[datetime]): Reference time, defaults to the current time
+
+        Returns:
+            List[ActiveSession]: Expired sessions, still present in the registry
+        """
+        now = now or datetime.now()
+        due: Dict[int, ActiveSession] = {}
+        rearm: Dict[int, ActiveSession] = {}
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, session_id = heapq.heappop(self._deadlines)
+            active_session = self._by_id.get(session_id)
+            if active_session is None:
+                continue
+            if active_session.is_expired(now):
+                due[session_id] = active_session
+            else:
+                rearm[session_id] = active_session
+
+        for session_id, active_session in rearm.items():
+            if session_id not in due:
+                heapq.heappush(self._deadlines, (active_session.expires_at, session_id))
+        return list(due.values())
+
+    def get(self, user_id: int) -> Optional[ActiveSession]:
+        """Get the active session of a user."""
+        return self._by_user.get(user_id)
+
+    def get_by_id(self, session_id: int) -> Optional[ActiveSession]:
+        """Get an active session by its ID."""
+        return self._by_id.get(session_id)
+
+    def touch(self, session_id: int, last_activity: datetime) -> None:
+        """Record activity on an active session."""
+        active_session = self._by_id.get(session_id)
+        if active_session is not None and last_activity > active_session.last_activity:
+            active_session.last_activity = last_activity
+
+    def remove(self, session_id: int) -> Optional[ActiveSession]:
+        """Forget an ended session."""
+        active_session = self._by_id.pop(session_id, None)
+        if active_session is not None and self._by_user.get(active_session.user_id) is active_session:
+            del self._by_user[active_session.user_id]
+        return active_session
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+
+# Global active session registry
+session_registry = ActiveSessionRegistry()
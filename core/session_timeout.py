@@ -3,92 +3,227 @@ Session timeout handler for managing expired sessions and notifying users.
 """
 
 import asyncio
-from typing import List
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
 from aiogram import Bot
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from database.services.session_service import SessionService
 from database.services.user_service import UserService
 from core.config import config
-from core.logging_config import get_logger
+from core.logging_config import get_lazy_logger
+from core.leader import PartitionLeases
+from core.metrics import SESSION_SWEEP_DURATION
+from core.outbound import OutboundDispatcher, Priority
+from core.session_registry import session_registry
 
 # Get session logger
-logger = get_logger("session")
+logger = get_lazy_logger("session")
 
 
 class SessionTimeoutHandler:
     """Handler for managing session timeouts and notifications."""
 
-    def __init__(self, bot: Bot):
+    def __init__(
+        self,
+        bot: Bot,
+        outbound: Optional[OutboundDispatcher] = None,
+        partitions: Optional[PartitionLeases] = None,
+    ):
         """
         Initialize the session timeout handler.
 
         Args:
             bot (Bot): Aiogram bot instance for sending messages
+            outbound (Optional[OutboundDispatcher]): Dispatcher that queues
+                notifications; without it they are sent inline
+            partitions (Optional[PartitionLeases]): Leases deciding whose
+                sessions this instance ends; without them it ends everyone's
         """
         self.bot = bot
+        self.outbound = outbound
+        self.partitions = partitions
         self.is_running = False
+        self._wakeup = None
+        self._sweep_requested = False
 
     async def start_timeout_checker(self) -> None:
-        """Start the background task to check for expired sessions."""
+        """
+        Start the background task that expires sessions at their deadline.
+
+        The task sleeps until the earliest session deadline in the registry
+        and only sweeps the database every SESSION_SWEEP_INTERVAL seconds to
+        reconcile sessions the registry does not know about. With several
+        instances each one only ends sessions of the user partitions it
+        holds, and sweeps right away when it takes over a partition.
+        """
         if self.is_running:
             return
 
         self.is_running = True
+        self._wakeup = asyncio.Event()
+        session_registry.set_listener(self._wakeup.set)
+        if self.partitions is not None:
+            self.partitions.add_listener(self._request_sweep)
         logger.info("🔄 Session timeout checker started")
 
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time()
+
         while self.is_running:
             try:
-                await self.check_and_handle_expired_sessions()
-                # Check every 5 minutes
-                await asyncio.sleep(60)
+                self._wakeup.clear()
+
+                if self._sweep_requested or loop.time() >= next_sweep:
+                    self._sweep_requested = False
+                    await self.check_and_handle_expired_sessions()
+                    next_sweep = loop.time() + config.SESSION_SWEEP_INTERVAL
+
+                await self.expire_due_sessions()
+
+                # Sleep until the next deadline, the next sweep or a wakeup
+                timeout = next_sweep - loop.time()
+                next_deadline = session_registry.next_deadline()
+                if next_deadline is not None:
+                    until_deadline = (next_deadline - datetime.now()).total_seconds()
+                    timeout = min(timeout, until_deadline)
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
             except Exception as e:
-                logger.error(f"❌ Error in session timeout checker: {e}")
+                logger.error("❌ Error in session timeout checker: %s", e)
                 await asyncio.sleep(60)  # Wait 1 minute before retrying
 
+        session_registry.set_listener(None)
+        if self.partitions is not None:
+            self.partitions.remove_listener(self._request_sweep)
+
     async def stop_timeout_checker(self) -> None:
         """Stop the background timeout checker."""
         self.is_running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
         logger.info("🛑 Session timeout checker stopped")
 
-    async def check_and_handle_expired_sessions(self) -> None:
-        """Check for expired sessions and notify users."""
+    def _request_sweep(self) -> None:
+        """Sweep on the next loop iteration, e.g. after taking over a partition."""
+        self._sweep_requested = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _owns_user(self, user_id: int) -> bool:
+        return self.partitions is None or self.partitions.owns_user(user_id)
+
+    async def expire_due_sessions(self) -> None:
+        """
+        End the sessions whose registry deadline has passed and notify users.
+
+        Only sessions of users in partitions this instance holds are ended;
+        the stored last_activity is checked again because another instance
+        may have kept the session alive. Due sessions of other partitions
+        are dropped from the registry and conversation context and left to
+        their holder's sweep, so a later request for them reads the
+        database again.
+        """
+        due_sessions = []
+        foreign_ids = []
+        for active_session in session_registry.pop_due():
+            if self._owns_user(active_session.user_id):
+                due_sessions.append(active_session)
+            else:
+                foreign_ids.append(active_session.id)
+        SessionService.forget_sessions(foreign_ids)
+        if not due_sessions:
+            return
+
         try:
-            # Get all expired sessions
-            expired_sessions = await SessionService.get_expired_sessions()
+            expired_sessions, session_end_time = await SessionService.end_sessions(
+                [active_session.id for active_session in due_sessions],
+                only_expired=True,
+            )
+        except Exception as e:
+            logger.error("❌ Error expiring due sessions: %s", e)
+            return
 
-            if not expired_sessions:
-                return
+        # Sessions kept alive or already ended elsewhere have no deadline
+        # left here; forget them so the next request reads the database
+        expired_ids = {expired_session.id for expired_session in expired_sessions}
+        SessionService.forget_sessions(
+            [active_session.id for active_session in due_sessions if active_session.id not in expired_ids]
+        )
 
-            logger.info(f"🔍 Found {len(expired_sessions)} expired sessions")
+        await self._notify_expired_sessions(expired_sessions, session_end_time)
 
-            for session in expired_sessions:
-                try:
-                    # Get user information
-                    user = await UserService.get_user_by_id(session.user_id)
-                    if not user:
-                        continue
+    async def check_and_handle_expired_sessions(self) -> None:
+        """
+        Sweep the database for expired sessions and notify users.
 
-                    # End the session
-                    session_end_time = await SessionService.end_session(session.id)
+        Sessions are ended in keyset-ordered chunks of SESSION_SWEEP_BATCH_SIZE,
+        each with a single UPDATE, so memory stays bounded however large the
+        backlog is. With several instances only the user partitions this
+        instance holds are swept.
+        """
+        batch_size = config.SESSION_SWEEP_BATCH_SIZE
+        partition = None
+        if self.partitions is not None:
+            partition = self.partitions.partition_filter()
+            if partition is not None and not partition[1]:
+                return
+        last_session_id = 0
+        total_expired = 0
+        sweep_started_at = time.perf_counter()
 
-                    if session_end_time:
+        try:
+            # Buffered activity must reach the database before it is compared
+            await SessionService.flush_session_activity()
 
-                        # Send timeout notification to user
-                        await self.send_session_timeout_message(
-                            user.telegram_id, session, session_end_time
-                        )
+            while True:
+                expired_sessions, session_end_time = (
+                    await SessionService.end_expired_sessions_batch(
+                        after_id=last_session_id, limit=batch_size, partition=partition
+                    )
+                )
+                if not expired_sessions:
+                    break
 
-                        logger.info(
-                            f"✅ Session {session.id} ended and user {user.telegram_id} notified"
-                        )
+                await self._notify_expired_sessions(expired_sessions, session_end_time)
 
-                except Exception as e:
-                    logger.error(f"❌ Error handling session {session.id}: {e}")
-                    continue
+                total_expired += len(expired_sessions)
+                last_session_id = expired_sessions[-1].id
+                if len(expired_sessions) < batch_size:
+                    break
 
         except Exception as e:
-            logger.error(f"❌ Error checking expired sessions: {e}")
+            logger.error("❌ Error checking expired sessions: %s", e)
+
+        SESSION_SWEEP_DURATION.observe(time.perf_counter() - sweep_started_at)
+        if total_expired:
+            logger.info("🔍 Ended %s expired sessions", total_expired)
+
+    async def _notify_expired_sessions(self, expired_sessions, session_end_time) -> None:
+        """
+        Send timeout notifications for sessions that were just ended.
+
+        Args:
+            expired_sessions: Rows with id, started_at and telegram_id
+            session_end_time: End time written to the sessions
+        """
+        for expired_session in expired_sessions:
+            await self.send_session_timeout_message(
+                expired_session.telegram_id, expired_session, session_end_time
+            )
+            logger.rate_limited(
+                logging.INFO,
+                "session_ended",
+                1.0,
+                "✅ Session %s ended and user %s notified",
+                expired_session.id,
+                expired_session.telegram_id,
+            )
 
     async def send_session_timeout_message(
         self,
@@ -130,12 +265,20 @@ To start a new session, click the button below or use /start command.
                 ]
             )
 
-            await self.bot.send_message(
-                chat_id=telegram_id, text=message_text, reply_markup=keyboard
-            )
+            if self.outbound is not None:
+                await self.outbound.send_message(
+                    telegram_id,
+                    message_text,
+                    priority=Priority.BACKGROUND,
+                    reply_markup=keyboard,
+                )
+            else:
+                await self.bot.send_message(
+                    chat_id=telegram_id, text=message_text, reply_markup=keyboard
+                )
 
         except Exception as e:
-            logger.error(f"❌ Error sending timeout message to user {telegram_id}: {e}")
+            logger.error("❌ Error sending timeout message to user %s: %s", telegram_id, e)
 
     async def check_user_session_timeout(self, telegram_id: int) -> bool:
         """
@@ -154,14 +297,12 @@ To start a new session, click the button below or use /start command.
                 return False
 
             # Get active session
-            active_session = await SessionService.get_active_session(user.id)
+            active_session = await SessionService.get_active_session_info(user.id)
             if not active_session:
                 return False
 
             # Check if session is expired
-            is_expired = await SessionService.is_session_expired(active_session.id)
-
-            if is_expired:
+            if active_session.is_expired():
                 # End the session and notify user
                 session_end_time = await SessionService.end_session(active_session.id)
                 if session_end_time:
@@ -172,6 +313,6 @@ To start a new session, click the button below or use /start command.
 
         except Exception as e:
             logger.error(
-                f"❌ Error checking session timeout for user {telegram_id}: {e}"
+                "❌ Error checking session timeout for user %s: %s", telegram_id, e
             )
             return False
@@ -0,0 +1,224 @@
+"""
+Delivery of AI assistant replies, streamed into one message as they are generated.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from core.config import config
+from core.logging_config import get_lazy_logger
+from core.metrics import AI_REPLY_EDITS, AI_REPLY_LATENCY
+
+# Get bot logger
+logger = get_lazy_logger("bot")
+
+# Longest text Telegram accepts in one message
+MAX_MESSAGE_LENGTH = 4096
+
+PLACEHOLDER = "💭 Thinking..."
+EMPTY_REPLY = "🤔 I don't have an answer to that. Could you rephrase it?"
+FAILED_REPLY = "❌ Sorry, something went wrong while answering. Please try again."
+
+# Attempts of the final edit when Telegram asks to retry later
+_FINAL_EDIT_ATTEMPTS = 3
+
+
+def split_message(text: str) -> List[str]:
+    """Split text into chunks that fit in one Telegram message, preferring line breaks."""
+    chunks = []
+    while len(text) > MAX_MESSAGE_LENGTH:
+        cut = text.rfind("\n", 0, MAX_MESSAGE_LENGTH)
+        if cut <= 0:
+            cut = MAX_MESSAGE_LENGTH
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    chunks.append(text)
+    return chunks
+
+
+class AIReply:
+    """Delivered reply with its message and timings in seconds from the user's message."""
+
+    __slots__ = ("text", "message", "first_token", "first_text", "total", "edits")
+
+    def __init__(self):
+        self.text = ""
+        self.message: Optional[types.Message] = None
+        self.first_token: Optional[float] = None
+        self.first_text: Optional[float] = None
+        self.total: Optional[float] = None
+        self.edits = 0
+
+
+class ReplyStream:
+    """
+    Shows a model's reply to a user's message as it is generated.
+
+    A placeholder is sent right away and edited with the text so far as
+    tokens arrive. Edits are coalesced: at most one is in flight and they
+    are at least AI_STREAM_EDIT_INTERVAL seconds apart, so whatever arrived
+    in between is shown by the next edit and a fast model never exceeds
+    Telegram's edit rate. A 429 response pushes the next edit back by its
+    retry_after. The complete text is always written by a final edit, with
+    any overflow past Telegram's length limit sent as extra messages.
+
+    With streaming off the reply is collected and sent once complete.
+    """
+
+    def __init__(
+        self,
+        message: types.Message,
+        streaming: bool = None,
+        edit_interval: float = None,
+        started_at: float = None,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            message (types.Message): User's message being answered
+            streaming (bool): Edit a placeholder as tokens arrive, defaults
+                to AI_STREAMING
+            edit_interval (float): Seconds between edits, defaults to
+                AI_STREAM_EDIT_INTERVAL
+            started_at (float): time.perf_counter() when the user's message
+                was received, defaults to now
+        """
+        self.message = message
+        self.streaming = config.AI_STREAMING if streaming is None else streaming
+        self.edit_interval = edit_interval or config.AI_STREAM_EDIT_INTERVAL
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.reply = AIReply()
+        self._parts: List[str] = []
+        self._shown = PLACEHOLDER
+        self._next_edit_at = 0.0
+        self._edit_task: Optional[asyncio.Task] = None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    async def run(self, tokens: AsyncIterator[str]) -> AIReply:
+        """
+        Deliver a reply.
+
+        Args:
+            tokens (AsyncIterator[str]): Pieces of the reply text
+
+        Returns:
+            AIReply: The delivered reply
+
+        Raises:
+            Exception: Errors of the model; call fail() to tell the user
+        """
+        if self.streaming:
+            self.reply.message = await self.message.answer(PLACEHOLDER)
+            # The placeholder counts against the chat's rate limit too
+            self._next_edit_at = time.monotonic() + self.edit_interval
+
+        try:
+            async for token in tokens:
+                if self.reply.first_token is None:
+                    self.reply.first_token = self._elapsed()
+                self._parts.append(token)
+                if self.streaming:
+                    self._maybe_edit()
+        except BaseException:
+            if self._edit_task is not None:
+                self._edit_task.cancel()
+            raise
+
+        if self._edit_task is not None:
+            await self._edit_task
+
+        text = "".join(self._parts).strip() or EMPTY_REPLY
+        chunks = split_message(text)
+        if self.streaming:
+            await self._final_edit(chunks[0])
+        else:
+            self.reply.message = await self.message.answer(chunks[0])
+        for chunk in chunks[1:]:
+            await self.message.answer(chunk)
+
+        self.reply.text = text
+        self.reply.total = self._elapsed()
+        if self.reply.first_text is None:
+            self.reply.first_text = self.reply.total
+        self._observe()
+        return self.reply
+
+    async def fail(self, text: str = FAILED_REPLY) -> None:
+        """Replace the placeholder, or answer when there is none, with an error message."""
+        try:
+            if self.reply.message is not None:
+                await self.reply.message.edit_text(text)
+            else:
+                await self.message.answer(text)
+        except Exception as e:
+            logger.error("❌ Error reporting a failed reply to chat %s: %s", self.message.chat.id, e)
+
+    def _maybe_edit(self) -> None:
+        """Start an edit with the text so far if none is in flight and the interval has passed."""
+        if self._edit_task is not None and not self._edit_task.done():
+            return
+        now = time.monotonic()
+        if now < self._next_edit_at:
+            return
+
+        self._next_edit_at = now + self.edit_interval
+        text = "".join(self._parts)[:MAX_MESSAGE_LENGTH].strip()
+        if not text or text == self._shown:
+            return
+        self._edit_task = asyncio.create_task(self._edit(text))
+
+    async def _edit(self, text: str) -> bool:
+        """
+        Show text in the placeholder.
+
+        Returns:
+            bool: False if Telegram asked to retry later
+        """
+        try:
+            await self.reply.message.edit_text(text)
+        except TelegramRetryAfter as e:
+            AI_REPLY_EDITS.labels("retried").inc()
+            self._next_edit_at = max(self._next_edit_at, time.monotonic() + e.retry_after)
+            return False
+        except TelegramBadRequest as e:
+            # Raised for text equal to what is shown, which is harmless
+            if "message is not modified" not in str(e):
+                AI_REPLY_EDITS.labels("failed").inc()
+                logger.warning("⚠️ Edit of streamed reply in chat %s failed: %s", self.message.chat.id, e)
+            return True
+        except Exception as e:
+            # A later edit shows the text anyway
+            AI_REPLY_EDITS.labels("failed").inc()
+            logger.warning("⚠️ Edit of streamed reply in chat %s failed: %s", self.message.chat.id, e)
+            return True
+
+        AI_REPLY_EDITS.labels("sent").inc()
+        self._shown = text
+        self.reply.edits += 1
+        if self.reply.first_text is None:
+            self.reply.first_text = self._elapsed()
+        return True
+
+    async def _final_edit(self, text: str) -> None:
+        """Show the complete text, waiting out the edit interval and flood control."""
+        for _ in range(_FINAL_EDIT_ATTEMPTS):
+            if text == self._shown:
+                return
+            delay = self._next_edit_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if await self._edit(text):
+                return
+        logger.error("❌ Gave up on the final edit of a streamed reply in chat %s", self.message.chat.id)
+
+    def _observe(self) -> None:
+        AI_REPLY_LATENCY.labels("first_token").observe(self.reply.first_token or self.reply.total)
+        AI_REPLY_LATENCY.labels("first_text").observe(self.reply.first_text)
+        AI_REPLY_LATENCY.labels("total").observe(self.reply.total)
@@ -0,0 +1,176 @@
+"""
+Webhook server that receives Telegram updates over HTTPS callbacks.
+"""
+
+import asyncio
+import hmac
+import signal
+from typing import Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get bot logger
+logger = get_lazy_logger("bot")
+
+# Header Telegram sends the configured secret token in
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    aiohttp server that feeds webhook updates to the dispatcher.
+
+    Each request is validated and answered with 200 straight away; the
+    update is processed in a background task so Telegram never waits on a
+    handler. At most max_concurrency updates are handled at once, and when
+    queue_size updates are already waiting new requests get 429 so Telegram
+    retries them later instead of the backlog growing without bound.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        host: str = None,
+        port: int = None,
+        path: str = None,
+        secret_token: str = None,
+        max_concurrency: int = None,
+        queue_size: int = None,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            bot (Bot): Aiogram bot instance updates are fed with
+            dp (Dispatcher): Dispatcher that handles the updates
+            host (str): Interface to bind, defaults to WEBHOOK_HOST
+            port (int): Port to bind, defaults to WEBHOOK_PORT
+            path (str): Request path of the webhook, defaults to WEBHOOK_PATH
+            secret_token (str): Expected secret token, defaults to WEBHOOK_SECRET
+            max_concurrency (int): Updates handled at once
+            queue_size (int): Accepted updates waiting for a handler slot
+        """
+        self.bot = bot
+        self.dp = dp
+        self.host = host or config.WEBHOOK_HOST
+        self.port = port if port is not None else config.WEBHOOK_PORT
+        self.path = path or config.WEBHOOK_PATH
+        self.secret_token = secret_token or config.WEBHOOK_SECRET
+        self.max_concurrency = max_concurrency or config.WEBHOOK_CONCURRENCY
+        self.queue_size = queue_size or config.WEBHOOK_QUEUE_SIZE
+
+        self._runner: Optional[web.AppRunner] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopped: Optional[asyncio.Event] = None
+        self.rejected_count = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of accepted updates that have not finished processing."""
+        return len(self._tasks)
+
+    async def start(self, set_webhook: bool = True) -> None:
+        """
+        Start listening and register the webhook with Telegram.
+
+        Args:
+            set_webhook (bool): Call setWebhook with WEBHOOK_URL and the path
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._stopped = asyncio.Event()
+
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:
+            self.port = self._runner.addresses[0][1]
+        logger.info("🌐 Webhook server listening on %s:%s%s", self.host, self.port, self.path)
+
+        if set_webhook:
+            await self.bot.set_webhook(
+                url=config.WEBHOOK_URL.rstrip("/") + self.path,
+                secret_token=self.secret_token,
+                allowed_updates=self.dp.resolve_used_update_types(),
+                max_connections=min(self.max_concurrency, 100),
+            )
+            logger.info("✅ Webhook registered")
+
+    async def serve_forever(self) -> None:
+        """Wait until stop is requested by SIGINT/SIGTERM or request_stop()."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.request_stop)
+            except NotImplementedError:
+                # Signal handlers are not supported on Windows event loops
+                pass
+        await self._stopped.wait()
+
+    def request_stop(self) -> None:
+        """Make serve_forever return."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting requests and finish the updates already accepted.
+
+        Args:
+            timeout (float): Seconds to wait for accepted updates
+        """
+        if self._runner is None:
+            return
+
+        self.request_stop()
+        await self._runner.cleanup()
+        self._runner = None
+
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            if pending:
+                logger.warning("⚠️ Dropping %s unfinished webhook updates", len(pending))
+                for task in pending:
+                    task.cancel()
+        logger.info("🛑 Webhook server stopped")
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Validate a webhook request and schedule its update."""
+        if not hmac.compare_digest(
+            request.headers.get(SECRET_TOKEN_HEADER, ""), self.secret_token
+        ):
+            logger.warning("🚫 Webhook request with invalid secret token from %s", request.remote)
+            return web.Response(status=401)
+
+        if len(self._tasks) >= self.max_concurrency + self.queue_size:
+            self.rejected_count += 1
+            return web.Response(status=429)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError) as e:
+            logger.error("❌ Invalid webhook update: %s", e)
+            return web.Response(status=400)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(status=200)
+
+    async def _process(self, update: Update) -> None:
+        """Feed an update to the dispatcher once a handler slot is free."""
+        async with self._semaphore:
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error("❌ Error processing update %s: %s", update.update_id, e)
@@ -0,0 +1,55 @@
+"""
+Process pools for CPU-heavy work that must not run on the event loop.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class WorkerPool:
+    """
+    Lazily started pool of worker processes.
+
+    Workers are spawned rather than forked so they do not inherit the
+    event loop, open connections or logging threads of the bot process.
+    A spawned worker imports the entry script again as __mp_main__, so
+    the script must only set up logging, the bot and its services under
+    its __main__ guard. Functions run in workers must be picklable
+    module-level functions; keep their modules free of heavy imports so
+    workers start quickly.
+    """
+
+    def __init__(self, workers: int):
+        """
+        Initialize the pool; processes start on the first submitted call.
+
+        Args:
+            workers (int): Maximum number of worker processes
+        """
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, function: Callable, *args: Any) -> Any:
+        """
+        Run a function in a worker process.
+
+        Args:
+            function (Callable): Picklable module-level function
+            *args (Any): Picklable arguments
+
+        Returns:
+            Any: Return value of the function
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, waiting for running calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -46,4 +46,72 @@ CREATE TABLE messages (
     INDEX idx_bot_telegram_message_id (bot_telegram_message_id),
     INDEX idx_is_processed (is_processed),
     INDEX idx_user_sent_at (user_sent_at)
-);
\ No newline at end of file
+);
+
+
+CREATE TABLE leases (
+    name VARCHAR(64) PRIMARY KEY,
+    holder VARCHAR(255) NOT NULL,
+    expires_at TIMESTAMP NOT NULL
+);
+
+
+CREATE TABLE transactions (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    amount_minor BIGINT NOT NULL,
+    currency CHAR(3) NOT NULL,
+    category VARCHAR(64) NOT NULL,
+    description VARCHAR(255),
+    occurred_at DATETIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_user_occurred_at (user_id, occurred_at)
+);
+
+
+CREATE TABLE monthly_rollups (
+    user_id INT NOT NULL,
+    month DATE NOT NULL,
+    currency CHAR(3) NOT NULL,
+    category VARCHAR(64) NOT NULL,
+    income_minor BIGINT NOT NULL DEFAULT 0,
+    expense_minor BIGINT NOT NULL DEFAULT 0,
+    transaction_count INT NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (user_id, month, currency, category),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+
+CREATE TABLE savings_goals (
+    user_id INT PRIMARY KEY,
+    target_minor BIGINT NOT NULL,
+    saved_minor BIGINT NOT NULL DEFAULT 0,
+    saved_at DATETIME NOT NULL,
+    currency CHAR(3) NOT NULL,
+    target_date DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE scheduled_jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    kind VARCHAR(32) NOT NULL,
+    schedule_type VARCHAR(16) NOT NULL,
+    schedule VARCHAR(64),
+    payload JSON,
+    catch_up BOOLEAN NOT NULL DEFAULT FALSE,
+    next_run_at DATETIME,
+    last_run_at DATETIME,
+    run_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_next_run_at (next_run_at, id),
+    INDEX idx_user_kind (user_id, kind)
+);
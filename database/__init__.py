@@ -7,6 +7,10 @@ from .database import (
     Base,
     db_manager,
     get_db_session,
+    unit_of_work,
+    commit_session,
+    commit_unit_of_work,
+    after_commit,
     init_database,
     close_database,
     test_database_connection
@@ -15,13 +19,23 @@ from .database import (
 from .models import (
     User,
     Session,
-    Message
+    Message,
+    Lease,
+    Transaction,
+    MonthlyRollup,
+    SavingsGoal,
+    ScheduledJob
 )
 
 from .services import (
     UserService,
     SessionService,
-    MessageService
+    MessageService,
+    LeaseService,
+    TransactionService,
+    RollupService,
+    GoalService,
+    JobService
 )
 
 __all__ = [
@@ -29,6 +43,10 @@ __all__ = [
     'Base',
     'db_manager',
     'get_db_session',
+    'unit_of_work',
+    'commit_session',
+    'commit_unit_of_work',
+    'after_commit',
     'init_database',
     'close_database',
     'test_database_connection',
@@ -37,9 +55,19 @@ __all__ = [
     'User',
     'Session',
     'Message',
+    'Lease',
+    'Transaction',
+    'MonthlyRollup',
+    'SavingsGoal',
+    'ScheduledJob',
     
     # Services
     'UserService',
     'SessionService',
-    'MessageService'
+    'MessageService',
+    'LeaseService',
+    'TransactionService',
+    'RollupService',
+    'GoalService',
+    'JobService'
 ]
@@ -0,0 +1,90 @@
+"""
+Archive old messages now, or restore the archived messages of a session.
+
+The bot archives in the background every ARCHIVE_INTERVAL seconds; run
+this to work off a backlog with other limits or to put a session's
+messages back into the messages table.
+
+Usage:
+    python -m database.archive_messages [--after-days N] [--max-rows R]
+    python -m database.archive_messages --restore SESSION_ID
+"""
+
+import argparse
+import asyncio
+from typing import Dict
+
+from core.archiver import MessageArchiver
+from core.config import config
+from core.logging_config import setup_logging, shutdown_logging, get_logger
+from database import init_database, close_database
+
+
+async def archive(after_days: int, max_rows: int = None) -> Dict[str, int]:
+    """
+    Connect to the database and run one archival pass.
+
+    Args:
+        after_days (int): Days after a session ended before its messages are archived
+        max_rows (int): Rows archived at most, defaults to ARCHIVE_MAX_ROWS
+
+    Returns:
+        dict: Totals of the pass
+    """
+    await init_database()
+    try:
+        return await MessageArchiver(after_days=after_days, max_rows=max_rows).archive_old_messages()
+    finally:
+        # Let sessions closed by generator finalizers return to the pool first
+        await asyncio.sleep(0)
+        await close_database()
+
+
+async def restore(session_id: int) -> int:
+    """
+    Connect to the database and restore one session's messages.
+
+    Args:
+        session_id (int): ID of the session
+
+    Returns:
+        int: Number of rows inserted
+    """
+    await init_database()
+    try:
+        return await MessageArchiver().restore_session(session_id)
+    finally:
+        await asyncio.sleep(0)
+        await close_database()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--after-days", type=int, default=config.ARCHIVE_AFTER_DAYS,
+        help="archive sessions ended more than this many days ago",
+    )
+    parser.add_argument("--max-rows", type=int, help="rows archived at most")
+    parser.add_argument("--restore", type=int, metavar="SESSION_ID", help="restore a session's messages")
+    args = parser.parse_args()
+
+    setup_logging()
+    logger = get_logger("database")
+    try:
+        if args.restore is not None:
+            restored = asyncio.run(restore(args.restore))
+            logger.info("✅ Restored %s messages of session %s", restored, args.restore)
+        else:
+            totals = asyncio.run(archive(args.after_days, args.max_rows))
+            logger.info(
+                "✅ Archived %s messages of %s sessions, deleted %s rows",
+                totals["rows"],
+                totals["sessions"],
+                totals["deleted"],
+            )
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 import asyncio
-from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, AsyncIterator, Callable, Optional
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import MetaData, text
 
 from core.config import config
-from core.logging_config import get_logger
+from core.logging_config import get_lazy_logger
+from core.metrics import instrument_engine
 
 # Get database logger
-logger = get_logger("database")
+logger = get_lazy_logger("database")
+
+# Session shared by every service call inside the current unit of work
+_current_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "current_db_session", default=None
+)
 
 
 class Base(DeclarativeBase):
@@ -41,6 +49,7 @@ class DatabaseManager:
                 pool_size=10,
                 max_overflow=20,
             )
+            instrument_engine(self.engine)
 
             # Create session factory
             self.session_factory = async_sessionmaker(
@@ -51,7 +60,7 @@ class DatabaseManager:
             logger.info("✅ Database connection initialized successfully")
 
         except Exception as e:
-            logger.error(f"❌ Failed to initialize database connection: {e}")
+            logger.error("❌ Failed to initialize database connection: %s", e)
             raise
 
     async def close(self) -> None:
@@ -62,7 +71,17 @@ class DatabaseManager:
             logger.info("🔒 Database connection closed")
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Get a database session."""
+        """
+        Get a database session.
+
+        Inside a unit of work the shared session is yielded; otherwise a
+        dedicated session is opened for the caller.
+        """
+        current_session = _current_session.get()
+        if current_session is not None:
+            yield current_session
+            return
+
         if not self._initialized:
             await self.initialize()
 
@@ -71,11 +90,40 @@ class DatabaseManager:
                 yield session
             except Exception as e:
                 await session.rollback()
-                logger.error(f"❌ Database session error: {e}")
+                logger.error("❌ Database session error: %s", e)
                 raise
             finally:
                 await session.close()
 
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open a session shared by all service calls made inside the block.
+
+        The work is committed once when the block exits and rolled back if it
+        raises. Nested units of work join the outer one.
+        """
+        current_session = _current_session.get()
+        if current_session is not None:
+            yield current_session
+            return
+
+        if not self._initialized:
+            await self.initialize()
+
+        async with self.session_factory() as session:
+            token = _current_session.set(session)
+            try:
+                yield session
+                await session.commit()
+                _run_after_commit(session)
+            except Exception as e:
+                await session.rollback()
+                logger.error("❌ Unit of work rolled back: %s", e)
+                raise
+            finally:
+                _current_session.reset(token)
+
     async def test_connection(self) -> bool:
         """Test the database connection."""
         try:
@@ -84,7 +132,7 @@ class DatabaseManager:
                 logger.info("✅ Database connection test successful")
                 return True
         except Exception as e:
-            logger.error(f"❌ Database connection test failed: {e}")
+            logger.error("❌ Database connection test failed: %s", e)
             return False
 
 
@@ -98,6 +146,64 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def unit_of_work():
+    """Open a unit of work shared by all service calls inside the block."""
+    return db_manager.unit_of_work()
+
+
+async def commit_session(session: AsyncSession) -> None:
+    """
+    Commit the session, or only flush it when it belongs to a unit of work.
+
+    Args:
+        session (AsyncSession): Session obtained from get_db_session()
+    """
+    if session is _current_session.get():
+        await session.flush()
+    else:
+        await session.commit()
+
+
+async def commit_unit_of_work(session: AsyncSession) -> None:
+    """
+    Commit the work done so far and run its deferred after-commit callbacks.
+
+    Handlers call this before slow Telegram or model calls so the pooled
+    connection is released and the in-memory state matching the committed
+    rows is updated even if the rest of the unit of work rolls back. The
+    unit of work stays open; later writes are committed when it exits.
+
+    Args:
+        session (AsyncSession): Session of the current unit of work
+    """
+    await session.commit()
+    _run_after_commit(session)
+
+
+def _run_after_commit(session: AsyncSession) -> None:
+    """Run and forget the callbacks deferred until the session's commit."""
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's changes are durable.
+
+    Inside a unit of work the callback is deferred until the final commit and
+    dropped on rollback; otherwise the caller has already committed, so it
+    runs immediately.
+
+    Args:
+        session (AsyncSession): Session obtained from get_db_session()
+        callback (Callable[[], None]): Function to call after commit
+    """
+    if session is _current_session.get():
+        session.info.setdefault("after_commit", []).append(callback)
+    else:
+        callback()
+
+
 async def init_database() -> None:
     """Initialize the database connection."""
     await db_manager.initialize()
@@ -6,9 +6,19 @@ Contains all SQLAlchemy models for the application.
 from .user import User
 from .session import Session
 from .message import Message
+from .lease import Lease
+from .transaction import Transaction
+from .monthly_rollup import MonthlyRollup
+from .savings_goal import SavingsGoal
+from .scheduled_job import ScheduledJob
 
 __all__ = [
     'User',
     'Session',
-    'Message'
+    'Message',
+    'Lease',
+    'Transaction',
+    'MonthlyRollup',
+    'SavingsGoal',
+    'ScheduledJob'
 ]
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+
+from ..database import Base
+
+class Lease(Base):
+    """Lease model for time-limited ownership of a named role across bot instances."""
+    
+    __tablename__ = "leases"
+    
+    name = Column(String(64), primary_key=True)  # Role the lease grants, e.g. "message_archiver"
+    holder = Column(String(255), nullable=False)  # Instance ID of the current holder
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Holder must renew before this
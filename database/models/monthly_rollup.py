@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Date, ForeignKey
+
+from ..database import Base
+
+class MonthlyRollup(Base):
+    """Per-user, per-month, per-category ledger totals maintained alongside transactions."""
+    
+    __tablename__ = "monthly_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    currency = Column(String(3), primary_key=True)
+    category = Column(String(64), primary_key=True)
+    income_minor = Column(BigInteger, nullable=False, default=0)  # Sum of positive amounts
+    expense_minor = Column(BigInteger, nullable=False, default=0)  # Sum of negative amounts, as a positive number
+    transaction_count = Column(Integer, nullable=False, default=0)
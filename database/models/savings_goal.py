@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+class SavingsGoal(Base):
+    """Savings goal model, one active goal per user."""
+    
+    __tablename__ = "savings_goals"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    target_minor = Column(BigInteger, nullable=False)  # Amount to reach, in minor units
+    saved_minor = Column(BigInteger, nullable=False, default=0)  # Savings when the goal was set
+    saved_at = Column(DateTime(timezone=True), nullable=False)  # When saved_minor was recorded
+    currency = Column(String(3), nullable=False)  # ISO 4217 code
+    target_date = Column(Date, nullable=False)  # Date the target should be reached by
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
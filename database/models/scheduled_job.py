@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, JSON, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+class ScheduledJob(Base):
+    """Scheduled job model for reminders and recurring transactions of a user."""
+    
+    __tablename__ = "scheduled_jobs"
+    __table_args__ = (
+        # Serves the scheduler's keyset scans of upcoming runs
+        Index("idx_next_run_at", "next_run_at", "id"),
+        Index("idx_user_kind", "user_id", "kind"),
+    )
+    
+    # SQLite only auto-increments INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(32), nullable=False)  # Handler that runs the job, e.g. "reminder"
+    schedule_type = Column(String(16), nullable=False)  # "once", "interval" or "cron"
+    schedule = Column(String(64), nullable=True)  # Interval seconds or cron expression
+    payload = Column(JSON, nullable=True)  # Handler arguments
+    catch_up = Column(Boolean, nullable=False, default=False)  # Fire every missed run, not just one
+    next_run_at = Column(DateTime(timezone=True), nullable=True)  # NULL once finished or cancelled
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    run_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+class Transaction(Base):
+    """Transaction model for the income/expense ledger of a user."""
+    
+    __tablename__ = "transactions"
+    __table_args__ = (
+        # Serves every per-user date range scan
+        Index("idx_user_occurred_at", "user_id", "occurred_at"),
+    )
+    
+    # SQLite only auto-increments INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)  # Signed minor units: income > 0, expense < 0
+    currency = Column(String(3), nullable=False)  # ISO 4217 code
+    category = Column(String(64), nullable=False)
+    description = Column(String(255), nullable=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User", back_populates="transactions")
@@ -19,3 +19,4 @@ class User(Base):
     
     # Relationships
     sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
+    transactions = relationship("Transaction", back_populates="user", passive_deletes=True)
@@ -0,0 +1,53 @@
+"""
+Backfill or rebuild the monthly rollups from the transaction ledger.
+
+Run once after upgrading to a version with rollups, or whenever they are
+suspected to have drifted from the ledger.
+
+Usage:
+    python -m database.rebuild_rollups [--user-id ID]
+"""
+
+import argparse
+import asyncio
+
+from core.logging_config import setup_logging, shutdown_logging, get_logger
+from database import init_database, close_database
+from database.services.rollup_service import RollupService
+
+
+async def rebuild(user_id: int = None) -> int:
+    """
+    Connect to the database and rebuild the rollups.
+
+    Args:
+        user_id (int): Database ID of the user, or None for all users
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    await init_database()
+    try:
+        return await RollupService.rebuild(user_id)
+    finally:
+        # Let sessions closed by generator finalizers return to the pool first
+        await asyncio.sleep(0)
+        await close_database()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="rebuild a single user (database ID)")
+    args = parser.parse_args()
+
+    setup_logging()
+    logger = get_logger("database")
+    try:
+        written = asyncio.run(rebuild(args.user_id))
+        logger.info("✅ Monthly rollups rebuilt: %s rows", written)
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,21 @@ Contains service classes for database operations.
 from .user_service import UserService
 from .session_service import SessionService
 from .message_service import MessageService
+from .lease_service import LeaseService
+from .rollup_service import RollupService
+from .transaction_service import TransactionService
+from .goal_service import GoalService
+from .job_service import JobService
+from .archive_service import ArchiveService
 
 __all__ = [
     'UserService',
     'SessionService',
-    'MessageService'
+    'MessageService',
+    'LeaseService',
+    'TransactionService',
+    'RollupService',
+    'GoalService',
+    'JobService',
+    'ArchiveService'
 ]
@@ -0,0 +1,131 @@
+"""
+Archive service for moving old messages between the messages table and cold storage.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, insert, select
+
+from ..database import get_db_session, commit_session
+from ..models import Message, Session
+from core.logging_config import get_lazy_logger
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+# Columns of a message row, in table order
+MESSAGE_COLUMNS = tuple(column.name for column in Message.__table__.columns)
+
+
+class ArchiveService:
+    """Service for archiving and restoring message rows."""
+
+    @staticmethod
+    async def get_archivable_sessions(cutoff: datetime, after_id: int = 0, limit: int = 100) -> List[int]:
+        """
+        Get the next ended sessions that still have messages, in keyset order.
+
+        The scan walks the session_id index of messages and joins each
+        session by primary key, so its cost follows the rows still in the
+        messages table rather than every session ever ended.
+
+        Args:
+            cutoff (datetime): Only sessions ended before this are returned
+            after_id (int): Only sessions with a greater ID are considered
+            limit (int): Maximum number of sessions
+
+        Returns:
+            List[int]: Session IDs in ascending order
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                select(Message.session_id)
+                .distinct()
+                .join(Session, Session.id == Message.session_id)
+                .where(
+                    Message.session_id > after_id,
+                    Session.is_active == False,
+                    Session.ended_at < cutoff,
+                )
+                .order_by(Message.session_id)
+                .limit(limit)
+            )
+            return list(result.scalars())
+
+    @staticmethod
+    async def get_message_rows(session_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get every message of some sessions as column dictionaries.
+
+        Args:
+            session_ids (List[int]): IDs of the sessions
+
+        Returns:
+            List[Dict[str, Any]]: Rows ordered by session and ID
+        """
+        if not session_ids:
+            return []
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(*Message.__table__.columns)
+                .where(Message.session_id.in_(session_ids))
+                .order_by(Message.session_id, Message.id)
+            )
+            return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def delete_messages(message_ids: List[int]) -> int:
+        """
+        Delete messages by ID in one short transaction.
+
+        Args:
+            message_ids (List[int]): IDs of the messages, kept small so row
+                locks are held briefly
+
+        Returns:
+            int: Number of rows deleted
+        """
+        if not message_ids:
+            return 0
+
+        async for session in get_db_session():
+            result = await session.execute(delete(Message).where(Message.id.in_(message_ids)))
+            await commit_session(session)
+            return result.rowcount
+
+    @staticmethod
+    async def restore_messages(rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert archived message rows back with their original IDs.
+
+        Rows whose ID is already in the table are skipped, so restoring a
+        session twice is harmless.
+
+        Args:
+            rows (List[Dict[str, Any]]): Rows read from the archive
+
+        Returns:
+            int: Number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        async for session in get_db_session():
+            existing = set(
+                (
+                    await session.execute(
+                        select(Message.id).where(Message.id.in_([row["id"] for row in rows]))
+                    )
+                ).scalars()
+            )
+            missing = [
+                {column: row.get(column) for column in MESSAGE_COLUMNS}
+                for row in rows
+                if row["id"] not in existing
+            ]
+            if missing:
+                await session.execute(insert(Message), missing)
+                await commit_session(session)
+            return len(missing)
@@ -0,0 +1,77 @@
+"""
+Goal service for database operations on savings goals.
+"""
+
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import select, delete
+
+from ..database import get_db_session, commit_session
+from ..models import SavingsGoal
+from core.config import config
+
+
+class GoalService:
+    """Service for savings goal database operations."""
+
+    @staticmethod
+    async def set_goal(
+        user_id: int,
+        target_minor: int,
+        target_date: date,
+        saved_minor: int = 0,
+        currency: str = None,
+    ) -> SavingsGoal:
+        """
+        Set a user's savings goal, replacing any previous one.
+
+        Args:
+            user_id (int): Owner of the goal
+            target_minor (int): Amount to reach, in minor units
+            target_date (date): Date the target should be reached by
+            saved_minor (int): Savings already put aside, in minor units
+            currency (str): Currency code, defaults to DEFAULT_CURRENCY
+
+        Returns:
+            SavingsGoal: The stored goal
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                select(SavingsGoal).where(SavingsGoal.user_id == user_id)
+            )
+            goal = result.scalar_one_or_none()
+            if goal is None:
+                goal = SavingsGoal(user_id=user_id)
+                session.add(goal)
+
+            goal.target_minor = target_minor
+            goal.target_date = target_date
+            goal.saved_minor = saved_minor
+            goal.saved_at = datetime.now()
+            goal.currency = currency or config.DEFAULT_CURRENCY
+            await commit_session(session)
+            return goal
+
+    @staticmethod
+    async def get_goal(user_id: int) -> Optional[SavingsGoal]:
+        """Get a user's savings goal, or None if they have not set one."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(SavingsGoal).where(SavingsGoal.user_id == user_id)
+            )
+            return result.scalar_one_or_none()
+
+    @staticmethod
+    async def delete_goal(user_id: int) -> bool:
+        """
+        Remove a user's savings goal.
+
+        Returns:
+            bool: True if a goal was removed
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                delete(SavingsGoal).where(SavingsGoal.user_id == user_id)
+            )
+            await commit_session(session)
+            return bool(result.rowcount)
@@ -0,0 +1,212 @@
+"""
+Job service for database operations on scheduled jobs.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, update, bindparam, and_, or_
+from sqlalchemy.engine import Row
+
+from ..database import get_db_session, commit_session, after_commit
+from ..models import ScheduledJob
+from core.job_queue import job_queue
+from core.recurrence import ONCE, next_run, validate_schedule
+
+
+class JobService:
+    """Service for scheduled job database operations."""
+
+    @staticmethod
+    async def schedule_job(
+        user_id: int,
+        kind: str,
+        schedule_type: str,
+        schedule: str = None,
+        payload: Dict[str, Any] = None,
+        catch_up: bool = False,
+        first_run_at: datetime = None,
+    ) -> ScheduledJob:
+        """
+        Schedule a job for a user.
+
+        Args:
+            user_id (int): Owner of the job
+            kind (str): Handler that runs the job
+            schedule_type (str): "once", "interval" or "cron"
+            schedule (str): Interval seconds or cron expression
+            payload (Dict[str, Any]): JSON-serializable handler arguments
+            catch_up (bool): Fire every run missed while the bot was down
+                rather than one for all of them
+            first_run_at (datetime): First run, defaults to the rule's next
+                run from now; required for one-off jobs
+
+        Returns:
+            ScheduledJob: The stored job
+
+        Raises:
+            ValueError: If the rule is invalid
+        """
+        validate_schedule(schedule_type, schedule)
+        if first_run_at is None:
+            if schedule_type == ONCE:
+                raise ValueError("One-off jobs need a first_run_at")
+            first_run_at = next_run(schedule_type, schedule, datetime.now())
+        # Whole seconds survive a round trip through any DATETIME column
+        first_run_at = first_run_at.replace(microsecond=0)
+
+        async for session in get_db_session():
+            job = ScheduledJob(
+                user_id=user_id,
+                kind=kind,
+                schedule_type=schedule_type,
+                schedule=schedule,
+                payload=payload,
+                catch_up=catch_up,
+                next_run_at=first_run_at,
+                run_count=0,
+            )
+            session.add(job)
+            await commit_session(session)
+            after_commit(session, lambda: job_queue.offer(job.id, user_id, first_run_at))
+            return job
+
+    @staticmethod
+    async def cancel_jobs(user_id: int, kind: str = None, job_id: int = None) -> int:
+        """
+        Cancel a user's active jobs, all of them or those of a kind or ID.
+
+        Returns:
+            int: Number of jobs cancelled
+        """
+        criteria = [ScheduledJob.user_id == user_id, ScheduledJob.next_run_at.is_not(None)]
+        if kind is not None:
+            criteria.append(ScheduledJob.kind == kind)
+        if job_id is not None:
+            criteria.append(ScheduledJob.id == job_id)
+
+        async for session in get_db_session():
+            result = await session.execute(select(ScheduledJob.id).where(*criteria))
+            job_ids = result.scalars().all()
+            if not job_ids:
+                return 0
+
+            await session.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id.in_(job_ids))
+                .values(next_run_at=None)
+            )
+            await commit_session(session)
+
+            def discard() -> None:
+                for cancelled_id in job_ids:
+                    job_queue.discard(cancelled_id)
+
+            after_commit(session, discard)
+            return len(job_ids)
+
+    @staticmethod
+    async def get_user_jobs(user_id: int, kind: str = None) -> List[ScheduledJob]:
+        """Get a user's active jobs, optionally of one kind, by next run."""
+        criteria = [ScheduledJob.user_id == user_id, ScheduledJob.next_run_at.is_not(None)]
+        if kind is not None:
+            criteria.append(ScheduledJob.kind == kind)
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(ScheduledJob).where(*criteria).order_by(ScheduledJob.next_run_at)
+            )
+            return result.scalars().all()
+
+    @staticmethod
+    async def get_upcoming_jobs(
+        before: datetime,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 500,
+        partition: Optional[Tuple[int, Sequence[int]]] = None,
+    ) -> List[Row]:
+        """
+        Get the next chunk of runs before a moment in keyset order.
+
+        Args:
+            before (datetime): Only runs earlier than this are returned
+            after (Optional[Tuple[datetime, int]]): (next_run_at, id) of the
+                last row of the previous chunk
+            limit (int): Maximum number of rows
+            partition (Optional[Tuple[int, Sequence[int]]]): (count, indexes)
+                to only return jobs of users with user_id % count in indexes
+
+        Returns:
+            List[Row]: (id, user_id, next_run_at) rows ordered by
+            (next_run_at, id)
+        """
+        criteria = [ScheduledJob.next_run_at.is_not(None), ScheduledJob.next_run_at < before]
+        if after is not None:
+            after_run_at, after_id = after
+            criteria.append(
+                or_(
+                    ScheduledJob.next_run_at > after_run_at,
+                    and_(ScheduledJob.next_run_at == after_run_at, ScheduledJob.id > after_id),
+                )
+            )
+        if partition is not None:
+            count, indexes = partition
+            criteria.append((ScheduledJob.user_id % count).in_(indexes))
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(ScheduledJob.id, ScheduledJob.user_id, ScheduledJob.next_run_at)
+                .where(*criteria)
+                .order_by(ScheduledJob.next_run_at, ScheduledJob.id)
+                .limit(limit)
+            )
+            return result.all()
+
+    @staticmethod
+    async def get_jobs(job_ids: Sequence[int], for_update: bool = False) -> List[ScheduledJob]:
+        """
+        Get jobs by ID in one query.
+
+        Args:
+            job_ids (Sequence[int]): IDs of the jobs
+            for_update (bool): Lock the rows until the unit of work ends, so
+                they cannot be cancelled or rescheduled meanwhile
+
+        Returns:
+            List[ScheduledJob]: The jobs that still exist
+        """
+        statement = select(ScheduledJob).where(ScheduledJob.id.in_(job_ids))
+        if for_update:
+            statement = statement.with_for_update()
+        async for session in get_db_session():
+            result = await session.execute(statement)
+            return result.scalars().all()
+
+    @staticmethod
+    async def advance_jobs(advances: Sequence[Dict[str, Any]]) -> None:
+        """
+        Record fired runs and move jobs to their next run in one statement batch.
+
+        A job is only advanced if its next_run_at is still the run that
+        fired, so a job cancelled meanwhile stays cancelled.
+
+        Args:
+            advances (Sequence[Dict[str, Any]]): Dicts with job_id, due_at
+                (the run that fired), following (next run or None),
+                last_run_at and runs (number of runs fired)
+        """
+        if not advances:
+            return
+
+        table = ScheduledJob.__table__
+        async for session in get_db_session():
+            await session.execute(
+                update(table)
+                .where(table.c.id == bindparam("job_id"), table.c.next_run_at == bindparam("due_at"))
+                .values(
+                    next_run_at=bindparam("following"),
+                    last_run_at=bindparam("last_run_at"),
+                    run_count=table.c.run_count + bindparam("runs"),
+                ),
+                list(advances),
+            )
+            await commit_session(session)
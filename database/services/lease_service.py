@@ -0,0 +1,98 @@
+"""
+Lease service for coordinating roles between bot instances.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Sequence
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.exc import IntegrityError
+
+from ..database import get_db_session, commit_session
+from ..models import Lease
+from core.logging_config import get_lazy_logger
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+
+class LeaseService:
+    """Service for lease-related database operations."""
+
+    @staticmethod
+    async def acquire(name: str, holder: str, ttl: float) -> bool:
+        """
+        Take or renew a lease.
+
+        The lease is granted when it is free, expired or already held by
+        the caller; renewing pushes its expiry ttl seconds ahead.
+
+        Args:
+            name (str): Name of the lease
+            holder (str): Instance ID of the caller
+            ttl (float): Seconds the lease stays valid without renewal
+
+        Returns:
+            bool: True if the caller holds the lease
+        """
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=ttl)
+        async for session in get_db_session():
+            result = await session.execute(
+                update(Lease)
+                .where(
+                    Lease.name == name,
+                    or_(Lease.holder == holder, Lease.expires_at < now),
+                )
+                .values(holder=holder, expires_at=expires_at)
+            )
+            if result.rowcount:
+                await commit_session(session)
+                return True
+
+            # No row matched: either the lease is held or it does not exist yet
+            session.add(Lease(name=name, holder=holder, expires_at=expires_at))
+            try:
+                await commit_session(session)
+            except IntegrityError:
+                await session.rollback()
+                return False
+            logger.info("🔑 Lease %s created by %s", name, holder)
+            return True
+
+    @staticmethod
+    async def release(name: str, holder: str) -> bool:
+        """
+        Give up a lease so another instance can take it straight away.
+
+        Args:
+            name (str): Name of the lease
+            holder (str): Instance ID of the caller
+
+        Returns:
+            bool: True if the caller held the lease
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                delete(Lease).where(Lease.name == name, Lease.holder == holder)
+            )
+            await commit_session(session)
+            return bool(result.rowcount)
+
+    @staticmethod
+    async def get_holders(names: Sequence[str]) -> Dict[str, str]:
+        """
+        Get the holders of the leases among several that have not expired.
+
+        Args:
+            names (Sequence[str]): Names of the leases
+
+        Returns:
+            Dict[str, str]: Instance ID of the holder keyed by lease name
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                select(Lease.name, Lease.holder).where(
+                    Lease.name.in_(names), Lease.expires_at >= datetime.now()
+                )
+            )
+            return {row.name: row.holder for row in result}
@@ -0,0 +1,152 @@
+"""
+Group-commit ingestion queue for message inserts.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from ..database import db_manager
+from ..models import Message
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+
+class MessageIngestionQueue:
+    """
+    Batches message inserts from all users into multi-row INSERTs.
+
+    The first queued row opens a short collection window; every row queued
+    within it (up to the batch size) is written by one INSERT and one
+    commit. On MySQL the ids are the statement's first insert id plus each
+    row's offset: InnoDB allocates consecutive ids to a multi-row INSERT
+    with a known row count in every innodb_autoinc_lock_mode, which
+    assumes the default auto_increment_increment of 1. Databases that
+    return generated ids in row order get one INSERT ... RETURNING. Any
+    other database falls back to one INSERT per row, each reporting its
+    own id, in the same transaction.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = None,
+        max_delay: float = None,
+        queue_size: int = None,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            max_batch (int): Maximum rows per INSERT
+            max_delay (float): Seconds to wait for more rows once one is queued
+            queue_size (int): Queued rows before submitters wait
+        """
+        self.max_batch = max_batch or config.MESSAGE_BATCH_SIZE
+        self.max_delay = (
+            max_delay if max_delay is not None else config.MESSAGE_BATCH_DELAY_MS / 1000
+        )
+        self.queue_size = queue_size or config.MESSAGE_QUEUE_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.batches_written = 0
+        self.rows_written = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the writer task is running."""
+        return self._writer_task is not None
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        if self.is_running:
+            return
+
+        await db_manager.initialize()
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer_task = asyncio.create_task(self._writer())
+        logger.info("✅ Message ingestion queue started")
+
+    async def stop(self) -> None:
+        """Write all queued rows and stop the writer."""
+        if not self.is_running:
+            return
+
+        await self._queue.join()
+        self._writer_task.cancel()
+        await asyncio.gather(self._writer_task, return_exceptions=True)
+        self._writer_task = None
+        logger.info("🛑 Message ingestion queue stopped")
+
+    async def submit(self, values: Dict[str, Any]) -> int:
+        """
+        Queue a message row and wait until it is committed.
+
+        Blocks while the queue is full.
+
+        Args:
+            values (Dict[str, Any]): Column values of the new message
+
+        Returns:
+            int: Generated message ID
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((values, future))
+        return await future
+
+    async def _writer(self) -> None:
+        """Collect queued rows into batches and write them."""
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Insert a batch in one transaction and resolve its futures with the ids."""
+        rows = [values for values, _ in batch]
+        try:
+            # Always a dedicated session, never an enclosing unit of work
+            async with db_manager.session_factory() as session:
+                dialect = session.bind.dialect
+                if dialect.name == "mysql":
+                    result = await session.execute(insert(Message).values(rows))
+                    ids = range(result.lastrowid, result.lastrowid + len(rows))
+                elif dialect.insert_executemany_returning_sort_by_parameter_order:
+                    result = await session.execute(
+                        insert(Message).returning(Message.id, sort_by_parameter_order=True), rows
+                    )
+                    ids = list(result.scalars())
+                else:
+                    ids = []
+                    for values in rows:
+                        result = await session.execute(insert(Message).values(values))
+                        ids.append(result.inserted_primary_key[0])
+                await session.commit()
+        except Exception as e:
+            logger.error("❌ Error writing batch of %s messages: %s", len(rows), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_written += 1
+        self.rows_written += len(rows)
+        for message_id, (_, future) in zip(ids, batch):
+            if not future.done():
+                future.set_result(message_id)
+
+
+# Global message ingestion queue
+message_ingestion = MessageIngestionQueue()
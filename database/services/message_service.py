@@ -3,16 +3,46 @@ Message service for database operations related to messages.
 """
 
 from typing import Optional, List
-from sqlalchemy import select
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
 
-from ..database import get_db_session
+from ..database import get_db_session, commit_session, after_commit
 from ..models import Message
+from .message_ingestion import message_ingestion
+from core.config import config
+from core.conversation import ConversationTurn, conversation_context
+from core.session_registry import session_registry
 
 
 class MessageService:
     """Service for message-related database operations."""
 
+    @staticmethod
+    async def _insert_message(values: dict) -> Message:
+        """
+        Insert a message row.
+
+        Rows of sessions known to be committed go through the group-commit
+        ingestion queue; anything else, such as a session created in the
+        current unit of work, is written with the caller's session. The
+        new turn is added to the session's conversation context once it is
+        committed.
+        """
+        session_id = values["session_id"]
+        if message_ingestion.is_running and session_registry.get_by_id(session_id):
+            message_id = await message_ingestion.submit(values)
+            message = Message(id=message_id, **values)
+            conversation_context.append(session_id, ConversationTurn.from_model(message))
+            return message
+
+        async for session in get_db_session():
+            message = Message(**values)
+            session.add(message)
+            await commit_session(session)
+            turn = ConversationTurn.from_model(message)
+            after_commit(session, lambda: conversation_context.append(session_id, turn))
+            return message
+
     @staticmethod
     async def create_user_message(
         session_id: int,
@@ -20,16 +50,19 @@ class MessageService:
         user_telegram_message_id: int = None,
     ) -> Message:
         """Create a new message record with user content (bot reply will be added later)."""
-        async for session in get_db_session():
-            message = Message(
-                session_id=session_id,
-                user_content=user_content,
-                user_telegram_message_id=user_telegram_message_id,
-            )
-            session.add(message)
-            await session.commit()
-            await session.refresh(message)
-            return message
+        return await MessageService._insert_message(
+            {
+                "session_id": session_id,
+                "user_content": user_content,
+                "user_telegram_message_id": user_telegram_message_id,
+                "user_sent_at": datetime.now(),
+                "bot_content": None,
+                "bot_telegram_message_id": None,
+                "bot_sent_at": None,
+                "is_processed": False,
+                "processing_time_ms": None,
+            }
+        )
 
     @staticmethod
     async def add_bot_reply(
@@ -51,7 +84,12 @@ class MessageService:
                 message.is_processed = True
                 if processing_time_ms is not None:
                     message.processing_time_ms = processing_time_ms
-                await session.commit()
+                await commit_session(session)
+                session_id = message.session_id
+                after_commit(
+                    session,
+                    lambda: conversation_context.set_reply(session_id, message_id, bot_content),
+                )
                 return True
             return False
 
@@ -65,21 +103,20 @@ class MessageService:
         processing_time_ms: int = None,
     ) -> Message:
         """Create a complete message pair (user message + bot reply) in one go."""
-        async for session in get_db_session():
-            message = Message(
-                session_id=session_id,
-                user_content=user_content,
-                user_telegram_message_id=user_telegram_message_id,
-                bot_content=bot_content,
-                bot_telegram_message_id=bot_telegram_message_id,
-                bot_sent_at=datetime.now() if bot_content else None,
-                is_processed=bot_content is not None,
-                processing_time_ms=processing_time_ms,
-            )
-            session.add(message)
-            await session.commit()
-            await session.refresh(message)
-            return message
+        now = datetime.now()
+        return await MessageService._insert_message(
+            {
+                "session_id": session_id,
+                "user_content": user_content,
+                "user_telegram_message_id": user_telegram_message_id,
+                "user_sent_at": now,
+                "bot_content": bot_content,
+                "bot_telegram_message_id": bot_telegram_message_id,
+                "bot_sent_at": now if bot_content else None,
+                "is_processed": bot_content is not None,
+                "processing_time_ms": processing_time_ms,
+            }
+        )
 
     @staticmethod
     async def get_session_messages(session_id: int, limit: int = 50) -> List[Message]:
@@ -93,6 +130,62 @@ class MessageService:
             )
             return result.scalars().all()
 
+    @staticmethod
+    async def get_conversation_context(
+        session_id: int, limit: int = None
+    ) -> List[ConversationTurn]:
+        """
+        Get the latest turns of a session for a prompt, oldest first.
+
+        Active sessions are served from the in-memory conversation context,
+        which reads the session's history only on first access; other
+        sessions read it every time. With several instances another one
+        may have stored turns of the session, so a buffer is only used
+        while its latest turn is still the session's latest message.
+
+        Args:
+            session_id (int): Session of the conversation
+            limit (int): Most turns returned, defaults to CONTEXT_TURNS
+
+        Returns:
+            List[ConversationTurn]: Latest turns, oldest first
+        """
+        limit = min(limit or conversation_context.max_turns, conversation_context.max_turns)
+        turns = conversation_context.get(session_id)
+        if turns is not None and config.INSTANCE_COUNT > 1:
+            latest_id = await MessageService.get_latest_message_id(session_id)
+            if latest_id != (turns[-1].message_id if turns else None):
+                conversation_context.discard(session_id)
+                turns = None
+        if turns is not None:
+            return turns[-limit:]
+
+        is_active = session_registry.get_by_id(session_id) is not None
+        if is_active:
+            conversation_context.begin_load(session_id)
+        try:
+            messages = await MessageService.get_session_messages(
+                session_id, limit=conversation_context.max_turns
+            )
+        except Exception:
+            if is_active:
+                conversation_context.cancel_load(session_id)
+            raise
+
+        turns = [ConversationTurn.from_model(message) for message in reversed(messages)]
+        if is_active:
+            conversation_context.finish_load(session_id, turns)
+        return turns[-limit:]
+
+    @staticmethod
+    async def get_latest_message_id(session_id: int) -> Optional[int]:
+        """Get the ID of a session's latest message, or None if it has none."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(func.max(Message.id)).where(Message.session_id == session_id)
+            )
+            return result.scalar()
+
     @staticmethod
     async def get_message_by_id(message_id: int) -> Optional[Message]:
         """Get message by ID."""
@@ -122,7 +215,7 @@ class MessageService:
             message = result.scalar_one_or_none()
             if message:
                 message.processing_time_ms = processing_time_ms
-                await session.commit()
+                await commit_session(session)
                 return True
             return False
 
@@ -0,0 +1,238 @@
+"""
+Rollup service for the per-month, per-category ledger totals behind reports.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import select, insert, delete, func, case, union
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db_session, commit_session
+from ..models import MonthlyRollup, Transaction
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+# Primary key columns of a rollup row
+_ROLLUP_KEY = ("user_id", "month", "currency", "category")
+
+
+def month_start(moment: datetime) -> date:
+    """Get the first day of the month a moment falls in."""
+    return date(moment.year, moment.month, 1)
+
+
+def shift_month(month: date, months: int) -> date:
+    """Get the first day of the month a number of months before or after another."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_expression(session: AsyncSession, column):
+    """SQL expression truncating a datetime column to the first of its month."""
+    if session.bind.dialect.name == "sqlite":
+        return func.strftime("%Y-%m-01", column)
+    return func.date_format(column, "%Y-%m-01")
+
+
+def _upsert(session: AsyncSession, rows: List[Dict[str, Any]]):
+    """Build an INSERT that adds to the totals of rollup rows that already exist."""
+    if session.bind.dialect.name == "sqlite":
+        stmt = sqlite.insert(MonthlyRollup).values(rows)
+        added = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=list(_ROLLUP_KEY),
+            set_={
+                "income_minor": MonthlyRollup.income_minor + added.income_minor,
+                "expense_minor": MonthlyRollup.expense_minor + added.expense_minor,
+                "transaction_count": MonthlyRollup.transaction_count + added.transaction_count,
+            },
+        )
+
+    stmt = mysql.insert(MonthlyRollup).values(rows)
+    added = stmt.inserted
+    return stmt.on_duplicate_key_update(
+        income_minor=MonthlyRollup.income_minor + added.income_minor,
+        expense_minor=MonthlyRollup.expense_minor + added.expense_minor,
+        transaction_count=MonthlyRollup.transaction_count + added.transaction_count,
+    )
+
+
+class RollupService:
+    """Service for monthly rollup database operations."""
+
+    @staticmethod
+    async def apply(session: AsyncSession, transactions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add new ledger rows to the rollups inside the caller's unit of work.
+
+        Rows are aggregated per rollup key first, so a batch of any size costs
+        one upsert per touched (user, month, currency, category). Callers run
+        this in the same session as the ledger INSERT so both commit or roll
+        back together.
+
+        Args:
+            session (AsyncSession): Session of the ledger write
+            transactions (Iterable[Dict[str, Any]]): Column values with
+                user_id, amount_minor, currency, category and occurred_at
+
+        Returns:
+            int: Number of rollup rows touched
+        """
+        deltas: Dict[Tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for row in transactions:
+            key = (
+                row["user_id"],
+                month_start(row["occurred_at"]),
+                row["currency"],
+                row["category"],
+            )
+            delta = deltas[key]
+            amount_minor = row["amount_minor"]
+            if amount_minor > 0:
+                delta[0] += amount_minor
+            else:
+                delta[1] -= amount_minor
+            delta[2] += 1
+
+        rows = [
+            {
+                **dict(zip(_ROLLUP_KEY, key)),
+                "income_minor": income,
+                "expense_minor": expense,
+                "transaction_count": count,
+            }
+            # Sorted so concurrent writers lock rows in the same order
+            for key, (income, expense, count) in sorted(deltas.items())
+        ]
+        batch_size = config.TRANSACTION_BATCH_SIZE
+        for offset in range(0, len(rows), batch_size):
+            await session.execute(_upsert(session, rows[offset:offset + batch_size]))
+        return len(rows)
+
+    @staticmethod
+    async def rebuild_user(user_id: int) -> int:
+        """
+        Recompute one user's rollups from their ledger in one transaction.
+
+        Args:
+            user_id (int): Database ID of the user
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        async for session in get_db_session():
+            month = _month_expression(session, Transaction.occurred_at)
+            await session.execute(delete(MonthlyRollup).where(MonthlyRollup.user_id == user_id))
+            result = await session.execute(
+                insert(MonthlyRollup).from_select(
+                    [*_ROLLUP_KEY, "income_minor", "expense_minor", "transaction_count"],
+                    select(
+                        Transaction.user_id,
+                        month,
+                        Transaction.currency,
+                        Transaction.category,
+                        func.sum(case((Transaction.amount_minor > 0, Transaction.amount_minor), else_=0)),
+                        func.sum(case((Transaction.amount_minor < 0, -Transaction.amount_minor), else_=0)),
+                        func.count(),
+                    )
+                    .where(Transaction.user_id == user_id)
+                    .group_by(Transaction.user_id, month, Transaction.currency, Transaction.category),
+                )
+            )
+            await commit_session(session)
+            return result.rowcount
+
+    @staticmethod
+    async def rebuild(user_id: int = None) -> int:
+        """
+        Recompute rollups from the ledger, for one user or for everyone.
+
+        Every user is rebuilt in their own short transaction, so a full
+        rebuild never holds locks on the whole ledger at once.
+
+        Args:
+            user_id (int): Database ID of the user, or None for all users
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        if user_id is not None:
+            return await RollupService.rebuild_user(user_id)
+
+        async for session in get_db_session():
+            result = await session.execute(
+                union(
+                    select(Transaction.user_id),
+                    select(MonthlyRollup.user_id),
+                )
+            )
+            user_ids = sorted(result.scalars().all())
+
+        written = 0
+        for index, current_user_id in enumerate(user_ids, 1):
+            written += await RollupService.rebuild_user(current_user_id)
+            if index % 1000 == 0:
+                logger.info("🔁 Rebuilt rollups of %s/%s users", index, len(user_ids))
+        logger.info("✅ Rebuilt %s rollup rows for %s users", written, len(user_ids))
+        return written
+
+    @staticmethod
+    async def get_monthly_rollups(user_id: int, start: date, end: date = None) -> List[Row]:
+        """
+        Get a user's rollup rows for the months in [start, end).
+
+        Args:
+            user_id (int): Database ID of the user
+            start (date): First month included
+            end (date): First month excluded, or None for no upper bound
+
+        Returns:
+            List[Row]: (month, currency, category, income_minor,
+            expense_minor, transaction_count) rows ordered by month
+        """
+        criteria = [MonthlyRollup.user_id == user_id, MonthlyRollup.month >= start]
+        if end is not None:
+            criteria.append(MonthlyRollup.month < end)
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(
+                    MonthlyRollup.month,
+                    MonthlyRollup.currency,
+                    MonthlyRollup.category,
+                    MonthlyRollup.income_minor,
+                    MonthlyRollup.expense_minor,
+                    MonthlyRollup.transaction_count,
+                )
+                .where(*criteria)
+                .order_by(MonthlyRollup.month)
+            )
+            return result.all()
+
+    @staticmethod
+    async def get_ledger_version(user_id: int) -> int:
+        """
+        Get a number that changes whenever a user's ledger does.
+
+        The ledger is append-only, so its transaction count, summed from
+        the rollups in O(months), serves as a version.
+
+        Args:
+            user_id (int): Database ID of the user
+
+        Returns:
+            int: Number of transactions in the user's ledger
+        """
+        async for session in get_db_session():
+            result = await session.execute(
+                select(func.coalesce(func.sum(MonthlyRollup.transaction_count), 0))
+                .where(MonthlyRollup.user_id == user_id)
+            )
+            return int(result.scalar_one())
@@ -2,17 +2,33 @@
 Session service for database operations related to sessions.
 """
 
-from typing import Optional, List
-from sqlalchemy import select
+from typing import Optional, List, Sequence, Tuple, Dict
+from sqlalchemy import select, update, case
+from sqlalchemy.engine import Row
 from datetime import datetime, timedelta
 
-from ..database import get_db_session
-from ..models import Session
+from ..database import get_db_session, commit_session, after_commit
+from ..models import Session, User
 from core.config import config
-from core.logging_config import get_logger
+from core.conversation import conversation_context
+from core.llm_gateway import llm_gateway
+from core.logging_config import get_lazy_logger
+from core.session_registry import ActiveSession, session_registry
 
 # Get database logger
-logger = get_logger("database")
+logger = get_lazy_logger("database")
+
+# Latest uncommitted last_activity per session, written behind in batches;
+# entries stay until the flush writing them has committed
+_pending_activity: Dict[int, datetime] = {}
+
+
+def _latest_activity(session_id: int, last_activity: datetime) -> datetime:
+    """Combine a stored last_activity with any buffered, unflushed one."""
+    pending = _pending_activity.get(session_id)
+    if pending is not None and (last_activity is None or pending > last_activity):
+        return pending
+    return last_activity
 
 
 class SessionService:
@@ -30,8 +46,19 @@ class SessionService:
                 context_data=context_data,
             )
             session.add(session_obj)
-            await session.commit()
+            await commit_session(session)
             await session.refresh(session_obj)
+            active_session = ActiveSession.from_model(session_obj)
+
+            def register_session() -> None:
+                previous = session_registry.get(user_id)
+                if previous is not None:
+                    conversation_context.discard(previous.id)
+                    llm_gateway.cancel_session(previous.id)
+                session_registry.add(active_session)
+                conversation_context.start(active_session.id)
+
+            after_commit(session, register_session)
             return session_obj
 
     @staticmethod
@@ -43,12 +70,57 @@ class SessionService:
                 .where(Session.user_id == user_id, Session.is_active == True)
                 .order_by(Session.last_activity.desc())
             )
-            logger.debug(f"Query result for active session for user {user_id}: {result}")
+            logger.debug(
+                "Query result for active session for user %s: %s", user_id, result
+            )
             return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_active_session_info(user_id: int) -> Optional[ActiveSession]:
+        """
+        Get the active session for a user from the in-memory registry.
+
+        Falls back to the database when the registry has not been loaded,
+        and with several instances also when it misses, since the session
+        may have been started through another instance.
+        """
+        if session_registry.is_loaded:
+            active_session = session_registry.get(user_id)
+            if active_session is not None or config.INSTANCE_COUNT == 1:
+                return active_session
+
+        session_obj = await SessionService.get_active_session(user_id)
+        if not session_obj:
+            return None
+        active_session = ActiveSession.from_model(session_obj)
+        active_session.last_activity = _latest_activity(
+            active_session.id, active_session.last_activity
+        )
+        session_registry.add(active_session)
+        return active_session
+
+    @staticmethod
+    async def load_active_sessions() -> int:
+        """Rebuild the active session registry from the sessions table."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(
+                    Session.id,
+                    Session.user_id,
+                    Session.started_at,
+                    Session.last_activity,
+                ).where(Session.is_active == True)
+            )
+            session_registry.load(result.all())
+            return len(session_registry)
+
     @staticmethod
     async def is_session_expired(session_id: int) -> bool:
         """Check if a session has expired based on SESSION_TIME configuration."""
+        if session_registry.is_loaded:
+            active_session = session_registry.get_by_id(session_id)
+            return active_session is None or active_session.is_expired()
+
         async for session in get_db_session():
             result = await session.execute(
                 select(Session).where(Session.id == session_id)
@@ -61,9 +133,10 @@ class SessionService:
             timeout_minutes = config.get_session_timeout()
             timeout_delta = timedelta(minutes=timeout_minutes)
             current_time = datetime.now()
+            last_activity = _latest_activity(session_id, session_obj.last_activity)
             
             # Check if last activity + timeout is less than current time
-            return (session_obj.last_activity + timeout_delta) < current_time
+            return (last_activity + timeout_delta) < current_time
 
     @staticmethod
     async def get_expired_sessions() -> List[Session]:
@@ -82,35 +155,199 @@ class SessionService:
             )
             return result.scalars().all()
 
+    @staticmethod
+    async def end_expired_sessions_batch(
+        after_id: int = 0,
+        limit: int = 500,
+        partition: Optional[Tuple[int, Sequence[int]]] = None,
+    ) -> Tuple[List[Row], Optional[datetime]]:
+        """
+        End the next chunk of expired sessions in keyset order.
+
+        Args:
+            after_id (int): Only sessions with a greater ID are considered
+            limit (int): Maximum number of sessions to end
+            partition (Optional[Tuple[int, Sequence[int]]]): (count, indexes)
+                to only end sessions of users with user_id % count in indexes
+
+        Returns:
+            Tuple[List[Row], Optional[datetime]]: Ended sessions as
+            (id, user_id, started_at, telegram_id) rows ordered by ID, and
+            the end time written to them
+        """
+        timeout_delta = timedelta(minutes=config.get_session_timeout())
+        cutoff_time = datetime.now() - timeout_delta
+        criteria = [Session.last_activity < cutoff_time, Session.id > after_id]
+        if partition is not None:
+            count, indexes = partition
+            criteria.append((Session.user_id % count).in_(indexes))
+        return await SessionService._end_sessions_where(*criteria, limit=limit)
+
+    @staticmethod
+    async def end_sessions(
+        session_ids: List[int],
+        only_expired: bool = False,
+    ) -> Tuple[List[Row], Optional[datetime]]:
+        """
+        End several sessions at once.
+
+        Args:
+            session_ids (List[int]): IDs of the sessions to end
+            only_expired (bool): Skip sessions whose stored last_activity is
+                still within the timeout, e.g. kept alive by another instance
+
+        Returns:
+            Tuple[List[Row], Optional[datetime]]: Sessions that were still
+            active as (id, user_id, started_at, telegram_id) rows, and the
+            end time written to them
+        """
+        if not session_ids:
+            return [], None
+        criteria = [Session.id.in_(session_ids)]
+        if only_expired:
+            timeout_delta = timedelta(minutes=config.get_session_timeout())
+            criteria.append(Session.last_activity < datetime.now() - timeout_delta)
+        return await SessionService._end_sessions_where(*criteria)
+
+    @staticmethod
+    async def _end_sessions_where(
+        *criteria, limit: Optional[int] = None
+    ) -> Tuple[List[Row], Optional[datetime]]:
+        """Lock the matching active sessions with their user, then end them in one UPDATE."""
+        async for session in get_db_session():
+            query = (
+                select(
+                    Session.id,
+                    Session.user_id,
+                    Session.started_at,
+                    User.telegram_id,
+                )
+                .join(User, User.id == Session.user_id)
+                .where(Session.is_active == True, *criteria)
+                .order_by(Session.id)
+                .with_for_update(of=Session)
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            rows = (await session.execute(query)).all()
+
+            # Activity buffered since the last flush keeps a session alive
+            if _pending_activity:
+                cutoff_time = datetime.now() - timedelta(
+                    minutes=config.get_session_timeout()
+                )
+                rows = [
+                    row
+                    for row in rows
+                    if _pending_activity.get(row.id, cutoff_time) <= cutoff_time
+                ]
+            if not rows:
+                return [], None
+
+            session_ids = [row.id for row in rows]
+            session_end_time = datetime.now()
+            await session.execute(
+                update(Session)
+                .where(Session.id.in_(session_ids))
+                .values(is_active=False, ended_at=session_end_time)
+            )
+            await commit_session(session)
+
+            def forget_sessions() -> None:
+                for session_id in session_ids:
+                    session_registry.remove(session_id)
+                    conversation_context.discard(session_id)
+                    llm_gateway.cancel_session(session_id)
+                    _pending_activity.pop(session_id, None)
+
+            after_commit(session, forget_sessions)
+            return rows, session_end_time
+
     @staticmethod
     async def end_session(session_id: int) -> Optional[datetime]:
         """End a session by setting is_active to False."""
         async for session in get_db_session():
+            session_end_time = datetime.now()
             result = await session.execute(
-                select(Session).where(Session.id == session_id)
+                update(Session)
+                .where(Session.id == session_id, Session.is_active == True)
+                .values(is_active=False, ended_at=session_end_time)
             )
-            session_obj = result.scalar_one_or_none()
-            if session_obj:
-                session_end_time = datetime.now()
-                session_obj.is_active = False
-                session_obj.ended_at = session_end_time
-                await session.commit()
+            await commit_session(session)
+
+            def forget_session() -> None:
+                session_registry.remove(session_id)
+                conversation_context.discard(session_id)
+                llm_gateway.cancel_session(session_id)
+                _pending_activity.pop(session_id, None)
+
+            after_commit(session, forget_session)
+            if result.rowcount:
                 return session_end_time
             return None
 
+    @staticmethod
+    def forget_sessions(session_ids: List[int]) -> None:
+        """
+        Drop sessions from this instance's memory without ending them.
+
+        Used for sessions another instance owns or has kept alive or
+        ended; the next request for them reads the database again.
+
+        Args:
+            session_ids (List[int]): IDs of the sessions
+        """
+        for session_id in session_ids:
+            session_registry.remove(session_id)
+            conversation_context.discard(session_id)
+
     @staticmethod
     async def update_session_activity(session_id: int) -> bool:
-        """Update session last activity timestamp."""
+        """
+        Update session last activity timestamp.
+
+        The timestamp is buffered in memory and written behind by
+        flush_session_activity(); only the latest value per session is kept.
+        """
+        last_activity = datetime.now()
+        _pending_activity[session_id] = last_activity
+        session_registry.touch(session_id, last_activity)
+        if session_registry.is_loaded:
+            return session_registry.get_by_id(session_id) is not None
+        return True
+
+    @staticmethod
+    async def flush_session_activity() -> int:
+        """
+        Write buffered last_activity timestamps with a single UPDATE.
+
+        The buffered values stay visible to the expiry checks until the
+        UPDATE has committed; only then are the ones not superseded by
+        newer activity dropped.
+
+        Returns:
+            int: Number of sessions whose activity was flushed
+        """
+        if not _pending_activity:
+            return 0
+
+        pending = dict(_pending_activity)
         async for session in get_db_session():
-            result = await session.execute(
-                select(Session).where(Session.id == session_id)
+            await session.execute(
+                update(Session)
+                .where(Session.id.in_(pending.keys()), Session.is_active == True)
+                .values(last_activity=case(pending, value=Session.id))
+                .execution_options(synchronize_session=False)
             )
-            session_obj = result.scalar_one_or_none()
-            if session_obj:
-                session_obj.last_activity = datetime.now()
-                await session.commit()
-                return True
-            return False
+            await commit_session(session)
+
+            def drop_flushed() -> None:
+                for session_id, last_activity in pending.items():
+                    if _pending_activity.get(session_id) == last_activity:
+                        del _pending_activity[session_id]
+
+            after_commit(session, drop_flushed)
+            return len(pending)
 
     # @staticmethod
     # async def get_active_session(user_id: int) -> Optional[Session]:
@@ -0,0 +1,284 @@
+"""
+Transaction service for database operations on the income/expense ledger.
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, insert, func, case, or_
+from sqlalchemy.engine import Row
+
+from ..database import get_db_session, commit_session
+from ..models import Transaction
+from .rollup_service import RollupService
+from core.config import config
+from core.logging_config import get_lazy_logger
+
+# Get database logger
+logger = get_lazy_logger("database")
+
+# Columns returned by range scans
+_LEDGER_COLUMNS = (
+    Transaction.id,
+    Transaction.occurred_at,
+    Transaction.amount_minor,
+    Transaction.currency,
+    Transaction.category,
+    Transaction.description,
+)
+
+
+def _range_criteria(user_id: int, start: Optional[datetime], end: Optional[datetime]) -> list:
+    """Build the WHERE criteria of a [start, end) scan of one user's ledger."""
+    criteria = [Transaction.user_id == user_id]
+    if start is not None:
+        criteria.append(Transaction.occurred_at >= start)
+    if end is not None:
+        criteria.append(Transaction.occurred_at < end)
+    return criteria
+
+
+class TransactionService:
+    """Service for transaction-related database operations."""
+
+    @staticmethod
+    async def add_transaction(
+        user_id: int,
+        amount_minor: int,
+        category: str,
+        description: str = None,
+        occurred_at: datetime = None,
+        currency: str = None,
+    ) -> Transaction:
+        """
+        Record a single transaction and add it to the monthly rollups.
+
+        Args:
+            user_id (int): Owner of the transaction
+            amount_minor (int): Signed amount in minor units, negative for expenses
+            category (str): Category name
+            description (str): Optional note
+            occurred_at (datetime): When it happened, defaults to now
+            currency (str): Currency code, defaults to DEFAULT_CURRENCY
+
+        Returns:
+            Transaction: The stored transaction
+        """
+        values = {
+            "user_id": user_id,
+            "amount_minor": amount_minor,
+            "currency": currency or config.DEFAULT_CURRENCY,
+            "category": category,
+            "description": description,
+            "occurred_at": occurred_at or datetime.now(),
+        }
+        async for session in get_db_session():
+            transaction = Transaction(**values)
+            session.add(transaction)
+            await RollupService.apply(session, [values])
+            await commit_session(session)
+            return transaction
+
+    @staticmethod
+    async def add_transactions(rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        Record many transactions in one database transaction.
+
+        Rows are sent as executemany batches of TRANSACTION_BATCH_SIZE, which
+        the driver turns into multi-row INSERTs. The monthly rollups are
+        updated in the same database transaction.
+
+        Args:
+            rows (Sequence[Dict[str, Any]]): Column values with at least
+                user_id, amount_minor, category and occurred_at
+
+        Returns:
+            int: Number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        batch_size = config.TRANSACTION_BATCH_SIZE
+        rows = [
+            {"currency": config.DEFAULT_CURRENCY, "description": None, **row}
+            for row in rows
+        ]
+        async for session in get_db_session():
+            for offset in range(0, len(rows), batch_size):
+                await session.execute(insert(Transaction), rows[offset:offset + batch_size])
+            await RollupService.apply(session, rows)
+            await commit_session(session)
+            logger.debug("💾 Inserted %s transactions", len(rows))
+            return len(rows)
+
+    @staticmethod
+    async def get_transactions(
+        user_id: int,
+        start: datetime = None,
+        end: datetime = None,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Row]:
+        """
+        Get one page of a user's transactions in [start, end), oldest first.
+
+        Pages are keyset-paginated on (occurred_at, id), so every page is a
+        bounded index range scan no matter how deep into the ledger it is.
+
+        Args:
+            user_id (int): Owner of the transactions
+            start (datetime): Inclusive lower bound of occurred_at
+            end (datetime): Exclusive upper bound of occurred_at
+            limit (int): Maximum number of rows
+            after (Optional[Tuple[datetime, int]]): (occurred_at, id) of the
+                last row of the previous page
+
+        Returns:
+            List[Row]: (id, occurred_at, amount_minor, currency, category,
+            description) rows
+        """
+        criteria = _range_criteria(user_id, start, end)
+        if after is not None:
+            after_occurred_at, after_id = after
+            # The leading >= keeps the predicate an index range on (user_id, occurred_at)
+            criteria.append(Transaction.occurred_at >= after_occurred_at)
+            criteria.append(
+                or_(Transaction.occurred_at > after_occurred_at, Transaction.id > after_id)
+            )
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(*_LEDGER_COLUMNS)
+                .where(*criteria)
+                .order_by(Transaction.occurred_at, Transaction.id)
+                .limit(limit)
+            )
+            return result.all()
+
+    @staticmethod
+    async def iter_transactions(
+        user_id: int,
+        start: datetime = None,
+        end: datetime = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """
+        Iterate over all of a user's transactions in [start, end), page by page.
+
+        Args:
+            user_id (int): Owner of the transactions
+            start (datetime): Inclusive lower bound of occurred_at
+            end (datetime): Exclusive upper bound of occurred_at
+            page_size (int): Rows fetched per query
+
+        Yields:
+            Row: Rows as returned by get_transactions
+        """
+        after = None
+        while True:
+            rows = await TransactionService.get_transactions(
+                user_id, start, end, limit=page_size, after=after
+            )
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            after = (rows[-1].occurred_at, rows[-1].id)
+
+    @staticmethod
+    async def get_ledger_columns(
+        user_ids: Sequence[int],
+        start: datetime = None,
+        end: datetime = None,
+        currency: str = None,
+    ) -> List[Row]:
+        """
+        Get the columns analytics need for several users' ledgers in one query.
+
+        Args:
+            user_ids (Sequence[int]): Owners of the transactions
+            start (datetime): Inclusive lower bound of occurred_at
+            end (datetime): Exclusive upper bound of occurred_at
+            currency (str): Only transactions in this currency, or None for all
+
+        Returns:
+            List[Row]: (user_id, occurred_at, amount_minor, category,
+            currency) rows ordered by user and time
+        """
+        criteria = [Transaction.user_id.in_(user_ids)]
+        if start is not None:
+            criteria.append(Transaction.occurred_at >= start)
+        if end is not None:
+            criteria.append(Transaction.occurred_at < end)
+        if currency is not None:
+            criteria.append(Transaction.currency == currency)
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(
+                    Transaction.user_id,
+                    Transaction.occurred_at,
+                    Transaction.amount_minor,
+                    Transaction.category,
+                    Transaction.currency,
+                )
+                .where(*criteria)
+                .order_by(Transaction.user_id, Transaction.occurred_at)
+            )
+            return result.all()
+
+    @staticmethod
+    async def get_transaction(transaction_id: int, user_id: int) -> Optional[Transaction]:
+        """Get one of a user's transactions by ID, or None if it is not theirs."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(Transaction).where(
+                    Transaction.id == transaction_id, Transaction.user_id == user_id
+                )
+            )
+            return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_recent_transactions(user_id: int, limit: int = 10) -> List[Row]:
+        """Get a user's latest transactions, newest first."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(*_LEDGER_COLUMNS)
+                .where(Transaction.user_id == user_id)
+                .order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
+                .limit(limit)
+            )
+            return result.all()
+
+    @staticmethod
+    async def get_totals(
+        user_id: int, start: datetime = None, end: datetime = None, currency: str = None
+    ) -> Dict[str, int]:
+        """
+        Sum a user's income and expenses in [start, end), optionally in one currency.
+
+        Returns:
+            Dict[str, int]: income_minor, expense_minor (as a positive
+            number) and count
+        """
+        criteria = _range_criteria(user_id, start, end)
+        if currency is not None:
+            criteria.append(Transaction.currency == currency)
+
+        async for session in get_db_session():
+            result = await session.execute(
+                select(
+                    func.coalesce(
+                        func.sum(case((Transaction.amount_minor > 0, Transaction.amount_minor), else_=0)), 0
+                    ),
+                    func.coalesce(
+                        func.sum(case((Transaction.amount_minor < 0, -Transaction.amount_minor), else_=0)), 0
+                    ),
+                    func.count(),
+                ).where(*criteria)
+            )
+            income, expense, count = result.one()
+            return {
+                "income_minor": int(income),
+                "expense_minor": int(expense),
+                "count": count,
+            }
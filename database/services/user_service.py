@@ -2,11 +2,21 @@
 User service for database operations related to users.
 """
 
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 from sqlalchemy import select
 
-from ..database import get_db_session
+from ..database import get_db_session, commit_session, after_commit
 from ..models import User, Session
+from core.cache import TTLCache
+from core.config import config
+
+# Cache of telegram_id -> (user_id, profile_hash) for known users
+user_cache = TTLCache(max_size=config.USER_CACHE_SIZE, ttl=config.USER_CACHE_TTL)
+
+
+def _profile_hash(username: str, first_name: str, last_name: str) -> int:
+    """Hash the profile fields that get_or_create_user keeps in sync."""
+    return hash((username, first_name, last_name))
 
 
 class UserService:
@@ -21,12 +31,28 @@ class UserService:
     ) -> Tuple[User, bool]:
         """
         Get existing user or create new one.
+
+        Known users whose profile has not changed are served from the
+        identity cache without touching the database.
         
         Returns:
             Tuple[User, bool]: (user_object, is_newly_created)
             - user_object: The User instance
             - is_newly_created: True if user was just created, False if user already existed
         """
+        profile_hash = _profile_hash(username, first_name, last_name)
+        cached = user_cache.get(telegram_id)
+        if cached is not None and cached[1] == profile_hash:
+            user_id, _ = cached
+            user = User(
+                id=user_id,
+                telegram_id=telegram_id,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+            )
+            return user, False
+
         async for session in get_db_session():
             # Try to get existing user
             result = await session.execute(
@@ -35,14 +61,22 @@ class UserService:
             user = result.scalar_one_or_none()
 
             if user:
-                # Update user info if provided
-                if username is not None:
-                    user.username = username
-                if first_name is not None:
-                    user.first_name = first_name
-                if last_name is not None:
-                    user.last_name = last_name
-                await session.commit()
+                # Update user info if provided and changed
+                changed = False
+                for field, value in (
+                    ("username", username),
+                    ("first_name", first_name),
+                    ("last_name", last_name),
+                ):
+                    if value is not None and getattr(user, field) != value:
+                        setattr(user, field, value)
+                        changed = True
+                if changed:
+                    await commit_session(session)
+                user_id = user.id
+                after_commit(
+                    session, lambda: user_cache.set(telegram_id, (user_id, profile_hash))
+                )
                 return user, False  # User already existed
             else:
                 # Create new user
@@ -53,10 +87,19 @@ class UserService:
                     last_name=last_name,
                 )
                 session.add(user)
-                await session.commit()
+                await commit_session(session)
                 await session.refresh(user)
+                user_id = user.id
+                after_commit(
+                    session, lambda: user_cache.set(telegram_id, (user_id, profile_hash))
+                )
                 return user, True  # User was newly created
 
+    @staticmethod
+    def get_cache_stats() -> Dict[str, int]:
+        """Get hit/miss counters of the user identity cache."""
+        return user_cache.stats()
+
     @staticmethod
     async def get_user_by_id(user_id: int) -> Optional[User]:
         """Get user by internal ID."""
@@ -64,14 +107,14 @@ class UserService:
             result = await session.execute(select(User).where(User.id == user_id))
             return result.scalar_one_or_none()
             
-    # @staticmethod
-    # async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
-    #     """Get user by Telegram ID."""
-    #     async for session in get_db_session():
-    #         result = await session.execute(
-    #             select(User).where(User.telegram_id == telegram_id)
-    #         )
-    #         return result.scalar_one_or_none()
+    @staticmethod
+    async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
+        """Get user by Telegram ID."""
+        async for session in get_db_session():
+            result = await session.execute(
+                select(User).where(User.telegram_id == telegram_id)
+            )
+            return result.scalar_one_or_none()
 
 
     # @staticmethod